@@ -0,0 +1,5 @@
+"""Benchmarks for the Sharp Cocoro Air integration.
+
+Run them with ``python -m benchmarks`` (or ``just bench``); they talk to the
+local stand-in in ``benchmarks.fake_cocoro`` and never reach the real cloud.
+"""
@@ -0,0 +1,29 @@
+"""Run all benchmarks, or the ones named on the command line."""
+
+from __future__ import annotations
+
+import asyncio
+import importlib
+import sys
+
+BENCHMARKS = [
+    "accounts",
+    "commands",
+    "dispatch",
+    "polling",
+    "priority",
+    "refresh",
+    "replay",
+    "startup",
+    "state",
+]
+
+
+async def _async_main(names: list[str]) -> None:
+    for name in names:
+        module = importlib.import_module(f"benchmarks.bench_{name}")
+        await module.async_run()
+
+
+if __name__ == "__main__":
+    asyncio.run(_async_main(sys.argv[1:] or BENCHMARKS))
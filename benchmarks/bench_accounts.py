@@ -0,0 +1,115 @@
+"""Cloud load of many accounts starting at the same time.
+
+Restarts a dozen accounts against one fake server with 50ms latency: each
+logs in and refreshes, as restored entries do after a Home Assistant
+restart. Compares accounts with their own session and no coordination to
+accounts registered with the shared ``CloudScheduler``, which caps the
+requests in flight and shares one connection pool, with and without
+staggering their start.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import tempfile
+import time
+from contextlib import AsyncExitStack
+
+from aiohttp import ClientSession
+from aiohttp import CookieJar
+
+from benchmarks.common import print_table
+from benchmarks.fake_cocoro import FakeCocoroServer
+from custom_components.sharp_cocoro.data import SharpCocoroData
+from custom_components.sharp_cocoro.scheduler import CloudScheduler
+
+from homeassistant.core import HomeAssistant
+
+ACCOUNTS = 12
+DEVICES_PER_ACCOUNT = 2
+LATENCY = 0.05
+
+
+async def _async_start(data: SharpCocoroData, offset: float) -> None:
+    await asyncio.sleep(offset)
+    await data.async_login()
+    await data.coordinator.async_refresh()
+
+
+async def _measure(label: str, scheduler: CloudScheduler | None) -> list[object]:
+    with tempfile.TemporaryDirectory() as config_dir:
+        hass = HomeAssistant(config_dir)
+        async with (
+            FakeCocoroServer(
+                num_devices=DEVICES_PER_ACCOUNT, latency=LATENCY
+            ) as server,
+            AsyncExitStack() as stack,
+        ):
+            async with ClientSession(cookie_jar=CookieJar(unsafe=True)) as session:
+                client = server.create_client(session)
+                await client.login()
+                devices = {
+                    device.device_id: device for device in await client.query_devices()
+                }
+
+            accounts: list[tuple[SharpCocoroData, float]] = []
+            for i in range(ACCOUNTS):
+                entry_id = f"account-{i}"
+                if scheduler is not None:
+                    offset = scheduler.async_register(entry_id)
+                    session = scheduler.async_create_session(
+                        entry_id, CookieJar(unsafe=True)
+                    )
+                else:
+                    offset = 0.0
+                    session = await stack.enter_async_context(
+                        ClientSession(cookie_jar=CookieJar(unsafe=True))
+                    )
+                cocoro = server.create_client(session)
+                data = SharpCocoroData(
+                    cocoro=cocoro, devices=dict(devices), hass=hass, scheduler=scheduler
+                )
+                accounts.append((data, offset))
+
+            server.calls.clear()
+            server.connections.clear()
+            server.max_in_flight = 0
+            start = time.perf_counter()
+            await asyncio.gather(
+                *(_async_start(data, offset) for data, offset in accounts)
+            )
+            elapsed = time.perf_counter() - start
+
+            for data, _offset in accounts:
+                data.coordinator.async_shutdown()
+                await data.completion_tracker.async_shutdown()
+            if scheduler is not None:
+                for i in range(ACCOUNTS):
+                    await scheduler.async_unregister(f"account-{i}")
+        await hass.async_stop(force=True)
+
+    return [
+        label,
+        sum(server.calls.values()),
+        server.max_in_flight,
+        len(server.connections),
+        f"{elapsed:.2f}",
+    ]
+
+
+async def async_run() -> None:
+    """Run the benchmark and print the results."""
+    rows = [
+        await _measure("independent", None),
+        await _measure("shared, no stagger", CloudScheduler(stagger=0)),
+        await _measure("shared scheduler", CloudScheduler()),
+    ]
+    print_table(
+        f"Restart of {ACCOUNTS} accounts, {DEVICES_PER_ACCOUNT} devices each",
+        ["accounts", "requests", "peak in flight", "connections", "all ready (s)"],
+        rows,
+    )
+
+
+if __name__ == "__main__":
+    asyncio.run(async_run())
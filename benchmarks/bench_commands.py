@@ -0,0 +1,83 @@
+"""Command-to-state-visible latency through ``execute_and_refresh``.
+
+Sets a new target temperature on one device and measures the time until the
+entity would show it (its first state write reads the new temperature) and
+until ``execute_and_refresh`` returned, i.e. the (fake) cloud confirmed the
+control completed.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+
+from sharp_cocoro import Aircon
+
+from benchmarks.common import async_account
+from benchmarks.common import percentile
+from benchmarks.common import print_table
+from custom_components.sharp_cocoro.coordinator import execute_and_refresh
+
+ITERATIONS = 10
+SCENARIOS = [
+    # (response latency, control completion delay) in seconds
+    (0.0, 0.2),
+    (0.05, 0.5),
+    (0.2, 1.0),
+]
+
+
+async def _measure(
+    latency: float, completion_delay: float
+) -> tuple[list[float], list[float]]:
+    shown: list[float] = []
+    confirmed: list[float] = []
+    async with async_account(latency=latency, completion_delay=completion_delay) as (
+        _hass,
+        _server,
+        data,
+    ):
+        device_id = next(iter(data.devices))
+        for i in range(ITERATIONS):
+            target = 20.0 + (i % 8)
+            device = data.devices[device_id]
+            assert isinstance(device, Aircon)
+            device.queue_temperature_update(target)
+
+            seen: list[float] = []
+
+            def write_state(target: float = target, seen: list[float] = seen) -> None:
+                value = data.device_state(device_id).temperature
+                if value == target and not seen:
+                    seen.append(time.perf_counter())
+
+            start = time.perf_counter()
+            await execute_and_refresh(device, data, write_state, "benchmark")
+            confirmed.append(time.perf_counter() - start)
+            shown.append(seen[0] - start)
+    return shown, confirmed
+
+
+async def async_run() -> None:
+    """Run the benchmark and print the results."""
+    rows = []
+    for latency, completion_delay in SCENARIOS:
+        shown, confirmed = await _measure(latency, completion_delay)
+        rows.append(
+            [
+                f"{latency * 1000:.0f}",
+                f"{completion_delay * 1000:.0f}",
+                f"{percentile(shown, 50) * 1000:.0f}",
+                f"{percentile(confirmed, 50) * 1000:.0f}",
+                f"{percentile(confirmed, 95) * 1000:.0f}",
+            ]
+        )
+    print_table(
+        "Command to state visible (ms)",
+        ["latency", "completion", "shown p50", "confirmed p50", "confirmed p95"],
+        rows,
+    )
+
+
+if __name__ == "__main__":
+    asyncio.run(async_run())
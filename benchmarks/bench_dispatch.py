@@ -0,0 +1,111 @@
+"""Cost of telling entities about a device update at 10, 100 and 1000 devices.
+
+Adds the climate, fan and sensor entities of an account and times sending one
+device's update signal, round robin over the devices. For comparison, the same
+updates are also sent as one global bus event that every entity listens to
+and filters by device ID, like the integration did before updates were sent
+per device. Each update changes the room temperature, so the climate entity
+and the room temperature sensor of the updated device write their state in
+both cases.
+
+Finally the platforms are reset, which removes the entities, and the signal
+listeners still connected are counted.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from typing import Any
+
+from benchmarks.common import async_account
+from benchmarks.common import async_add_platforms
+from benchmarks.common import print_table
+from custom_components.sharp_cocoro.const import PROP_ROOM_TEMPERATURE
+from custom_components.sharp_cocoro.const import SIGNAL_DEVICE_UPDATED
+from custom_components.sharp_cocoro.coordinator import async_notify_device_updated
+
+from homeassistant.core import Event
+from homeassistant.core import callback
+from homeassistant.helpers.dispatcher import DATA_DISPATCHER
+
+DEVICE_COUNTS = [10, 100, 1000]
+UPDATES = 1000
+
+_BUS_EVENT = "benchmark_device_updated"
+_CHANGED = [PROP_ROOM_TEMPERATURE]
+
+
+async def _measure(num_devices: int) -> list[object]:
+    async with async_account(num_devices=num_devices) as (hass, _server, data):
+        platforms = await async_add_platforms(hass, data)
+        device_ids = list(data.devices)
+        signals = [SIGNAL_DEVICE_UPDATED.format(device_id) for device_id in device_ids]
+        connections = hass.data[DATA_DISPATCHER]
+
+        woken = 0
+        start = time.process_time()
+        for i in range(UPDATES):
+            device_id = device_ids[i % num_devices]
+            woken += len(connections.get(signals[i % num_devices], ()))
+            async_notify_device_updated(hass, device_id, _CHANGED)
+        signal_cpu = time.process_time() - start
+
+        bus_woken = 0
+        for platform in platforms:
+            for entity in platform.entities.values():
+                if (device_id := getattr(entity, "_device_id", None)) is None:
+                    continue
+
+                @callback
+                def _handle(
+                    event: Event[Any], entity=entity, device_id=device_id
+                ) -> None:
+                    nonlocal bus_woken
+                    bus_woken += 1
+                    if event.data["device_id"] == device_id:
+                        entity._handle_device_update(event.data["changed"])
+
+                hass.bus.async_listen(_BUS_EVENT, _handle)
+        start = time.process_time()
+        for i in range(UPDATES):
+            hass.bus.async_fire(
+                _BUS_EVENT,
+                {"device_id": device_ids[i % num_devices], "changed": _CHANGED},
+            )
+        await hass.async_block_till_done()
+        bus_cpu = time.process_time() - start
+
+        for platform in platforms:
+            await platform.async_reset()
+        remaining = sum(len(connections.get(signal, ())) for signal in signals)
+
+        return [
+            num_devices,
+            f"{woken / UPDATES:.1f}",
+            f"{signal_cpu / UPDATES * 1e6:.0f}",
+            f"{bus_woken / UPDATES:.1f}",
+            f"{bus_cpu / UPDATES * 1e6:.0f}",
+            remaining,
+        ]
+
+
+async def async_run() -> None:
+    """Run the benchmark and print the results."""
+    rows = [await _measure(num_devices) for num_devices in DEVICE_COUNTS]
+    print_table(
+        "Cost per device update",
+        [
+            "devices",
+            "signal: woken",
+            "cpu us",
+            "global event: woken",
+            "cpu us",
+            "left after removal",
+        ],
+        rows,
+    )
+
+
+if __name__ == "__main__":
+    asyncio.run(async_run())
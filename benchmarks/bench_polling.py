@@ -0,0 +1,66 @@
+"""API calls per hour at steady state.
+
+Measures how many HTTP requests one poll of the account costs against the
+fake server, then replays the adaptive poll interval over a virtual hour of
+unchanged state to count the polls it schedules.
+"""
+
+from __future__ import annotations
+
+import asyncio
+
+from benchmarks.common import async_account
+from benchmarks.common import print_table
+from custom_components.sharp_cocoro.const import UPDATE_INTERVAL
+from custom_components.sharp_cocoro.polling import AdaptivePollInterval
+
+HOUR = 3600.0
+DEVICE_COUNTS = [1, 10]
+
+
+def _polls_per_hour(powered_on: bool) -> int:
+    """Count the polls scheduled over an hour in which nothing changes."""
+    interval = AdaptivePollInterval()
+    elapsed = 0.0
+    polls = 0
+    while True:
+        elapsed += interval.next_delay()
+        if elapsed > HOUR:
+            return polls
+        polls += 1
+        interval.record_success(changed=False, powered_on=powered_on)
+
+
+async def _requests_per_poll(num_devices: int) -> int:
+    async with async_account(num_devices=num_devices) as (_hass, server, data):
+        await data.coordinator.async_refresh()
+        return sum(server.calls.values())
+
+
+async def async_run() -> None:
+    """Run the benchmark and print the results."""
+    fixed = int(HOUR / UPDATE_INTERVAL.total_seconds())
+    idle_on = _polls_per_hour(powered_on=True)
+    idle_off = _polls_per_hour(powered_on=False)
+
+    rows = []
+    for num_devices in DEVICE_COUNTS:
+        per_poll = await _requests_per_poll(num_devices)
+        rows.append(
+            [
+                num_devices,
+                per_poll,
+                fixed * per_poll,
+                idle_on * per_poll,
+                idle_off * per_poll,
+            ]
+        )
+    print_table(
+        "API calls per hour at steady state",
+        ["devices", "per poll", "fixed 15s", "idle, on", "idle, off"],
+        rows,
+    )
+
+
+if __name__ == "__main__":
+    asyncio.run(async_run())
@@ -0,0 +1,122 @@
+"""Command latency while the cloud is busy with refreshes.
+
+Six accounts of five devices share one ``CloudScheduler`` limited to two
+calls in flight, against a fake server with 100ms latency. Every account
+refreshes back to back while one of them sends commands; the time until
+each command is confirmed is measured with the limiter serving calls in
+arrival order and in priority order.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import tempfile
+import time
+from unittest.mock import patch
+
+from aiohttp import ClientSession
+from aiohttp import CookieJar
+from sharp_cocoro import Aircon
+
+from benchmarks.common import percentile
+from benchmarks.common import print_table
+from benchmarks.fake_cocoro import FakeCocoroServer
+from custom_components.sharp_cocoro.coordinator import execute_and_refresh
+from custom_components.sharp_cocoro.data import SharpCocoroData
+from custom_components.sharp_cocoro.scheduler import REQUEST_PRIORITIES
+from custom_components.sharp_cocoro.scheduler import CloudScheduler
+from custom_components.sharp_cocoro.scheduler import RequestPriority
+
+from homeassistant.core import HomeAssistant
+
+ACCOUNTS = 6
+DEVICES_PER_ACCOUNT = 5
+MAX_CONCURRENT = 2
+LATENCY = 0.1
+COMMANDS = 10
+
+
+async def _async_keep_refreshing(data: SharpCocoroData, stop: asyncio.Event) -> None:
+    while not stop.is_set():
+        await data.coordinator.async_refresh()
+
+
+async def _measure() -> list[float]:
+    confirmed: list[float] = []
+    with tempfile.TemporaryDirectory() as config_dir:
+        hass = HomeAssistant(config_dir)
+        scheduler = CloudScheduler(max_concurrent=MAX_CONCURRENT, stagger=0)
+        async with FakeCocoroServer(
+            num_devices=DEVICES_PER_ACCOUNT, latency=LATENCY, completion_delay=0.2
+        ) as server:
+            async with ClientSession(cookie_jar=CookieJar(unsafe=True)) as session:
+                client = server.create_client(session)
+                await client.login()
+                devices = {
+                    device.device_id: device for device in await client.query_devices()
+                }
+
+            accounts = []
+            for i in range(ACCOUNTS):
+                session = scheduler.async_create_session(
+                    f"account-{i}", CookieJar(unsafe=True)
+                )
+                data = SharpCocoroData(
+                    cocoro=server.create_client(session),
+                    devices=dict(devices),
+                    hass=hass,
+                    scheduler=scheduler,
+                )
+                await data.async_login()
+                accounts.append(data)
+
+            stop = asyncio.Event()
+            load = [
+                asyncio.create_task(_async_keep_refreshing(data, stop))
+                for data in accounts
+            ]
+            data = accounts[0]
+            device_id = next(iter(data.devices))
+            for i in range(COMMANDS):
+                device = data.devices[device_id]
+                assert isinstance(device, Aircon)
+                device.queue_temperature_update(20.0 + i % 8)
+                start = time.perf_counter()
+                await execute_and_refresh(device, data, lambda: None, "benchmark")
+                confirmed.append(time.perf_counter() - start)
+
+            stop.set()
+            await asyncio.gather(*load)
+            for i, data in enumerate(accounts):
+                data.coordinator.async_shutdown()
+                for batcher in data.write_batchers.values():
+                    await batcher.async_shutdown()
+                await data.completion_tracker.async_shutdown()
+                await scheduler.async_unregister(f"account-{i}")
+        await hass.async_stop(force=True)
+    return confirmed
+
+
+async def async_run() -> None:
+    """Run the benchmark and print the results."""
+    rows = []
+    fifo = dict.fromkeys(REQUEST_PRIORITIES, RequestPriority.REFRESH)
+    for label, priorities in (("arrival order", fifo), ("priority order", {})):
+        with patch.dict(REQUEST_PRIORITIES, priorities):
+            confirmed = await _measure()
+        rows.append(
+            [
+                label,
+                f"{percentile(confirmed, 50) * 1000:.0f}",
+                f"{percentile(confirmed, 95) * 1000:.0f}",
+            ]
+        )
+    print_table(
+        f"Command confirmed under refresh load, {ACCOUNTS} accounts (ms)",
+        ["limiter", "p50", "p95"],
+        rows,
+    )
+
+
+if __name__ == "__main__":
+    asyncio.run(async_run())
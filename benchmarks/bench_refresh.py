@@ -0,0 +1,63 @@
+"""Refresh cost at 1, 10 and 100 devices.
+
+Times ``SharpCocoroCoordinator.async_refresh`` against a zero-latency fake
+server while one device changes between refreshes. CPU time includes the
+fake server, which runs in the same process.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+
+from benchmarks.common import async_account
+from benchmarks.common import async_listen_device_updates
+from benchmarks.common import print_table
+
+ITERATIONS = 20
+DEVICE_COUNTS = [1, 10, 100]
+
+
+async def _measure(num_devices: int) -> list[object]:
+    async with async_account(num_devices=num_devices) as (hass, server, data):
+        signals = 0
+
+        def _count(_changed: object) -> None:
+            nonlocal signals
+            signals += 1
+
+        async_listen_device_updates(hass, data.devices, _count)
+        changing = next(iter(server.devices.values()))
+
+        wall = 0.0
+        cpu = 0.0
+        for i in range(ITERATIONS):
+            changing.room_temperature = 20 + i % 10
+            wall_start = time.perf_counter()
+            cpu_start = time.process_time()
+            await data.coordinator.async_refresh()
+            wall += time.perf_counter() - wall_start
+            cpu += time.process_time() - cpu_start
+        await asyncio.sleep(0)
+
+        return [
+            num_devices,
+            f"{wall / ITERATIONS * 1000:.1f}",
+            f"{cpu / ITERATIONS * 1000:.1f}",
+            sum(server.calls.values()) // ITERATIONS,
+            f"{signals / ITERATIONS:.1f}",
+        ]
+
+
+async def async_run() -> None:
+    """Run the benchmark and print the results."""
+    rows = [await _measure(num_devices) for num_devices in DEVICE_COUNTS]
+    print_table(
+        "Refresh cost per cycle",
+        ["devices", "wall ms", "cpu ms", "requests", "signals"],
+        rows,
+    )
+
+
+if __name__ == "__main__":
+    asyncio.run(async_run())
@@ -0,0 +1,250 @@
+"""Cost of the refresh pipeline over a replayed day of device behavior.
+
+Plays a recorded day back through ``SharpCocoroData.async_refresh_data`` and
+the climate, fan and sensor entities, with no network: the virtual clock of
+the replay jumps to every poll the adaptive poll interval schedules, and the
+controls in the recording are sent again at their recorded times through
+``execute_and_refresh``. Reports the CPU time per refresh and the polls,
+state writes and device update signals per hour.
+
+Set ``SHARP_COCORO_FIXTURE`` to a fixture recorded with ``benchmarks.replay``
+to replay real device behavior. Without it, a synthetic day is recorded from
+the fake server first: room temperature and humidity follow the time of
+day, power draw varies while the units run, and all units are turned on at
+08:00 and off at 18:00.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import math
+import os
+import random
+import statistics
+import tempfile
+import time
+from collections import Counter
+from collections.abc import Callable
+from collections.abc import Iterable
+from pathlib import Path
+from typing import Any
+
+from aiohttp import ClientSession
+from aiohttp import CookieJar
+from sharp_cocoro import Cocoro
+from sharp_cocoro.properties import BinaryPropertyStatus
+from sharp_cocoro.properties import PropertyStatus
+from sharp_cocoro.properties import SinglePropertyStatus
+
+from benchmarks.common import async_add_platforms
+from benchmarks.common import async_listen_device_updates
+from benchmarks.common import percentile
+from benchmarks.common import print_table
+from benchmarks.fake_cocoro import FakeCocoroServer
+from benchmarks.replay import Recorder
+from benchmarks.replay import ReplayClock
+from benchmarks.replay import Replayer
+from custom_components.sharp_cocoro.auth import AuthManager
+from custom_components.sharp_cocoro.climate import SharpCocoroAircon
+from custom_components.sharp_cocoro.coordinator import execute_and_refresh
+from custom_components.sharp_cocoro.data import SharpCocoroData
+from custom_components.sharp_cocoro.data import async_discover_aircons
+from custom_components.sharp_cocoro.polling import AdaptivePollInterval
+from custom_components.sharp_cocoro.stats import ApiStats
+
+from homeassistant import loader
+from homeassistant.const import EVENT_STATE_CHANGED
+from homeassistant.const import EVENT_STATE_REPORTED
+from homeassistant.core import HomeAssistant
+from homeassistant.core import callback
+
+FIXTURE_ENV = "SHARP_COCORO_FIXTURE"
+
+HOUR = 3600.0
+DAY = 24 * HOUR
+
+# The synthetic day: devices, how often it is sampled, and the commands
+NUM_DEVICES = 5
+RECORD_INTERVAL = 60.0
+POWER_ON_AT = 8 * HOUR
+POWER_OFF_AT = 18 * HOUR
+SEED = 1
+
+
+def _simulate(server: FakeCocoroServer, t: float, rng: random.Random) -> None:
+    """Move the fake devices to their state at time ``t`` of the day."""
+    daylight = math.sin(2 * math.pi * (t - 6 * HOUR) / DAY)
+    for i, device in enumerate(server.devices.values()):
+        device.room_temperature = round(24 + i % 3 + 4 * daylight)
+        device.humidity = round(55 - 10 * daylight)
+        running = device.power == "30"
+        device.power_consumption = 10 * rng.randint(30, 70) if running else 0
+        device.energy += round(device.power_consumption * RECORD_INTERVAL / HOUR)
+
+
+async def _async_record_day(path: Path) -> None:
+    """Record a synthetic day from the fake server."""
+    clock = ReplayClock()
+    recorder = Recorder(clock=lambda: clock.now)
+    rng = random.Random(SEED)
+    async with (
+        FakeCocoroServer(num_devices=NUM_DEVICES, completion_delay=0) as server,
+        ClientSession(cookie_jar=CookieJar(unsafe=True)) as session,
+    ):
+        cocoro = server.create_client(session)
+        recorder.attach(cocoro)
+        await cocoro.login()
+        for fake in server.devices.values():
+            fake.power = "31"
+        commands = {POWER_ON_AT: "queue_power_on", POWER_OFF_AT: "queue_power_off"}
+        while clock.now <= DAY:
+            _simulate(server, clock.now, rng)
+            devices = await cocoro.query_devices()
+            if (command := commands.pop(clock.now, None)) is not None:
+                await asyncio.gather(
+                    *(_async_send(cocoro, device, command) for device in devices)
+                )
+            clock.advance(RECORD_INTERVAL)
+    recorder.save(path)
+
+
+async def _async_send(cocoro: Cocoro, device: Any, command: str) -> None:
+    """Send a command and check its control once it took effect."""
+    getattr(device, command)()
+    result = await cocoro.execute_queued_updates(device)
+    await asyncio.sleep(0)
+    await cocoro.check_control_results(
+        device, [control["id"] for control in result["controlList"]]
+    )
+
+
+def _status(status: dict[str, Any]) -> PropertyStatus:
+    """Return the property status a recorded control wrote."""
+    if "valueSingle" in status:
+        return SinglePropertyStatus(status["statusCode"], status["valueSingle"])
+    return BinaryPropertyStatus(status["statusCode"], status["valueBinary"])
+
+
+class _Counts:
+    """Count state writes and device update signals."""
+
+    def __init__(self, hass: HomeAssistant, device_ids: Iterable[int]) -> None:
+        self.counts: Counter[str] = Counter()
+        hass.bus.async_listen(EVENT_STATE_CHANGED, self._counter("state changes"))
+        hass.bus.async_listen(
+            EVENT_STATE_REPORTED,
+            self._counter("unchanged writes"),
+            event_filter=callback(lambda _data: True),
+        )
+        async_listen_device_updates(hass, device_ids, self._counter("signals"))
+
+    def _counter(self, name: str) -> Callable[[Any], None]:
+        @callback
+        def _count(_event: Any) -> None:
+            self.counts[name] += 1
+
+        return _count
+
+
+async def _async_replay(fixture: Path) -> tuple[float, list[float], Counter[str]]:
+    """Replay a fixture; return its duration, CPU per refresh and counts."""
+    clock = ReplayClock()
+    replayer = Replayer.load(fixture, clock)
+    with tempfile.TemporaryDirectory() as config_dir:
+        hass = HomeAssistant(config_dir)
+        loader.async_setup(hass)
+
+        cocoro = Cocoro(app_secret="replay", app_key="replay")
+        replayer.attach(cocoro)
+        api_stats = ApiStats()
+        auth = AuthManager(cocoro, api_stats)
+        devices = await async_discover_aircons(cocoro, auth)
+        data = SharpCocoroData(
+            cocoro=cocoro,
+            devices=devices,
+            hass=hass,
+            api_stats=api_stats,
+            auth_manager=auth,
+        )
+        data.coordinator.poll_interval = AdaptivePollInterval(clock=lambda: clock.now)
+        platforms = await async_add_platforms(hass, data)
+        climates: dict[int, SharpCocoroAircon] = {
+            entity._device_id: entity for entity in platforms[0].entities.values()
+        }
+        counts = _Counts(hass, data.devices)
+
+        controls = iter(replayer.controls)
+        control = next(controls, None)
+        cpu: list[float] = []
+        while clock.now <= replayer.duration:
+            sends = []
+            while control is not None and control["t"] <= clock.now:
+                for item in control["body"]["controlList"]:
+                    device = data.devices[item["deviceId"]]
+                    for status in item["status"]:
+                        device.queue_property_status_update(_status(status))
+                    entity = climates[item["deviceId"]]
+                    sends.append(
+                        execute_and_refresh(
+                            device, data, entity.async_write_ha_state, "replay"
+                        )
+                    )
+                control = next(controls, None)
+            if sends:
+                await asyncio.gather(*sends)
+                counts.counts["commands"] += len(sends)
+
+            start = time.process_time()
+            await data.async_refresh_data()
+            await hass.async_block_till_done()
+            cpu.append(time.process_time() - start)
+            clock.advance(data.coordinator.poll_interval.next_delay())
+
+        await data.completion_tracker.async_shutdown()
+        for batcher in data.write_batchers.values():
+            await batcher.async_shutdown()
+        for debouncer in data.refresh_debouncers.values():
+            debouncer.async_shutdown()
+        await hass.async_stop(force=True)
+    counts.counts["polls"] = len(cpu)
+    return replayer.duration, cpu, counts.counts
+
+
+async def async_run() -> None:
+    """Run the benchmark and print the results."""
+    with tempfile.TemporaryDirectory() as tmp:
+        if fixture_env := os.environ.get(FIXTURE_ENV):
+            fixture = Path(fixture_env)
+        else:
+            fixture = Path(tmp) / "synthetic.json.gz"
+            await _async_record_day(fixture)
+        size = fixture.stat().st_size
+        duration, cpu, counts = await _async_replay(fixture)
+
+    hours = duration / HOUR
+    print_table(
+        f"Replay of {fixture.name} ({hours:.1f} h, {size / 1024:.0f} KiB)",
+        ["cpu/refresh p50 (ms)", "p95 (ms)", "total (ms)", "commands"],
+        [
+            [
+                f"{statistics.median(cpu) * 1000:.2f}",
+                f"{percentile(cpu, 95) * 1000:.2f}",
+                f"{sum(cpu) * 1000:.0f}",
+                counts["commands"],
+            ]
+        ],
+    )
+    print_table(
+        "Per hour",
+        ["polls", "state changes", "unchanged writes", "signals"],
+        [
+            [
+                f"{counts[name] / hours:.1f}"
+                for name in ("polls", "state changes", "unchanged writes", "signals")
+            ]
+        ],
+    )
+
+
+if __name__ == "__main__":
+    asyncio.run(async_run())
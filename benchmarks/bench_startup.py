@@ -0,0 +1,180 @@
+"""Cost of loading the integration and of setting up an entry.
+
+Import times are measured in fresh interpreters that already have the Home
+Assistant modules the integration uses loaded, so only the integration's own
+import cost is counted:
+
+- package: what Home Assistant imports when it loads the integration (the
+  package, ``config_flow`` and ``diagnostics``); must not pull in the client
+  library
+- runtime: what the first ``async_setup_entry`` imports in the executor
+- platforms: the climate, fan and sensor platforms, imported after the runtime
+
+Setup times cover creating the runtime data of an entry with 1, 10 and 100
+devices, either discovered from the zero-latency fake server or restored from
+the stored snapshot. The benchmark fails when a measurement exceeds its budget.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from aiohttp import ClientSession
+from aiohttp import CookieJar
+
+from benchmarks.common import print_table
+from benchmarks.fake_cocoro import FakeCocoroServer
+from custom_components.sharp_cocoro.auth import AuthManager
+from custom_components.sharp_cocoro.data import SharpCocoroData
+from custom_components.sharp_cocoro.data import async_discover_aircons
+from custom_components.sharp_cocoro.stats import ApiStats
+from custom_components.sharp_cocoro.storage import DeviceSnapshotStore
+
+from homeassistant.core import HomeAssistant
+
+IMPORT_RUNS = 5
+SETUP_RUNS = 5
+DEVICE_COUNTS = [1, 10, 100]
+
+# Budgets in milliseconds, generous enough for slow machines
+IMPORT_BUDGETS = {"package": 25.0, "runtime": 150.0, "platforms": 50.0}
+SETUP_BUDGET_BASE = 10.0
+SETUP_BUDGET_PER_DEVICE = 2.0
+
+_PACKAGE = "custom_components.sharp_cocoro"
+_PRELOAD = [
+    "aiohttp",
+    "voluptuous",
+    "homeassistant.components.climate",
+    "homeassistant.components.diagnostics",
+    "homeassistant.components.fan",
+    "homeassistant.components.sensor",
+    "homeassistant.config_entries",
+    "homeassistant.helpers.aiohttp_client",
+    "homeassistant.helpers.config_validation",
+    "homeassistant.helpers.entity_registry",
+    "homeassistant.helpers.event",
+    "homeassistant.helpers.service",
+    "homeassistant.helpers.storage",
+]
+_STAGES = {
+    "package": [_PACKAGE, f"{_PACKAGE}.config_flow", f"{_PACKAGE}.diagnostics"],
+    "runtime": [f"{_PACKAGE}.data"],
+    "platforms": [f"{_PACKAGE}.climate", f"{_PACKAGE}.fan", f"{_PACKAGE}.sensor"],
+}
+_IMPORT_SCRIPT = """
+import importlib, json, sys, time
+for name in {preload!r}:
+    importlib.import_module(name)
+result = {{}}
+for stage, modules in {stages!r}.items():
+    start = time.perf_counter()
+    for name in modules:
+        importlib.import_module(name)
+    result[stage] = (time.perf_counter() - start) * 1000
+    result[stage + "_client"] = "sharp_cocoro" in sys.modules
+print(json.dumps(result))
+"""
+
+
+def _measure_imports() -> dict[str, list[float]]:
+    script = _IMPORT_SCRIPT.format(preload=_PRELOAD, stages=_STAGES)
+    root = Path(__file__).resolve().parent.parent
+    samples: dict[str, list[float]] = {stage: [] for stage in _STAGES}
+    for _ in range(IMPORT_RUNS):
+        output = subprocess.run(
+            [sys.executable, "-c", script],
+            cwd=root,
+            capture_output=True,
+            check=True,
+            text=True,
+        ).stdout
+        result = json.loads(output)
+        if result["package_client"]:
+            raise RuntimeError("Loading the integration imported sharp_cocoro")
+        for stage in _STAGES:
+            samples[stage].append(result[stage])
+    return samples
+
+
+async def _measure_setup(num_devices: int) -> tuple[float, float]:
+    """Return the median discovered and restored setup time in ms."""
+    discovered: list[float] = []
+    restored: list[float] = []
+    with tempfile.TemporaryDirectory() as config_dir:
+        hass = HomeAssistant(config_dir)
+        async with (
+            FakeCocoroServer(num_devices=num_devices) as server,
+            ClientSession(cookie_jar=CookieJar(unsafe=True)) as session,
+        ):
+            store = DeviceSnapshotStore(hass, "benchmark")
+            for _ in range(SETUP_RUNS):
+                for samples, from_store in ((discovered, False), (restored, True)):
+                    cocoro = server.create_client(session)
+                    api_stats = ApiStats()
+                    auth = AuthManager(cocoro, api_stats)
+                    start = time.perf_counter()
+                    if from_store:
+                        devices = await store.async_load()
+                        assert devices is not None
+                    else:
+                        devices = await async_discover_aircons(cocoro, auth)
+                    data = SharpCocoroData(
+                        cocoro=cocoro,
+                        devices=devices,
+                        hass=hass,
+                        api_stats=api_stats,
+                        auth_manager=auth,
+                        snapshot_store=store,
+                    )
+                    samples.append((time.perf_counter() - start) * 1000)
+                    if not from_store:
+                        await store.async_save(devices)
+                    await data.completion_tracker.async_shutdown()
+        await hass.async_stop(force=True)
+    return statistics.median(discovered), statistics.median(restored)
+
+
+async def async_run() -> None:
+    """Run the benchmark and print the results."""
+    over_budget: list[str] = []
+
+    import_rows = []
+    for stage, samples in (await asyncio.to_thread(_measure_imports)).items():
+        median = statistics.median(samples)
+        budget = IMPORT_BUDGETS[stage]
+        if median > budget:
+            over_budget.append(f"import {stage}")
+        import_rows.append(
+            [stage, f"{median:.1f}", f"{max(samples):.1f}", f"{budget:.0f}"]
+        )
+    print_table("Import time (ms)", ["stage", "median", "max", "budget"], import_rows)
+
+    setup_rows = []
+    for num_devices in DEVICE_COUNTS:
+        discovered, restored = await _measure_setup(num_devices)
+        budget = SETUP_BUDGET_BASE + SETUP_BUDGET_PER_DEVICE * num_devices
+        if max(discovered, restored) > budget:
+            over_budget.append(f"setup with {num_devices} devices")
+        setup_rows.append(
+            [num_devices, f"{discovered:.1f}", f"{restored:.1f}", f"{budget:.0f}"]
+        )
+    print_table(
+        "Entry setup (ms)",
+        ["devices", "discovered", "restored", "budget"],
+        setup_rows,
+    )
+
+    if over_budget:
+        raise RuntimeError(f"Over budget: {', '.join(over_budget)}")
+
+
+if __name__ == "__main__":
+    asyncio.run(async_run())
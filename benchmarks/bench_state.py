@@ -0,0 +1,48 @@
+"""CPU cost of computing entity state.
+
+Builds the climate and fan entities for 100 devices and times computing the
+state and attributes Home Assistant reads on every state write, without
+registering the entities.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+
+from benchmarks.common import async_account
+from benchmarks.common import print_table
+from custom_components.sharp_cocoro.climate import SharpCocoroAircon
+from custom_components.sharp_cocoro.fan import SharpCocoroAirFan
+
+NUM_DEVICES = 100
+ROUNDS = 20
+
+
+async def async_run() -> None:
+    """Run the benchmark and print the results."""
+    async with async_account(num_devices=NUM_DEVICES) as (hass, _server, data):
+        rows = []
+        for entity_cls in (SharpCocoroAircon, SharpCocoroAirFan):
+            entities = [entity_cls(data, device_id) for device_id in data.devices]
+            for entity in entities:
+                entity.hass = hass
+
+            start = time.process_time()
+            for _ in range(ROUNDS):
+                for entity in entities:
+                    _ = entity.state
+                    _ = entity.state_attributes
+            elapsed = time.process_time() - start
+            writes = ROUNDS * len(entities)
+            rows.append([entity_cls.__name__, writes, f"{elapsed / writes * 1e6:.1f}"])
+
+    print_table(
+        f"Entity state computation ({NUM_DEVICES} devices)",
+        ["entity", "writes", "cpu us/write"],
+        rows,
+    )
+
+
+if __name__ == "__main__":
+    asyncio.run(async_run())
@@ -0,0 +1,148 @@
+"""Shared helpers for the benchmarks."""
+
+from __future__ import annotations
+
+import logging
+import statistics
+import tempfile
+from collections.abc import AsyncIterator
+from collections.abc import Callable
+from collections.abc import Iterable
+from contextlib import asynccontextmanager
+from types import SimpleNamespace
+from typing import Any
+
+from aiohttp import ClientSession
+from aiohttp import CookieJar
+from sharp_cocoro import Aircon
+from sharp_cocoro import Device
+
+from benchmarks.fake_cocoro import APP_KEY
+from benchmarks.fake_cocoro import APP_SECRET
+from benchmarks.fake_cocoro import FakeCocoroServer
+from custom_components.sharp_cocoro import climate
+from custom_components.sharp_cocoro import fan
+from custom_components.sharp_cocoro import sensor
+from custom_components.sharp_cocoro.const import DOMAIN
+from custom_components.sharp_cocoro.const import SIGNAL_DEVICE_UPDATED
+from custom_components.sharp_cocoro.data import SharpCocoroData
+
+from homeassistant.core import HomeAssistant
+from homeassistant.core import callback
+from homeassistant.helpers import device_registry as dr
+from homeassistant.helpers import entity_registry as er
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
+from homeassistant.helpers.entity_platform import EntityPlatform
+
+_LOGGER = logging.getLogger(__name__)
+
+
+@asynccontextmanager
+async def async_account(
+    num_devices: int = 1,
+    latency: float = 0.0,
+    completion_delay: float = 0.5,
+) -> AsyncIterator[tuple[HomeAssistant, FakeCocoroServer, SharpCocoroData]]:
+    """Set up an account against a fresh fake server, like async_setup_entry.
+
+    The coordinator is not started; benchmarks drive refreshes themselves.
+    """
+    with tempfile.TemporaryDirectory() as config_dir:
+        hass = HomeAssistant(config_dir)
+        async with (
+            FakeCocoroServer(
+                num_devices=num_devices,
+                latency=latency,
+                completion_delay=completion_delay,
+            ) as server,
+            ClientSession(cookie_jar=CookieJar(unsafe=True)) as session,
+        ):
+            cocoro = server.create_client(session)
+            await cocoro.login()
+            devices: dict[int, Device] = {
+                device.device_id: device
+                for device in await cocoro.query_devices()
+                if isinstance(device, Aircon)
+            }
+            data = SharpCocoroData(
+                cocoro=cocoro,
+                devices=devices,
+                hass=hass,
+                app_key=APP_KEY,
+                app_secret=APP_SECRET,
+            )
+            server.calls.clear()
+            try:
+                yield hass, server, data
+            finally:
+                data.coordinator.async_shutdown()
+                for batcher in data.write_batchers.values():
+                    await batcher.async_shutdown()
+                for debouncer in data.refresh_debouncers.values():
+                    debouncer.async_shutdown()
+                await data.completion_tracker.async_shutdown()
+                await hass.async_stop(force=True)
+
+
+async def async_add_platforms(
+    hass: HomeAssistant, data: SharpCocoroData
+) -> list[EntityPlatform]:
+    """Add the climate, fan and sensor entities of an account to hass.
+
+    Returns the entity platforms, in that order.
+    """
+    await dr.async_load(hass)
+    await er.async_load(hass)
+    entry = SimpleNamespace(entry_id="benchmark", runtime_data=data)
+    platforms = []
+    for domain, module in (("climate", climate), ("fan", fan), ("sensor", sensor)):
+        platform = EntityPlatform(
+            hass=hass,
+            logger=_LOGGER,
+            domain=domain,
+            platform_name=DOMAIN,
+            platform=None,
+            scan_interval=getattr(module, "SCAN_INTERVAL", sensor.SCAN_INTERVAL),
+            entity_namespace=None,
+        )
+
+        def _add(
+            entities: Iterable[Any], _update: bool = False, platform=platform
+        ) -> None:
+            hass.async_create_task(platform.async_add_entities(entities))
+
+        await module.async_setup_entry(hass, entry, _add)  # type: ignore[arg-type]
+        platforms.append(platform)
+    await hass.async_block_till_done()
+    return platforms
+
+
+@callback
+def async_listen_device_updates(
+    hass: HomeAssistant,
+    device_ids: Iterable[int],
+    target: Callable[[list[str] | None], None],
+) -> None:
+    """Call ``target`` with every update signal sent for the devices."""
+    for device_id in device_ids:
+        async_dispatcher_connect(
+            hass, SIGNAL_DEVICE_UPDATED.format(device_id), callback(target)
+        )
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    """Return the given percentile of the samples."""
+    if len(samples) == 1:
+        return samples[0]
+    return statistics.quantiles(samples, n=100, method="inclusive")[int(pct) - 1]
+
+
+def print_table(title: str, header: list[str], rows: list[list[object]]) -> None:
+    """Print a small aligned table."""
+    cells = [header, *[[str(c) for c in row] for row in rows]]
+    widths = [max(len(row[i]) for row in cells) for i in range(len(header))]
+    print(f"\n{title}")
+    for i, row in enumerate(cells):
+        print("  ".join(c.rjust(w) for c, w in zip(row, widths, strict=True)))
+        if i == 0:
+            print("  ".join("-" * w for w in widths))
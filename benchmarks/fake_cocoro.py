@@ -0,0 +1,409 @@
+"""Local stand-in for the Sharp Cocoro cloud API.
+
+Implements the endpoints ``sharp_cocoro.Cocoro`` talks to: login, box
+listing, device properties, queued control execution and control result
+polling. Every response can be delayed by a fixed latency, and controls only
+take effect on the simulated device after a configurable completion delay,
+like the real cloud which relays them to the unit asynchronously.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import itertools
+import secrets
+from collections import Counter
+from dataclasses import dataclass
+from dataclasses import field
+from typing import Any
+
+from aiohttp import ClientSession
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from sharp_cocoro import Cocoro
+from sharp_cocoro.state import State8
+
+API_PATH = "/hems/pfApi/ta"
+SESSION_COOKIE = "JSESSIONID"
+
+APP_KEY = "fake-app-key"
+APP_SECRET = "fake-app-secret"
+
+
+def _single(name: str, code: str, values: dict[str, str]) -> dict[str, Any]:
+    return {
+        "statusName": name,
+        "statusCode": code,
+        "get": True,
+        "set": True,
+        "inf": True,
+        "valueType": "valueSingle",
+        "valueSingle": [{"name": n, "code": c} for c, n in values.items()],
+    }
+
+
+def _range(name: str, code: str, low: str, high: str, unit: str) -> dict[str, Any]:
+    return {
+        "statusName": name,
+        "statusCode": code,
+        "get": True,
+        "set": False,
+        "inf": False,
+        "valueType": "valueRange",
+        "valueRange": {
+            "type": "int",
+            "min": low,
+            "max": high,
+            "step": "1",
+            "unit": unit,
+        },
+    }
+
+
+AIRCON_PROPERTIES: list[dict[str, Any]] = [
+    _single("Operation status", "80", {"30": "On", "31": "Off"}),
+    _single(
+        "Operation mode",
+        "B0",
+        {
+            "40": "Other",
+            "41": "Auto",
+            "42": "Cool",
+            "43": "Heat",
+            "44": "Dehumidify",
+            "45": "Ventilation",
+        },
+    ),
+    _single(
+        "Air flow rate",
+        "A0",
+        {**{str(30 + level): f"Level {level}" for level in range(1, 9)}, "41": "Auto"},
+    ),
+    {
+        "statusName": "State detail",
+        "statusCode": "FA",
+        "get": True,
+        "set": True,
+        "inf": False,
+        "valueType": "valueBinary",
+    },
+    _range("Room temperature", "BB", "-127", "125", "C"),
+    _range("Room humidity", "BA", "0", "100", "%"),
+    _range("Instantaneous power consumption", "84", "0", "65533", "W"),
+    _range("Cumulative power consumption", "85", "0", "999999999", "0.001kWh"),
+]
+
+
+@dataclass
+class FakeAircon:
+    """A simulated air conditioner behind its own Cocoro box."""
+
+    device_id: int
+    name: str
+    power: str = "30"
+    operation_mode: str = "42"
+    windspeed: str = "41"
+    temperature: float = 24.0
+    fan_direction: int = 0
+    room_temperature: int = 26
+    humidity: int = 50
+    power_consumption: int = 450
+    energy: int = 1_234_567
+
+    @property
+    def box_id(self) -> str:
+        """Return the ID of the box the device is paired with."""
+        return f"box-{self.device_id}"
+
+    @property
+    def state8(self) -> str:
+        """Return the encoded state detail (FA) property."""
+        state = State8()
+        state.temperature = self.temperature
+        raw = list(state.state)
+        raw[96:98] = f"{self.fan_direction:02d}"
+        return "".join(raw)
+
+    def status(self) -> list[dict[str, Any]]:
+        """Return the status list as reported by the device property endpoint."""
+        return [
+            {
+                "statusCode": "80",
+                "valueType": "valueSingle",
+                "valueSingle": {"code": self.power},
+            },
+            {
+                "statusCode": "B0",
+                "valueType": "valueSingle",
+                "valueSingle": {"code": self.operation_mode},
+            },
+            {
+                "statusCode": "A0",
+                "valueType": "valueSingle",
+                "valueSingle": {"code": self.windspeed},
+            },
+            {
+                "statusCode": "FA",
+                "valueType": "valueBinary",
+                "valueBinary": {"code": self.state8},
+            },
+            {
+                "statusCode": "BB",
+                "valueType": "valueRange",
+                "valueRange": {"code": str(self.room_temperature)},
+            },
+            {
+                "statusCode": "BA",
+                "valueType": "valueRange",
+                "valueRange": {"code": str(self.humidity)},
+            },
+            {
+                "statusCode": "84",
+                "valueType": "valueRange",
+                "valueRange": {"code": str(self.power_consumption)},
+            },
+            {
+                "statusCode": "85",
+                "valueType": "valueRange",
+                "valueRange": {"code": str(self.energy)},
+            },
+        ]
+
+    def apply(self, status: dict[str, Any]) -> None:
+        """Apply one status entry of a control request."""
+        code = status["statusCode"]
+        if code == "80":
+            self.power = status["valueSingle"]["code"]
+        elif code == "B0":
+            self.operation_mode = status["valueSingle"]["code"]
+        elif code == "A0":
+            self.windspeed = status["valueSingle"]["code"]
+        elif code == "FA":
+            state = State8(status["valueBinary"]["code"])
+            # Temperature commands flag themselves in nibble 6, fan direction
+            # commands use a template without that flag
+            if state.state[6] == "2":
+                self.temperature = state.temperature
+            else:
+                self.fan_direction = state.fan_direction
+
+    def box(self) -> dict[str, Any]:
+        """Return the box listing entry for this device."""
+        return {
+            "boxId": self.box_id,
+            "maxFlag": False,
+            "pairingFlag": True,
+            "pairedTerminalNum": 1,
+            "timezone": "Asia/Tokyo",
+            "terminalAppInfo": [
+                {"terminalAppId": APP_KEY, "appName": "fake", "userNumber": 1}
+            ],
+            "echonetData": [
+                {
+                    "maker": "SHARP",
+                    "series": None,
+                    "model": "AY-FAKE",
+                    "serialNumber": f"SN{self.device_id:08d}",
+                    "echonetNode": f"node-{self.device_id}",
+                    "echonetObject": "013001",
+                    "echonetAttr": "",
+                    "echonetProperty": "",
+                    "deviceId": self.device_id,
+                    "simulPerfModeFlag": False,
+                    "propertyUpdatedAt": "",
+                    "labelData": {
+                        "id": self.device_id,
+                        "place": "Room",
+                        "name": self.name,
+                        "deviceType": "AIR_CON",
+                        "zipCd": "",
+                        "yomi": "",
+                        "lSubInfo": "{}",
+                    },
+                }
+            ],
+        }
+
+    def device_property(self) -> dict[str, Any]:
+        """Return the device property response for this device."""
+        return {
+            "deviceId": self.device_id,
+            "echonetNode": f"node-{self.device_id}",
+            "echonetObject": "013001",
+            "registerLevel": 1,
+            "label": self.name,
+            "className": "AirConditioner",
+            "maker": "SHARP",
+            "series": "",
+            "model": "AY-FAKE",
+            "place": "Room",
+            "propertyUpdatedAt": "",
+            "property": AIRCON_PROPERTIES,
+            "status": self.status(),
+        }
+
+
+@dataclass
+class _Control:
+    """A control accepted by the fake cloud."""
+
+    control_id: str
+    device: FakeAircon
+    status: list[dict[str, Any]]
+    done: bool = False
+
+
+@dataclass
+class FakeCocoroServer:
+    """Serve a fake Cocoro API for a number of simulated aircons.
+
+    Attributes:
+        num_devices: Number of aircons on the account, one box each
+        latency: Seconds every response is delayed by
+        completion_delay: Seconds before an accepted control takes effect
+        require_login: Reject requests without a session cookie with 401
+        max_in_flight: Most requests that were being served at the same time
+        connections: Client addresses of the connections requests came in on
+
+    """
+
+    num_devices: int = 1
+    latency: float = 0.0
+    completion_delay: float = 0.5
+    require_login: bool = True
+    devices: dict[int, FakeAircon] = field(init=False)
+    calls: Counter[str] = field(init=False, default_factory=Counter)
+    max_in_flight: int = field(init=False, default=0)
+    connections: set[tuple[str, int]] = field(init=False, default_factory=set)
+    _in_flight: int = field(init=False, default=0)
+    _controls: dict[str, _Control] = field(init=False, default_factory=dict)
+    _sessions: set[str] = field(init=False, default_factory=set)
+    _server: TestServer | None = field(init=False, default=None)
+    _ids: itertools.count[int] = field(init=False, default_factory=itertools.count)
+
+    def __post_init__(self) -> None:
+        """Create the simulated devices."""
+        self.devices = {
+            1000 + i: FakeAircon(device_id=1000 + i, name=f"Aircon {i + 1}")
+            for i in range(self.num_devices)
+        }
+        self._boxes = {device.box_id: device for device in self.devices.values()}
+
+    async def __aenter__(self) -> FakeCocoroServer:
+        """Start the server."""
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info: object) -> None:
+        """Stop the server."""
+        await self.close()
+
+    @property
+    def api_base(self) -> str:
+        """Return the base URL to point ``Cocoro.api_base`` at."""
+        assert self._server is not None, "server not started"
+        return str(self._server.make_url(API_PATH))
+
+    async def start(self) -> None:
+        """Start serving on a free local port."""
+        app = web.Application(middlewares=[self._middleware])
+        app.router.add_post(f"{API_PATH}/setting/login/", self._login)
+        app.router.add_get(f"{API_PATH}/setting/boxInfo/", self._box_info)
+        app.router.add_get(f"{API_PATH}/control/deviceProperty", self._device_property)
+        app.router.add_post(f"{API_PATH}/control/deviceControl", self._device_control)
+        app.router.add_post(f"{API_PATH}/control/controlResult", self._control_result)
+        self._server = TestServer(app, host="127.0.0.1")
+        await self._server.start_server()
+
+    async def close(self) -> None:
+        """Stop serving."""
+        if self._server is not None:
+            await self._server.close()
+            self._server = None
+
+    def create_client(self, session: ClientSession) -> Cocoro:
+        """Return a ``Cocoro`` client that talks to this server."""
+        cocoro = Cocoro(app_secret=APP_SECRET, app_key=APP_KEY, session=session)
+        cocoro.api_base = self.api_base
+        return cocoro
+
+    def expire_sessions(self) -> None:
+        """Invalidate all logins, so the next request fails with 401."""
+        self._sessions.clear()
+
+    @web.middleware
+    async def _middleware(
+        self, request: web.Request, handler: Any
+    ) -> web.StreamResponse:
+        endpoint = request.path.removeprefix(API_PATH).strip("/")
+        self.calls[endpoint] += 1
+        if request.transport is not None:
+            self.connections.add(request.transport.get_extra_info("peername"))
+        self._in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self._in_flight)
+        try:
+            if self.latency:
+                await asyncio.sleep(self.latency)
+            if (
+                self.require_login
+                and endpoint != "setting/login"
+                and request.cookies.get(SESSION_COOKIE) not in self._sessions
+            ):
+                raise web.HTTPUnauthorized(text="401 unauthorized")
+            return await handler(request)
+        finally:
+            self._in_flight -= 1
+
+    async def _login(self, request: web.Request) -> web.Response:
+        if request.query.get("appSecret") != APP_SECRET:
+            raise web.HTTPUnauthorized(text="401 unauthorized")
+        session = secrets.token_hex(8)
+        self._sessions.add(session)
+        response = web.json_response({"errorCode": None})
+        response.set_cookie(SESSION_COOKIE, session)
+        return response
+
+    async def _box_info(self, request: web.Request) -> web.Response:
+        return web.json_response(
+            {"box": [device.box() for device in self.devices.values()]}
+        )
+
+    async def _device_property(self, request: web.Request) -> web.Response:
+        device = self._boxes[request.query["boxId"]]
+        return web.json_response({"deviceProperty": device.device_property()})
+
+    async def _device_control(self, request: web.Request) -> web.Response:
+        device = self._boxes[request.query["boxId"]]
+        body = await request.json()
+        control_list = []
+        for item in body["controlList"]:
+            control = _Control(f"ctl-{next(self._ids)}", device, item["status"])
+            self._controls[control.control_id] = control
+            asyncio.get_running_loop().call_later(
+                self.completion_delay, self._complete, control
+            )
+            control_list.append({"id": control.control_id, "errorCode": None})
+        return web.json_response({"controlList": control_list})
+
+    async def _control_result(self, request: web.Request) -> web.Response:
+        body = await request.json()
+        results = []
+        for item in body["resultList"]:
+            control = self._controls[item["id"]]
+            results.append(
+                {
+                    "id": control.control_id,
+                    "status": "success" if control.done else "wait",
+                    "message": None,
+                    "cancelled_by": None,
+                    "errorCode": None,
+                    "epc": "",
+                    "edt": "",
+                }
+            )
+        return web.json_response({"resultList": results})
+
+    def _complete(self, control: _Control) -> None:
+        for status in control.status:
+            control.device.apply(status)
+        control.done = True
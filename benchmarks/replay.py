@@ -0,0 +1,392 @@
+r"""Record Cocoro cloud responses into fixtures and replay them offline.
+
+A ``Recorder`` wraps the request methods of a ``sharp_cocoro.Cocoro`` client
+and keeps every response together with the time it was received. Secrets are
+dropped and identifiers of the account's boxes are replaced by stable
+pseudonyms before anything is stored, so fixtures can be committed. Device
+properties are only stored when they changed, which keeps a day of polling
+small.
+
+A ``Replayer`` serves a fixture to a client instead of the network. Device
+properties are answered with the last response recorded at or before the
+time of a ``ReplayClock``, so advancing the clock plays back the recorded
+state changes as fast as the integration can process them. Controls sent
+during the replay are accepted and complete on the first check, and their
+values are shown by the device until the recording reports newer state.
+
+Fixtures are JSON::
+
+    {
+        "version": 1,
+        "duration": <seconds>,
+        "frames": [
+            {
+                "t": <seconds since the recording started>,
+                "method": "GET" or "POST",
+                "endpoint": "control/deviceProperty",
+                "box": "box-1" or null,
+                "body": <request body> or null,
+                "response": <response>
+            }
+        ]
+    }
+
+Fixture files named ``.gz`` are gzipped. Record a fixture from an account
+with::
+
+    COCORO_APP_KEY=... COCORO_APP_SECRET=... \
+        python -m benchmarks.replay fixture.json.gz --hours 24 --interval 60
+
+Besides polling, the recorder sends every ``--control-interval`` seconds a
+control round-trip per air conditioner: it writes the fan speed the unit
+already runs at, which leaves it as it is, and checks the control until it
+completed. Replays send these controls again at their recorded times.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import bisect
+import gzip
+import itertools
+import json
+import os
+import time
+from collections import Counter
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+from urllib.parse import parse_qs
+from urllib.parse import urlsplit
+
+from aiohttp import ClientSession
+from sharp_cocoro import Aircon
+from sharp_cocoro import Cocoro
+from sharp_cocoro.state import State8
+
+FIXTURE_VERSION = 1
+
+ENDPOINT_LOGIN = "setting/login"
+ENDPOINT_BOXES = "setting/boxInfo"
+ENDPOINT_PROPERTIES = "control/deviceProperty"
+ENDPOINT_CONTROL = "control/deviceControl"
+ENDPOINT_CONTROL_RESULT = "control/controlResult"
+
+REDACTED = "**REDACTED**"
+
+# Values that identify the account and are never stored
+_SECRET_KEYS = frozenset({"terminalAppId", "appName", "zipCd", "yomi"})
+
+# Identifiers that link requests and responses, replaced by pseudonyms
+_PSEUDONYM_PREFIXES = {
+    "boxId": "box",
+    "echonetNode": "node",
+    "serialNumber": "serial",
+}
+
+
+class ReplayClock:
+    """Virtual time of a replay, in seconds since the recording started."""
+
+    def __init__(self, start: float = 0.0) -> None:
+        """Initialize the clock."""
+        self.now = start
+
+    def advance(self, seconds: float) -> None:
+        """Move the clock forward."""
+        self.now += seconds
+
+
+class Recorder:
+    """Record the responses a Cocoro client receives."""
+
+    def __init__(self, clock: Callable[[], float] | None = None) -> None:
+        """Initialize the recorder.
+
+        Args:
+            clock: Returns the time of a response; defaults to the seconds
+                since the recorder was created
+
+        """
+        if clock is None:
+            started = time.monotonic()
+
+            def clock() -> float:
+                return time.monotonic() - started
+
+        self._clock = clock
+        self.frames: list[dict[str, Any]] = []
+        self._last: dict[tuple[str, str | None], Any] = {}
+        self._pseudonyms: dict[tuple[str, str], str] = {}
+        self._counters: dict[str, itertools.count[int]] = {}
+
+    def attach(self, cocoro: Cocoro) -> None:
+        """Record every request the client sends from now on."""
+        send_get = cocoro.send_get_request
+        send_post = cocoro.send_post_request
+
+        async def send_get_request(path: str) -> dict[str, Any]:
+            response = await send_get(path)
+            self._record("GET", path, None, response)
+            return response
+
+        async def send_post_request(path: str, body: dict[str, Any]) -> dict[str, Any]:
+            response = await send_post(path, body)
+            self._record("POST", path, body, response)
+            return response
+
+        cocoro.send_get_request = send_get_request  # type: ignore[method-assign]
+        cocoro.send_post_request = send_post_request  # type: ignore[method-assign]
+
+    def fixture(self) -> dict[str, Any]:
+        """Return the recording as a fixture."""
+        return {
+            "version": FIXTURE_VERSION,
+            "duration": round(self._clock(), 3),
+            "frames": self.frames,
+        }
+
+    def save(self, path: Path) -> None:
+        """Write the recording to a fixture file, gzipped if named ``.gz``."""
+        text = json.dumps(self.fixture(), separators=(",", ":"))
+        if path.suffix == ".gz":
+            path.write_bytes(gzip.compress(text.encode()))
+        else:
+            path.write_text(text)
+
+    def _record(
+        self, method: str, path: str, body: dict[str, Any] | None, response: Any
+    ) -> None:
+        endpoint, box_id = _parse_path(path)
+        box = None if box_id is None else self._pseudonym("boxId", box_id)
+        response = self._redact(response)
+        if method == "GET":
+            # Polls mostly return what the previous one did
+            if self._last.get((endpoint, box)) == response:
+                return
+            self._last[(endpoint, box)] = response
+        self.frames.append(
+            {
+                "t": round(self._clock(), 3),
+                "method": method,
+                "endpoint": endpoint,
+                "box": box,
+                "body": None if body is None else self._redact(body),
+                "response": response,
+            }
+        )
+
+    def _redact(self, value: Any) -> Any:
+        if isinstance(value, dict):
+            return {key: self._redact_item(key, item) for key, item in value.items()}
+        if isinstance(value, list):
+            return [self._redact(item) for item in value]
+        return value
+
+    def _redact_item(self, key: str, value: Any) -> Any:
+        if key in _SECRET_KEYS:
+            return REDACTED
+        if key in _PSEUDONYM_PREFIXES and isinstance(value, str):
+            return self._pseudonym(key, value)
+        return self._redact(value)
+
+    def _pseudonym(self, key: str, value: str) -> str:
+        if (key, value) not in self._pseudonyms:
+            counter = self._counters.setdefault(key, itertools.count(1))
+            self._pseudonyms[(key, value)] = (
+                f"{_PSEUDONYM_PREFIXES[key]}-{next(counter)}"
+            )
+        return self._pseudonyms[(key, value)]
+
+
+class Replayer:
+    """Answer the requests of a Cocoro client from a fixture.
+
+    Attributes:
+        calls: Number of requests answered per endpoint
+        controls: Control requests recorded in the fixture, in order; a
+            replay can send them again at their recorded times
+
+    """
+
+    def __init__(self, fixture: dict[str, Any], clock: ReplayClock) -> None:
+        """Index the fixture for lookups by time."""
+        if fixture.get("version") != FIXTURE_VERSION:
+            raise ValueError(f"Unsupported fixture version: {fixture.get('version')}")
+        self.clock = clock
+        self.duration: float = fixture["duration"]
+        self.calls: Counter[str] = Counter()
+        self.controls: list[dict[str, Any]] = []
+        # Responses are kept as JSON text and decoded when served, like a
+        # response read from the network
+        self._times: dict[tuple[str, str | None], list[float]] = {}
+        self._responses: dict[tuple[str, str | None], list[str]] = {}
+        for frame in fixture["frames"]:
+            if frame["method"] == "GET":
+                key = (frame["endpoint"], frame["box"])
+                self._times.setdefault(key, []).append(frame["t"])
+                self._responses.setdefault(key, []).append(
+                    json.dumps(frame["response"])
+                )
+            elif frame["endpoint"] == ENDPOINT_CONTROL:
+                self.controls.append(frame)
+        # Values written by replayed controls, per box, with the time
+        self._overrides: dict[str, tuple[float, dict[str, Any]]] = {}
+        self._control_ids = itertools.count()
+
+    @classmethod
+    def load(cls, path: Path, clock: ReplayClock) -> Replayer:
+        """Load a fixture file, gzipped if named ``.gz``."""
+        if path.suffix == ".gz":
+            return cls(json.loads(gzip.decompress(path.read_bytes())), clock)
+        return cls(json.loads(path.read_text()), clock)
+
+    def attach(self, cocoro: Cocoro) -> None:
+        """Answer the client's requests from the fixture from now on."""
+        cocoro.send_get_request = self._async_get  # type: ignore[method-assign]
+        cocoro.send_post_request = self._async_post  # type: ignore[method-assign]
+
+    async def _async_get(self, path: str) -> dict[str, Any]:
+        endpoint, box = _parse_path(path)
+        self.calls[endpoint] += 1
+        key = (endpoint, box)
+        times = self._times[key]
+        # The first recorded response stands in for anything before it
+        index = max(bisect.bisect_right(times, self.clock.now) - 1, 0)
+        response = json.loads(self._responses[key][index])
+        if endpoint == ENDPOINT_PROPERTIES and box in self._overrides:
+            written_at, written = self._overrides[box]
+            if times[index] > written_at:
+                # The recording caught up with the device
+                del self._overrides[box]
+            else:
+                _apply_written(response["deviceProperty"]["status"], written)
+        return response
+
+    async def _async_post(self, path: str, body: dict[str, Any]) -> dict[str, Any]:
+        endpoint, box = _parse_path(path)
+        self.calls[endpoint] += 1
+        if endpoint == ENDPOINT_LOGIN:
+            return {"errorCode": None}
+        if endpoint == ENDPOINT_CONTROL:
+            assert box is not None
+            _, written = self._overrides.get(box, (0.0, {}))
+            control_list = []
+            for control in body["controlList"]:
+                for status in control["status"]:
+                    written.update(_written_values(status))
+                control_list.append(
+                    {"id": f"replay-{next(self._control_ids)}", "errorCode": None}
+                )
+            self._overrides[box] = (self.clock.now, written)
+            return {"controlList": control_list}
+        if endpoint == ENDPOINT_CONTROL_RESULT:
+            return {
+                "resultList": [
+                    {
+                        "id": item["id"],
+                        "status": "success",
+                        "message": None,
+                        "cancelled_by": None,
+                        "errorCode": None,
+                        "epc": "",
+                        "edt": "",
+                    }
+                    for item in body["resultList"]
+                ]
+            }
+        raise ValueError(f"Cannot replay POST {endpoint}")
+
+
+def _parse_path(path: str) -> tuple[str, str | None]:
+    """Return the endpoint and box ID of a request path."""
+    parts = urlsplit(path)
+    box_ids = parse_qs(parts.query).get("boxId")
+    return parts.path.strip("/"), box_ids[0] if box_ids else None
+
+
+def _written_values(status: dict[str, Any]) -> dict[str, Any]:
+    """Return the values a written status sets, keyed by what they replace.
+
+    State detail writes only set the target temperature or the fan
+    direction; temperature writes flag themselves in nibble 6, fan direction
+    writes use a template without that flag.
+    """
+    code = status["statusCode"]
+    if code != "FA":
+        return {code: status["valueSingle"]}
+    state = State8(status["valueBinary"]["code"])
+    if state.state[6] == "2":
+        return {"temperature": state.temperature}
+    return {"fan_direction": state.fan_direction}
+
+
+def _apply_written(reported: list[dict[str, Any]], written: dict[str, Any]) -> None:
+    """Show written values in a replayed status list."""
+    for status in reported:
+        code = status["statusCode"]
+        if code in written:
+            status["valueSingle"] = written[code]
+        elif code == "FA" and written.keys() & {"temperature", "fan_direction"}:
+            state = State8(status["valueBinary"]["code"])
+            if "temperature" in written:
+                state.temperature = written["temperature"]
+            if "fan_direction" in written:
+                state.fan_direction = written["fan_direction"]
+            status["valueBinary"] = {"code": state.state}
+
+
+async def _async_control_round_trip(cocoro: Cocoro, aircon: Aircon) -> None:
+    """Send a control that keeps the unit as it is and wait for it."""
+    aircon.queue_windspeed_update(aircon.get_windspeed())
+    response = await cocoro.execute_queued_updates(aircon)
+    control_ids = [control["id"] for control in response.get("controlList", [])]
+    if control_ids:
+        await cocoro.wait_for_control_completion(aircon, control_ids)
+
+
+async def _async_record(args: argparse.Namespace) -> None:
+    """Poll an account, send controls now and then and record the responses."""
+    recorder = Recorder()
+    async with ClientSession() as session:
+        cocoro = Cocoro(
+            app_secret=os.environ["COCORO_APP_SECRET"],
+            app_key=os.environ["COCORO_APP_KEY"],
+            session=session,
+        )
+        recorder.attach(cocoro)
+        await cocoro.login()
+        deadline = time.monotonic() + args.hours * 3600
+        next_control = time.monotonic()
+        try:
+            while time.monotonic() < deadline:
+                devices = await cocoro.query_devices()
+                if args.control_interval > 0 and time.monotonic() >= next_control:
+                    next_control += args.control_interval
+                    for device in devices:
+                        if isinstance(device, Aircon):
+                            await _async_control_round_trip(cocoro, device)
+                recorder.save(args.fixture)
+                await asyncio.sleep(args.interval)
+        finally:
+            recorder.save(args.fixture)
+    print(f"Recorded {len(recorder.frames)} frames to {args.fixture}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Record the devices of a Cocoro account into a replay fixture"
+    )
+    parser.add_argument("fixture", type=Path, help="file to write the fixture to")
+    parser.add_argument("--hours", type=float, default=24.0, help="how long to record")
+    parser.add_argument(
+        "--interval", type=float, default=60.0, help="seconds between polls"
+    )
+    parser.add_argument(
+        "--control-interval",
+        type=float,
+        default=3600.0,
+        help="seconds between control round-trips, 0 to only poll",
+    )
+    asyncio.run(_async_record(parser.parse_args()))
@@ -2,133 +2,52 @@
 
 from __future__ import annotations
 
+import asyncio
 import logging
-from dataclasses import dataclass
-from dataclasses import field
-from datetime import datetime
-from datetime import timedelta
 import traceback
+from datetime import datetime
+from importlib import import_module
+from typing import TYPE_CHECKING
+
+from .auth import AuthManager
+from .const import CONF_DEVICES
+from .const import CONF_KEY
+from .const import CONF_SECRET
+from .const import DOMAIN
+from .const import TOKEN_REFRESH_INTERVAL
+from .scheduler import DATA_SCHEDULER
+from .scheduler import CloudScheduler
+from .services import async_setup_services
+from .stats import ApiStats
 
-_LOGGER = logging.getLogger(__name__)
-_LOGGER.setLevel(logging.DEBUG)
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import Platform
+from homeassistant.core import HomeAssistant
+from homeassistant.core import callback
+from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers.event import async_track_time_interval
+from homeassistant.helpers.typing import ConfigType
 
-try:
-    _LOGGER.info("Importing Cocoro from sharp_cocoro")
+if TYPE_CHECKING:
     from sharp_cocoro import Cocoro
-    _LOGGER.info("Successfully imported Cocoro")
-except Exception as e:
-    _LOGGER.error("Failed to import Cocoro: %s", e)
-    _LOGGER.error("Traceback: %s", traceback.format_exc())
-    raise
-
-try:
-    _LOGGER.info("Importing Device from sharp_cocoro")
     from sharp_cocoro import Device
-    _LOGGER.info("Successfully imported Device")
-except Exception as e:
-    _LOGGER.error("Failed to import Device: %s", e)
-    _LOGGER.error("Traceback: %s", traceback.format_exc())
-    raise
 
-from .config_flow import CONF_KEY
-from .config_flow import CONF_SECRET
+    from .data import SharpCocoroData
+    from .discovery import FlowDiscovery
 
-from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import Platform
-from homeassistant.core import HomeAssistant
-from homeassistant.helpers.aiohttp_client import async_get_clientsession
-from homeassistant.helpers.event import async_track_time_interval
+_LOGGER = logging.getLogger(__name__)
 
 PLATFORMS: list[Platform] = [Platform.FAN, Platform.CLIMATE, Platform.SENSOR]
 
-CocoroConfigEntry = ConfigEntry[Cocoro]
-
-# Token refresh interval (30 minutes)
-TOKEN_REFRESH_INTERVAL = timedelta(minutes=30)
-
-
-@dataclass
-class SharpCocoroData:
-    """State container for Sharp Cocoro integration."""
-
-    cocoro: Cocoro
-    device: Device
-    hass: HomeAssistant
-    app_key: str = field(default="")
-    app_secret: str = field(default="")
-    last_login_time: datetime | None = field(default=None)
-
-    async def async_ensure_authenticated(self) -> bool:
-        """Ensure the client is authenticated, re-login if necessary."""
-        try:
-            # Check if we need to refresh the token proactively
-            if (
-                self.last_login_time
-                and (datetime.now() - self.last_login_time) > TOKEN_REFRESH_INTERVAL
-            ):
-                _LOGGER.info("Token refresh interval exceeded, re-authenticating")
-                await self.async_login()
-            return True
-        except Exception as e:
-            _LOGGER.error("Failed to ensure authentication: %s", e)
-            return False
-
-    async def async_login(self) -> None:
-        """Perform login to the Cocoro API."""
-        _LOGGER.info("Logging in to Sharp Cocoro API")
-        await self.cocoro.login()
-        self.last_login_time = datetime.now()
-        _LOGGER.info("Successfully logged in to Sharp Cocoro API")
-
-    async def async_refresh_data(self, _=None):
-        """Refresh device data with error handling."""
-        _LOGGER.info("Refreshing device data")
-
-        try:
-            devices = await self.cocoro.query_devices()
-            for device in devices:
-                if device.device_id == self.device.device_id:
-                    self.device = device
-                    _LOGGER.debug("Device refreshed from API")
-                    break
-
-            self.hass.bus.async_fire(
-                "sharp_cocoro.device_updated", {"device_id": self.device.device_id}
-            )
+CocoroConfigEntry = ConfigEntry["SharpCocoroData"]
+
+CONFIG_SCHEMA = cv.config_entry_only_config_schema(DOMAIN)
+
 
-        except Exception as e:
-            _LOGGER.error("Failed to refresh device data: %s", e)
-
-            # Try to re-authenticate on any error (including 401)
-            if (
-                "401" in str(e)
-                or "unauthorized" in str(e).lower()
-                or "authentication" in str(e).lower()
-            ):
-                _LOGGER.info("Authentication error detected, attempting to re-login")
-                try:
-                    await self.async_login()
-                    # Retry the refresh after re-authentication
-                    devices = await self.cocoro.query_devices()
-                    for device in devices:
-                        if device.device_id == self.device.device_id:
-                            self.device = device
-                            break
-
-                    self.hass.bus.async_fire(
-                        "sharp_cocoro.device_updated",
-                        {"device_id": self.device.device_id},
-                    )
-                    _LOGGER.info("Successfully refreshed data after re-authentication")
-
-                except Exception as retry_error:
-                    _LOGGER.error(
-                        "Failed to refresh data after re-authentication: %s",
-                        retry_error,
-                    )
-            else:
-                # For non-authentication errors, just log them
-                _LOGGER.error("Non-authentication error during refresh: %s", e)
+async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
+    """Register the services of the integration."""
+    async_setup_services(hass)
+    return True
 
 
 async def async_setup_entry(hass: HomeAssistant, entry: CocoroConfigEntry) -> bool:
@@ -137,72 +56,177 @@ async def async_setup_entry(hass: HomeAssistant, entry: CocoroConfigEntry) -> bo
     app_key = entry.data[CONF_KEY]
     _LOGGER.info("Initializing Sharp Cocoro Air with app key: %s", app_key)
 
-    # Get Home Assistant's managed aiohttp session
-    session = async_get_clientsession(hass)
-    _LOGGER.info("Got aiohttp session from Home Assistant")
+    # The client library is most of the cost of loading the integration, so
+    # it is only imported once an entry is set up, and off the event loop
+    await hass.async_add_import_executor_job(import_module, f"{__name__}.data")
+    from sharp_cocoro import Cocoro  # noqa: PLC0415
+
+    from .data import SharpCocoroData  # noqa: PLC0415
+    from .storage import DeviceSnapshotStore  # noqa: PLC0415
+
+    # All accounts share one scheduler: a connection pool, a cap on requests
+    # in flight and staggered poll times
+    scheduler = hass.data.setdefault(DATA_SCHEDULER, CloudScheduler())
+    start_offset = scheduler.async_register(entry.entry_id)
+
+    # Right after the config flow, its login and devices are taken over
+    discovery = _async_take_flow_discovery(hass, app_key)
 
     try:
-        _LOGGER.info("Creating Cocoro client with session")
-        # Create Cocoro client with HA's session to avoid SSL blocking
-        cocoro = Cocoro(app_secret=app_secret, app_key=app_key, session=session)
-        _LOGGER.info("Successfully created Cocoro client")
+        cocoro = Cocoro(
+            app_secret=app_secret,
+            app_key=app_key,
+            session=scheduler.async_create_session(
+                entry.entry_id,
+                cookie_jar=None if discovery is None else discovery.cookie_jar,
+            ),
+        )
     except Exception as e:
         _LOGGER.error("Failed to create Cocoro client: %s", e)
         _LOGGER.error("Traceback: %s", traceback.format_exc())
+        await _async_release_account(hass, entry)
         raise
 
+    # Entities are created from the last known state right away when we have
+    # it, the cloud is only contacted once setup has finished
+    snapshot_store = DeviceSnapshotStore(hass, entry.entry_id)
+    api_stats = ApiStats()
+    auth = AuthManager(cocoro, api_stats, limiter=scheduler.limiter)
+    aircons = await snapshot_store.async_load()
+    restored = aircons is not None
+
     try:
-        _LOGGER.info("Attempting login")
-        # Initial login
-        await cocoro.login()
-        _LOGGER.info("Login successful")
-        
-        _LOGGER.info("Querying devices")
-        devices = await cocoro.query_devices()
-        _LOGGER.info("Query devices successful, found %d devices", len(devices) if devices else 0)
-
-        if not devices:
-            _LOGGER.error("No devices found")
-            return False
-
-        device = devices[0]
-        _LOGGER.info("Discovered device: %s (ID: %s)", device.name, device.device_id)
+        if aircons is not None:
+            _LOGGER.info("Restored %d devices from the last session", len(aircons))
+        else:
+            aircons = await _async_find_devices(entry, cocoro, auth, discovery)
+            if not aircons:
+                _LOGGER.error("No devices found")
+                await _async_release_account(hass, entry)
+                return False
+            await snapshot_store.async_save(aircons)
 
         # Create data container with credentials for re-authentication
         scd = SharpCocoroData(
             cocoro=cocoro,
-            device=device,
+            devices=aircons,
             hass=hass,
             app_key=app_key,
             app_secret=app_secret,
-            last_login_time=datetime.now(),
+            api_stats=api_stats,
+            auth_manager=auth,
+            snapshot_store=snapshot_store,
+            scheduler=scheduler,
         )
 
-        # Set up periodic device refresh (every 15 seconds)
-        async_track_time_interval(hass, scd.async_refresh_data, timedelta(seconds=15))
+        # Poll the account's devices; entities are only notified on changes
+        entry.async_on_unload(scd.coordinator.async_shutdown)
 
         # Set up periodic token refresh (every 30 minutes)
-        async def async_refresh_token(_):
+        async def async_refresh_token(_: datetime) -> None:
             """Periodically refresh the authentication token."""
-            _LOGGER.info("Performing periodic token refresh")
+            _LOGGER.debug("Performing periodic token refresh")
             await scd.async_ensure_authenticated()
 
-        async_track_time_interval(hass, async_refresh_token, TOKEN_REFRESH_INTERVAL)
+        entry.async_on_unload(
+            async_track_time_interval(hass, async_refresh_token, TOKEN_REFRESH_INTERVAL)
+        )
+
+        # Refreshes and commands are logged as one summary per interval
+        entry.async_on_unload(
+            async_track_time_interval(
+                hass, scd.activity.async_log, scd.activity.interval
+            )
+        )
 
         entry.runtime_data = scd
         await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
 
-        return True
-
     except Exception as e:
         _LOGGER.error("Failed to set up Sharp Cocoro Air: %s", e)
         _LOGGER.error("Error type: %s", type(e))
         _LOGGER.error("Full traceback: %s", traceback.format_exc())
         # Clean up on failure
-        if 'cocoro' in locals() and hasattr(cocoro, "close"):
-            await cocoro.close()
+        await _async_release_account(hass, entry)
         return False
 
+    if not restored:
+        scd.coordinator.async_start(start_offset)
+        return True
+
+    entry.async_create_background_task(
+        hass,
+        _async_start_restored(hass, entry, scd, start_offset),
+        "sharp_cocoro startup",
+    )
+    return True
+
+
+async def _async_start_restored(
+    hass: HomeAssistant,
+    entry: CocoroConfigEntry,
+    scd: SharpCocoroData,
+    start_offset: float,
+) -> None:
+    """Log in and replace the restored device state with fresh data."""
+    # Accounts restored together log in one after another
+    await asyncio.sleep(start_offset)
+    try:
+        await scd.async_login()
+    except Exception as e:
+        # The coordinator logs in again when its first fetch gets a 401
+        _LOGGER.error("Failed to log in to Sharp Cocoro API: %s", e)
+
+    await scd.coordinator.async_refresh()
+    scd.coordinator.async_start()
+
+    # Devices added to the account since the snapshot need new entities,
+    # unless the user chose which devices to import
+    wanted = scd.coordinator.account_device_ids
+    if (selected := entry.data.get(CONF_DEVICES)) is not None:
+        wanted = wanted & set(selected)
+    if wanted - scd.devices.keys():
+        _LOGGER.info("New devices found on the account, reloading")
+        hass.config_entries.async_schedule_reload(entry.entry_id)
+
+
+@callback
+def _async_take_flow_discovery(
+    hass: HomeAssistant, app_key: str
+) -> FlowDiscovery | None:
+    """Return what the config flow found for the account, if it just ran."""
+    from .discovery import async_pop_flow_discovery  # noqa: PLC0415
+
+    return async_pop_flow_discovery(hass, app_key)
+
+
+async def _async_find_devices(
+    entry: CocoroConfigEntry,
+    cocoro: Cocoro,
+    auth: AuthManager,
+    discovery: FlowDiscovery | None,
+) -> dict[int, Device]:
+    """Return the devices to import, logging in and querying them if needed.
+
+    Right after the config flow, its login and the devices the user chose are
+    used as they are.
+    """
+    if discovery is not None:
+        _LOGGER.info("Using %d devices from the config flow", len(discovery.devices))
+        auth.adopt_login(discovery.logged_in_at)
+        return discovery.devices
+
+    from .data import async_discover_aircons  # noqa: PLC0415
+
+    devices = await async_discover_aircons(cocoro, auth)
+    if (selected := entry.data.get(CONF_DEVICES)) is None:
+        return devices
+    return {
+        device_id: device
+        for device_id, device in devices.items()
+        if device_id in selected
+    }
+
 
 async def async_unload_entry(hass: HomeAssistant, entry: CocoroConfigEntry) -> bool:
     """Unload a config entry."""
@@ -214,11 +238,26 @@ async def async_unload_entry(hass: HomeAssistant, entry: CocoroConfigEntry) -> b
     # Clean up the Cocoro client
     if unload_ok and entry.runtime_data:
         scd = entry.runtime_data
-        if hasattr(scd.cocoro, "close"):
-            try:
-                await scd.cocoro.close()
-                _LOGGER.info("Cocoro client closed successfully")
-            except Exception as e:
-                _LOGGER.error("Error closing Cocoro client: %s", e)
+        for batcher in scd.write_batchers.values():
+            await batcher.async_shutdown()
+        for debouncer in scd.refresh_debouncers.values():
+            debouncer.async_shutdown()
+        await scd.completion_tracker.async_shutdown()
+        await _async_release_account(hass, entry)
 
     return unload_ok
+
+
+async def _async_release_account(hass: HomeAssistant, entry: CocoroConfigEntry) -> None:
+    """Unregister an account; the scheduler goes with the last one."""
+    scheduler = hass.data[DATA_SCHEDULER]
+    if await scheduler.async_unregister(entry.entry_id):
+        del hass.data[DATA_SCHEDULER]
+
+
+async def async_remove_entry(hass: HomeAssistant, entry: CocoroConfigEntry) -> None:
+    """Remove the stored device snapshot of a deleted config entry."""
+    await hass.async_add_import_executor_job(import_module, f"{__name__}.storage")
+    from .storage import DeviceSnapshotStore  # noqa: PLC0415
+
+    await DeviceSnapshotStore(hass, entry.entry_id).async_remove()
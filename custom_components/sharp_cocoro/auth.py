@@ -0,0 +1,172 @@
+"""Authentication handling for the Sharp Cocoro Air integration."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections.abc import Awaitable
+from collections.abc import Callable
+from contextlib import AbstractAsyncContextManager
+from contextlib import nullcontext
+from datetime import timedelta
+from typing import TYPE_CHECKING
+from typing import TypeVar
+
+from .const import API_LOGIN
+from .const import TOKEN_REFRESH_INTERVAL
+from .errors import ErrorCategory
+from .errors import classify_error
+from .scheduler import REQUEST_PRIORITIES
+from .scheduler import RequestLimiter
+from .stats import ApiStats
+from .stats import control_ids
+
+if TYPE_CHECKING:
+    from sharp_cocoro import Cocoro
+
+_LOGGER = logging.getLogger(__name__)
+
+_T = TypeVar("_T")
+
+
+class AuthManager:
+    """Own the login session of a Cocoro account.
+
+    Logins are serialized behind a lock and every login starts a new session
+    generation. Callers remember the generation their request was sent with;
+    if that request is rejected and somebody else has logged in meanwhile, the
+    fresh session is reused instead of logging in again. Requests rejected
+    with an authentication error are replayed once after that.
+
+    Every request, logins included, is sent while holding a slot of
+    ``limiter``, at the priority of its kind of call.
+    """
+
+    def __init__(
+        self,
+        cocoro: Cocoro,
+        api_stats: ApiStats,
+        refresh_interval: timedelta = TOKEN_REFRESH_INTERVAL,
+        limiter: RequestLimiter | None = None,
+    ) -> None:
+        """Initialize the manager."""
+        self._cocoro = cocoro
+        self._limiter = limiter
+        self._api_stats = api_stats
+        self._refresh_interval = refresh_interval.total_seconds()
+        self._lock = asyncio.Lock()
+        self._session = 0
+        self._logged_in_at: float | None = None
+
+    @property
+    def logged_in(self) -> bool:
+        """Return True once a login succeeded."""
+        return self._logged_in_at is not None
+
+    @property
+    def session_age(self) -> float | None:
+        """Return the seconds since the last successful login."""
+        if self._logged_in_at is None:
+            return None
+        return time.monotonic() - self._logged_in_at
+
+    def as_dict(self) -> dict[str, object]:
+        """Return the session state for diagnostics."""
+        age = self.session_age
+        return {
+            "logged_in": self.logged_in,
+            "session": self._session,
+            "session_age": None if age is None else round(age),
+            "refresh_in": (
+                None if age is None else round(max(0.0, self._refresh_interval - age))
+            ),
+            "login_in_progress": self._lock.locked(),
+        }
+
+    async def async_login(self, stale_session: int | None = None) -> None:
+        """Log in to the Cocoro API.
+
+        Args:
+            stale_session: Generation of the session a failed request used;
+                the login is skipped if a newer session exists already
+
+        """
+        async with self._lock:
+            if stale_session is not None and stale_session != self._session:
+                _LOGGER.debug("Reusing session from a concurrent login")
+                return
+
+            _LOGGER.debug("Logging in to Sharp Cocoro API")
+            async with self._slot(API_LOGIN):
+                with self._api_stats.track(API_LOGIN):
+                    await self._cocoro.login()
+            self._session += 1
+            self._logged_in_at = time.monotonic()
+            _LOGGER.debug("Successfully logged in to Sharp Cocoro API")
+
+    def adopt_login(self, logged_in_at: float) -> None:
+        """Take over a login the client's session holds already.
+
+        Args:
+            logged_in_at: Monotonic time of that login
+
+        """
+        self._session += 1
+        self._logged_in_at = logged_in_at
+
+    async def async_ensure_fresh(self) -> None:
+        """Log in again if the session is older than the refresh interval."""
+        age = self.session_age
+        if age is None or age < self._refresh_interval:
+            return
+        _LOGGER.debug("Token refresh interval exceeded, re-authenticating")
+        await self.async_login(self._session)
+
+    async def async_call(
+        self,
+        name: str,
+        request: Callable[[], Awaitable[_T]],
+        device_id: int | None = None,
+    ) -> _T:
+        """Run a tracked API request, logging in and replaying it once on 401.
+
+        Args:
+            name: API call name the request is tracked under
+            request: Function starting the request; called again for the replay
+            device_id: ID of the device the request is about, for the call log
+
+        Raises:
+            Exception: Whatever the request or the login raised
+
+        """
+        session = self._session
+        try:
+            return await self._async_request(name, request, device_id)
+        except Exception as e:
+            if classify_error(e) is not ErrorCategory.AUTH:
+                raise
+            _LOGGER.info("Authentication error during %s, logging in again", name)
+
+        self._api_stats.record_retry(name)
+        await self.async_login(session)
+        return await self._async_request(name, request, device_id)
+
+    async def _async_request(
+        self,
+        name: str,
+        request: Callable[[], Awaitable[_T]],
+        device_id: int | None,
+    ) -> _T:
+        """Send a request once a slot is free; only the request is timed."""
+        async with self._slot(name):
+            with self._api_stats.track(name, device_id) as record:
+                result = await request()
+                record.control_ids = control_ids(result)
+                return result
+
+    def _slot(self, name: str) -> AbstractAsyncContextManager[None]:
+        """Return the limiter slot a call has to hold while it is sent."""
+        if self._limiter is None:
+            return nullcontext()
+        return self._limiter.slot(REQUEST_PRIORITIES[name])
@@ -0,0 +1,169 @@
+"""Write batching for the Sharp Cocoro Air integration."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections.abc import Awaitable
+from collections.abc import Callable
+from dataclasses import dataclass
+from dataclasses import field
+from datetime import timedelta
+from enum import StrEnum
+
+from sharp_cocoro.devices.aircon.aircon_properties import StatusCode
+from sharp_cocoro.properties import PropertyStatus
+
+from .const import WRITE_BATCH_WINDOW
+
+from homeassistant.core import HomeAssistant
+
+_LOGGER = logging.getLogger(__name__)
+
+WriteStateCallback = Callable[[], None]
+
+
+class WriteOutcome(StrEnum):
+    """How a sent write ended for the commands it carried."""
+
+    # The controls completed, or the cloud returned none to wait for
+    COMPLETED = "completed"
+    # The controls failed, or checking them did; the write was rolled back
+    FAILED = "failed"
+    # The controls did not complete in time; the write was rolled back
+    TIMEOUT = "timeout"
+
+
+FlushCallback = Callable[
+    [dict[str, PropertyStatus], list[WriteStateCallback], list[int]],
+    Awaitable[WriteOutcome],
+]
+
+# Status codes that carry several settings, of which a write only changes
+# one: target temperature and fan direction are both written as state detail
+_UNMERGEABLE_CODES = frozenset({StatusCode.STATE_DETAIL})
+
+
+@dataclass(slots=True)
+class _Batch:
+    """Updates that go out together, and who waits for them."""
+
+    updates: dict[str, PropertyStatus] = field(default_factory=dict)
+    write_states: list[WriteStateCallback] = field(default_factory=list)
+    tokens: list[int] = field(default_factory=list)
+    waiters: list[asyncio.Future[WriteOutcome]] = field(default_factory=list)
+
+    def accepts(self, updates: dict[str, PropertyStatus]) -> bool:
+        """Return False if merging would drop a setting of another write."""
+        return not any(
+            code in self.updates and self.updates[code] != status
+            for code, status in updates.items()
+            if code in _UNMERGEABLE_CODES
+        )
+
+
+class DeviceWriteBatcher:
+    """Merge property updates for one device into a single cloud write.
+
+    Updates submitted within ``window`` of each other are merged, with later
+    values for the same status code winning, and sent with one call to
+    ``flush``. Two different state detail writes (e.g. a target temperature
+    and a fan direction) are never merged, as the later one would replace
+    the earlier; the later one goes out with the next batch instead.
+    Batches for a device are sent one after another; updates that arrive
+    while a batch is in flight are collected into the next one. Every
+    submitter waits for the batch that carried its updates and receives that
+    batch's outcome or exception. The tokens of the submitters' pending
+    values are handed to ``flush`` with the batch, which settles them.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        flush: FlushCallback,
+        window: timedelta = WRITE_BATCH_WINDOW,
+    ) -> None:
+        """Initialize the batcher."""
+        self.hass = hass
+        self._flush = flush
+        self._window = window.total_seconds()
+        # Batches not sent yet; only the last one takes new updates
+        self._batches: list[_Batch] = []
+        self._task: asyncio.Task[None] | None = None
+
+    async def async_submit(
+        self,
+        updates: dict[str, PropertyStatus],
+        write_state: WriteStateCallback,
+        token: int | None = None,
+    ) -> WriteOutcome:
+        """Queue updates and wait until the batch carrying them was sent.
+
+        Args:
+            updates: Property updates keyed by status code
+            write_state: Function to update HA state of the submitting entity
+            token: Token of the pending values the updates were shown with
+
+        Returns:
+            The outcome of the batch that carried the updates
+
+        """
+        if not self._batches or not self._batches[-1].accepts(updates):
+            self._batches.append(_Batch())
+        batch = self._batches[-1]
+        batch.updates.update(updates)
+        if write_state not in batch.write_states:
+            batch.write_states.append(write_state)
+        if token is not None:
+            batch.tokens.append(token)
+
+        waiter: asyncio.Future[WriteOutcome] = self.hass.loop.create_future()
+        batch.waiters.append(waiter)
+
+        if self._task is None:
+            self._task = self.hass.async_create_task(
+                self._async_run(), "sharp_cocoro write batch"
+            )
+
+        return await waiter
+
+    async def async_shutdown(self) -> None:
+        """Cancel pending batches and fail their submitters."""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        for batch in self._batches:
+            for waiter in batch.waiters:
+                if not waiter.done():
+                    waiter.cancel()
+        self._batches = []
+
+    async def _async_run(self) -> None:
+        """Send batches until nothing is pending anymore."""
+        try:
+            while self._batches:
+                await asyncio.sleep(self._window)
+
+                batch = self._batches.pop(0)
+
+                if len(batch.waiters) > 1:
+                    _LOGGER.debug(
+                        "Merged %d commands into one write: %s",
+                        len(batch.waiters),
+                        list(batch.updates),
+                    )
+
+                try:
+                    outcome = await self._flush(
+                        batch.updates, batch.write_states, batch.tokens
+                    )
+                except Exception as err:
+                    for waiter in batch.waiters:
+                        if not waiter.done():
+                            waiter.set_exception(err)
+                else:
+                    for waiter in batch.waiters:
+                        if not waiter.done():
+                            waiter.set_result(outcome)
+        finally:
+            self._task = None
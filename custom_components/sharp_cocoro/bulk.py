@@ -0,0 +1,202 @@
+"""Bulk state changes across devices for the Sharp Cocoro Air integration."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections.abc import Callable
+from collections.abc import Sequence
+from dataclasses import dataclass
+from functools import partial
+from typing import TYPE_CHECKING
+
+from .batcher import WriteOutcome
+from .climate import FANMODE_WINDSPEED_MAPPING
+from .climate import HVAC_MODE_OPERATION_MODE
+from .climate import SWING_FANDIRECTION_MAPPING
+from .const import APPLY_STATE_CONCURRENCY
+from .const import PROP_FAN_DIRECTION
+from .const import PROP_OPERATION_MODE
+from .const import PROP_POWER
+from .const import PROP_TEMPERATURE
+from .const import PROP_WINDSPEED
+from .coordinator import async_notify_device_updated
+from .coordinator import execute_and_refresh
+from .errors import CloudUnavailableError
+from .errors import classify_error
+from .snapshot import DeviceSnapshot
+
+from homeassistant.components.climate.const import HVACMode
+from homeassistant.core import callback
+from homeassistant.exceptions import HomeAssistantError
+
+if TYPE_CHECKING:
+    from sharp_cocoro import Aircon
+
+    from .data import SharpCocoroData
+
+_LOGGER = logging.getLogger(__name__)
+
+# Properties a bulk write can change; entities are told about all of them
+_WRITTEN_PROPERTIES = sorted(
+    {
+        PROP_POWER,
+        PROP_OPERATION_MODE,
+        PROP_TEMPERATURE,
+        PROP_WINDSPEED,
+        PROP_FAN_DIRECTION,
+    }
+)
+
+_OUTCOME_ERRORS = {
+    WriteOutcome.FAILED: "Write failed",
+    WriteOutcome.TIMEOUT: "Write timed out",
+}
+
+QueueWrite = Callable[["Aircon"], None]
+
+
+@dataclass(frozen=True, slots=True)
+class TargetState:
+    """State to bring devices to; unset fields are left as they are."""
+
+    hvac_mode: HVACMode | None = None
+    temperature: float | None = None
+    fan_mode: str | None = None
+    swing_mode: str | None = None
+
+    def writes(self, state: DeviceSnapshot) -> list[QueueWrite]:
+        """Return the writes that bring a device in ``state`` to this target.
+
+        Target temperature and fan direction share one status code, so a
+        swing mode goes out as a write of its own after the others.
+        """
+        if self.hvac_mode == HVACMode.OFF:
+            return [lambda device: device.queue_power_off()]
+
+        writes: list[QueueWrite] = []
+        if (
+            self.hvac_mode is not None
+            or self.temperature is not None
+            or self.fan_mode is not None
+        ):
+            writes.append(partial(self._queue_main, state))
+        if (
+            self.swing_mode is not None
+            and (fan_direction := SWING_FANDIRECTION_MAPPING.get(self.swing_mode))
+            is not None
+        ):
+            writes.append(
+                lambda device: device.queue_fan_direction_update(fan_direction.value)
+            )
+        return writes
+
+    def _queue_main(self, state: DeviceSnapshot, device: Aircon) -> None:
+        """Queue power, operation mode, temperature and fan speed."""
+        if self.hvac_mode is not None or self.temperature is not None:
+            # Like the climate entity, the mode and temperature are always
+            # sent together with power on
+            device.queue_power_on()
+            temperature = (
+                state.temperature if self.temperature is None else self.temperature
+            )
+            if temperature is not None:
+                device.queue_temperature_update(temperature)
+            operation_mode = state.operation_mode
+            if self.hvac_mode is not None:
+                operation_mode = HVAC_MODE_OPERATION_MODE.get(
+                    self.hvac_mode, operation_mode
+                )
+            if operation_mode:
+                device.queue_operation_mode_update(operation_mode)
+        if self.fan_mode is not None:
+            device.queue_windspeed_update(FANMODE_WINDSPEED_MAPPING[self.fan_mode])
+
+
+async def async_apply_state(
+    targets: Sequence[tuple[SharpCocoroData, int]],
+    target: TargetState,
+    max_concurrent: int = APPLY_STATE_CONCURRENCY,
+) -> list[str | None]:
+    """Bring devices to a target state, a bounded number at a time.
+
+    Every device gets its updates queued and sent through its write batcher
+    like a command from its entities, with the values shown optimistically
+    right away. Writes to at most ``max_concurrent`` devices are in flight at
+    once. Once all of them finished, every account involved is refreshed
+    once, instead of once per device.
+
+    Args:
+        targets: Runtime data of the account and ID of each device
+        target: State to bring the devices to
+        max_concurrent: Devices written to at once
+
+    Returns:
+        The error of each device in the order of ``targets``, None where the
+        write was sent and its controls completed. Errors of cloud calls are
+        reported by category only, as their messages may carry the request
+        URL with the app secret
+
+    """
+    if not targets:
+        return []
+
+    hass = targets[0][0].hass
+    semaphore = asyncio.Semaphore(max_concurrent)
+
+    async def _async_apply(
+        cocoro_data: SharpCocoroData, device_id: int
+    ) -> WriteOutcome:
+        device = cocoro_data.devices[device_id]
+
+        @callback
+        def _async_write_state() -> None:
+            async_notify_device_updated(hass, device_id, _WRITTEN_PROPERTIES)
+
+        async with semaphore:
+            for queue in target.writes(cocoro_data.device_state(device_id)):
+                queue(device)
+                # Failed or timed out controls are rolled back instead of
+                # raising; a swing write does not follow a failed one
+                outcome = await execute_and_refresh(
+                    device, cocoro_data, _async_write_state, device.name
+                )
+                if outcome is not WriteOutcome.COMPLETED:
+                    return outcome
+        return WriteOutcome.COMPLETED
+
+    results = await asyncio.gather(
+        *(_async_apply(cocoro_data, device_id) for cocoro_data, device_id in targets),
+        return_exceptions=True,
+    )
+
+    accounts = {id(cocoro_data): cocoro_data for cocoro_data, _ in targets}
+    await asyncio.gather(
+        *(
+            cocoro_data.async_refresh_data(fresh=True)
+            for cocoro_data in accounts.values()
+        )
+    )
+
+    errors: list[str | None] = []
+    for result in results:
+        if isinstance(result, BaseException):
+            errors.append(_error_category(result))
+        else:
+            errors.append(_OUTCOME_ERRORS.get(result))
+    _LOGGER.debug(
+        "Applied state to %d of %d devices",
+        errors.count(None),
+        len(targets),
+    )
+    return errors
+
+
+def _error_category(err: BaseException) -> str:
+    """Return the category of the error a device write failed with."""
+    # Commands wrap the error of the cloud call
+    if isinstance(err, HomeAssistantError) and err.__cause__ is not None:
+        err = err.__cause__
+    if isinstance(err, CloudUnavailableError):
+        return "unavailable"
+    return classify_error(err).value
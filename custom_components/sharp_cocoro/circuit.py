@@ -0,0 +1,135 @@
+"""Circuit breaker for the Sharp Cocoro Air integration."""
+
+from __future__ import annotations
+
+import logging
+import time
+from datetime import timedelta
+from enum import StrEnum
+
+from .const import CIRCUIT_FAILURE_THRESHOLD
+from .const import CIRCUIT_RESET_TIMEOUT
+from .const import MAX_BACKOFF_INTERVAL
+from .errors import RETRY_POLICIES
+from .errors import ErrorCategory
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class CircuitState(StrEnum):
+    """States of the circuit breaker."""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """Stop calling the cloud while it keeps failing.
+
+    - Closed: calls go through; ``failure_threshold`` consecutive failures
+      that count towards the circuit open it.
+    - Open: calls are rejected without touching the network until
+      ``reset_timeout`` has passed.
+    - Half open: a single probe call is let through. If it succeeds the
+      circuit closes, otherwise it opens again for twice as long, up to
+      ``max_reset_timeout``.
+    """
+
+    def __init__(
+        self,
+        *,
+        failure_threshold: int = CIRCUIT_FAILURE_THRESHOLD,
+        reset_timeout: timedelta = CIRCUIT_RESET_TIMEOUT,
+        max_reset_timeout: timedelta = MAX_BACKOFF_INTERVAL,
+    ) -> None:
+        """Initialize the breaker."""
+        self._failure_threshold = failure_threshold
+        self._reset_timeout = reset_timeout.total_seconds()
+        self._max_reset_timeout = max_reset_timeout.total_seconds()
+
+        self.state = CircuitState.CLOSED
+        self.failures = 0
+        self.last_category: ErrorCategory | None = None
+        self._open_for = self._reset_timeout
+        self._opened_at = 0.0
+
+    @property
+    def closed(self) -> bool:
+        """Return True while calls go through normally."""
+        return self.state is CircuitState.CLOSED
+
+    @property
+    def retry_in(self) -> float:
+        """Return the seconds until a probe is let through."""
+        if self.state is not CircuitState.OPEN:
+            return 0.0
+        return max(0.0, self._opened_at + self._open_for - time.monotonic())
+
+    def allow_request(self) -> bool:
+        """Return True if a call may be sent now."""
+        if self.state is CircuitState.CLOSED:
+            return True
+        if self.state is CircuitState.OPEN and self.retry_in == 0.0:
+            _LOGGER.info("Circuit half open, probing the Sharp Cocoro cloud")
+            self.state = CircuitState.HALF_OPEN
+            return True
+        # Open, or a probe is already in flight
+        return False
+
+    def record_success(self) -> None:
+        """Record a successful call."""
+        if self.state is not CircuitState.CLOSED:
+            _LOGGER.info("Sharp Cocoro cloud reachable again, circuit closed")
+        self.state = CircuitState.CLOSED
+        self.failures = 0
+        self._open_for = self._reset_timeout
+
+    def record_failure(
+        self, category: ErrorCategory, retry_after: float | None = None
+    ) -> None:
+        """Record a call that failed after its retries."""
+        policy = RETRY_POLICIES[category]
+        if not (policy.trips_circuit or policy.opens_circuit):
+            if self.state is CircuitState.HALF_OPEN:
+                # The cloud answered, it just did not like the request
+                self.record_success()
+            return
+        if self.state is CircuitState.HALF_OPEN:
+            # A failed probe means the outage is still going on
+            self._open_for = min(self._open_for * 2, self._max_reset_timeout)
+            self._open(category, retry_after)
+            return
+
+        self.failures += 1
+        if policy.opens_circuit or self.failures >= self._failure_threshold:
+            self._open(category, retry_after)
+
+    def abort_probe(self) -> None:
+        """Let the next call probe again when a probe ended without a result."""
+        if self.state is CircuitState.HALF_OPEN:
+            self.state = CircuitState.OPEN
+
+    def _open(self, category: ErrorCategory, retry_after: float | None) -> None:
+        """Open the circuit."""
+        if retry_after is not None:
+            self._open_for = min(
+                max(self._open_for, retry_after), self._max_reset_timeout
+            )
+        _LOGGER.warning(
+            "Sharp Cocoro cloud failing (%s), pausing requests for %.0f seconds",
+            category,
+            self._open_for,
+        )
+        self.state = CircuitState.OPEN
+        self.last_category = category
+        self._opened_at = time.monotonic()
+
+    def as_dict(self) -> dict[str, object]:
+        """Return the breaker state for diagnostics."""
+        return {
+            "state": self.state,
+            "failures": self.failures,
+            "last_category": self.last_category,
+            "retry_in": round(self.retry_in, 1),
+        }
@@ -1,20 +1,24 @@
 """Climate platform for Sharp Cocoro Air."""
 
-import asyncio
 import logging
-from functools import wraps
+from typing import TYPE_CHECKING
 from typing import Any
 from typing import ClassVar
 
-from sharp_cocoro import Aircon
-from sharp_cocoro import Cocoro
 from sharp_cocoro.devices.aircon.aircon_properties import FanDirection
-from sharp_cocoro.devices.aircon.aircon_properties import StatusCode
 from sharp_cocoro.devices.aircon.aircon_properties import ValueSingle
 
-from . import SharpCocoroData
 from .const import DOMAIN
+from .const import PROP_FAN_DIRECTION
+from .const import PROP_OPERATION_MODE
+from .const import PROP_POWER
+from .const import PROP_ROOM_TEMPERATURE
+from .const import PROP_TEMPERATURE
+from .const import PROP_WINDSPEED
+from .const import SIGNAL_DEVICE_UPDATED
 from .coordinator import execute_and_refresh as shared_execute_and_refresh
+from .data import SharpCocoroData
+from .snapshot import DeviceSnapshot
 
 from homeassistant.components.climate import ClimateEntity
 from homeassistant.components.climate.const import FAN_AUTO
@@ -27,37 +31,16 @@ from homeassistant.components.climate.const import HVACMode
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import UnitOfTemperature
 from homeassistant.core import HomeAssistant
+from homeassistant.core import callback
 from homeassistant.helpers.device_registry import DeviceInfo
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 
-_LOGGER = logging.getLogger(__name__)
-_LOGGER.setLevel(logging.DEBUG)
-
-
-def debounce(wait_time):
-    """Debounce a function for a specified amount of time."""
-
-    def decorator(fn):
-        pending_task = None
-
-        @wraps(fn)
-        async def debounced(*args, **kwargs):
-            nonlocal pending_task
-
-            # Cancel any existing task
-            if pending_task is not None and not pending_task.done():
-                pending_task.cancel()
-
-            # Create a new task with delay
-            async def delayed_call():
-                await asyncio.sleep(wait_time)
-                await fn(*args, **kwargs)
-
-            pending_task = asyncio.create_task(delayed_call())
-
-        return debounced
+if TYPE_CHECKING:
+    from sharp_cocoro import Aircon
+    from sharp_cocoro import Cocoro
 
-    return decorator
+_LOGGER = logging.getLogger(__name__)
 
 
 async def async_setup_entry(
@@ -66,10 +49,13 @@ async def async_setup_entry(
     """Set up the Sharp Cocoro Air fan platform."""
     cocoro_device = entry.runtime_data
     assert isinstance(cocoro_device, SharpCocoroData)
-    async_add_entities([SharpCocoroAircon(cocoro_device)])
+    async_add_entities(
+        SharpCocoroAircon(cocoro_device, device_id)
+        for device_id in cocoro_device.devices
+    )
 
 
-FANDIRECTION_SWING_MAPPING = {
+FANDIRECTION_SWING_MAPPING: dict[FanDirection | None, str] = {
     FanDirection.FAN_DIRECTION_AUTO: "Auto",
     FanDirection.FAN_DIRECTION_1: "Top",
     FanDirection.FAN_DIRECTION_2: "High",
@@ -79,7 +65,7 @@ FANDIRECTION_SWING_MAPPING = {
     FanDirection.FAN_DIRECTION_SWING: "Swing",
 }
 
-WINDSPEED_FANMODE_MAPPING = {
+WINDSPEED_FANMODE_MAPPING: dict[ValueSingle | None, str] = {
     ValueSingle.WINDSPEED_LEVEL_AUTO: FAN_AUTO,
     ValueSingle.WINDSPEED_LEVEL_1: FAN_LOW,
     ValueSingle.WINDSPEED_LEVEL_2: FAN_LOW,
@@ -122,27 +108,79 @@ SUPPORTED_FEATURES_NO_TEMPERATURE = (
     | ClimateEntityFeature.SWING_MODE
 )
 
+# Operation modes without a target temperature
+NO_TEMPERATURE_OPERATION_MODES = frozenset(
+    {
+        ValueSingle.OPERATION_AUTO,
+        ValueSingle.OPERATION_DEHUMIDIFY,
+        ValueSingle.OPERATION_VENTILATION,
+    }
+)
+
+OPERATION_MODE_HVAC_MODE: dict[ValueSingle | None, HVACMode] = {
+    ValueSingle.OPERATION_HEAT: HVACMode.HEAT,
+    ValueSingle.OPERATION_COOL: HVACMode.COOL,
+    ValueSingle.OPERATION_AUTO: HVACMode.AUTO,
+    ValueSingle.OPERATION_DEHUMIDIFY: HVACMode.DRY,
+    ValueSingle.OPERATION_VENTILATION: HVACMode.FAN_ONLY,
+}
+
+HVAC_MODE_OPERATION_MODE = {
+    hvac_mode: operation_mode
+    for operation_mode, hvac_mode in OPERATION_MODE_HVAC_MODE.items()
+}
+
+OPERATION_MODE_HVAC_ACTION: dict[ValueSingle | None, HVACAction] = {
+    ValueSingle.OPERATION_HEAT: HVACAction.HEATING,
+    ValueSingle.OPERATION_COOL: HVACAction.COOLING,
+    ValueSingle.OPERATION_DEHUMIDIFY: HVACAction.DRYING,
+    ValueSingle.OPERATION_VENTILATION: HVACAction.FAN,
+    ValueSingle.OPERATION_AUTO: HVACAction.IDLE,
+    ValueSingle.OPERATION_OTHER: HVACAction.FAN,
+}
+
+SWING_MODES = list(FANDIRECTION_SWING_MAPPING.values())
+
+SWING_FANDIRECTION_MAPPING = {
+    swing_mode: fan_direction
+    for fan_direction, swing_mode in FANDIRECTION_SWING_MAPPING.items()
+}
+
 
 class SharpCocoroAircon(ClimateEntity):
     """Representation of a Sharp Cocoro Air air conditioner."""
 
+    # Properties whose changes are reflected in this entity's state
+    _watched_properties: ClassVar[frozenset[str]] = frozenset(
+        {
+            PROP_POWER,
+            PROP_OPERATION_MODE,
+            PROP_TEMPERATURE,
+            PROP_WINDSPEED,
+            PROP_FAN_DIRECTION,
+            PROP_ROOM_TEMPERATURE,
+        }
+    )
     _attr_fan_modes: ClassVar[list[str]] = [FAN_LOW, FAN_MEDIUM, FAN_HIGH, FAN_AUTO]
+    _attr_should_poll = False
     _attr_temperature_unit = UnitOfTemperature.CELSIUS
     _attr_target_temperature_step = 0.5
     _attr_supported_features = SUPPORTED_FEATURES
     _attr_hvac_modes = HVAC_MODES
+    _attr_swing_modes = SWING_MODES
 
     @property
-    def _device(self) -> Aircon:
-        return self._cocoro_data.device
+    def _device(self) -> "Aircon":
+        return self._cocoro_data.devices[self._device_id]
 
     @property
-    def _cocoro(self) -> Cocoro:
+    def _cocoro(self) -> "Cocoro":
         return self._cocoro_data.cocoro
 
-    def __init__(self, cocoro_data: SharpCocoroData):
+    def __init__(self, cocoro_data: SharpCocoroData, device_id: int):
         """Initialize the fan."""
         self._cocoro_data = cocoro_data
+        self._device_id = device_id
 
         self._attr_name = self._device.name
         self._attr_unique_id = str(self._device.device_id)
@@ -155,51 +193,64 @@ class SharpCocoroAircon(ClimateEntity):
             serial_number=self._device.serial_number,
         )
 
-        self._attr_swing_modes = list(FANDIRECTION_SWING_MAPPING.values())
+    @property
+    def _state(self) -> DeviceSnapshot:
+        """Return the decoded device state, including writes in flight."""
+        return self._cocoro_data.device_state(self._device_id)
+
+    def _queue_current_operation_mode(self) -> None:
+        """Queue the current (or pending) operation mode again."""
+        opmode = self._state.operation_mode
+        if opmode:
+            self._device.queue_operation_mode_update(opmode)
 
-        # Create debounced refresh function (reduced from 5 to 2 seconds for faster feedback)
-        self._debounced_refresh = debounce(2)(self._cocoro_data.async_refresh_data)
+    @property
+    def available(self) -> bool:
+        """Return False while the Sharp Cocoro cloud is unreachable."""
+        return self._cocoro_data.coordinator.available
 
     async def async_added_to_hass(self):
         """Run when entity about to be added to hass."""
         await super().async_added_to_hass()
-        self._remove_listener = self.hass.bus.async_listen(
-            "sharp_cocoro.device_updated", self._handle_device_update
+        self.async_on_remove(
+            async_dispatcher_connect(
+                self.hass,
+                SIGNAL_DEVICE_UPDATED.format(self._device_id),
+                self._handle_device_update,
+            )
         )
 
-    async def _handle_device_update(self, event):
-        device_id = event.data.get("device_id")
-        if device_id == self._device.device_id:
+    @callback
+    def _handle_device_update(self, changed: list[str] | None) -> None:
+        if changed is None or not self._watched_properties.isdisjoint(changed):
             self.async_write_ha_state()
 
     async def async_set_temperature(self, temperature: float, **kwargs: Any) -> None:
         """Set new target temperature."""
-        _LOGGER.info("Setting temperature to %s", temperature)
+        _LOGGER.debug("Setting temperature to %s", temperature)
         temperature = float(temperature)
         self._device.queue_temperature_update(temperature)
         self._device.queue_power_on()
-        opmode = self._device.get_property_status(StatusCode.OPERATION_MODE)
-        if opmode:
-            self._device.queue_property_status_update(opmode)
+        self._queue_current_operation_mode()
         await self.execute_and_refresh()
 
     async def async_set_swing_mode(self, swing_mode: str) -> None:
         """Set new target swing mode."""
-        _LOGGER.info("Setting swing mode to %s", swing_mode)
+        _LOGGER.debug("Setting swing mode to %s", swing_mode)
 
         # Log current state before update
         current_temp = self.target_temperature
         _LOGGER.debug("Current temperature before swing update: %s°C", current_temp)
 
-        target_mode = next(
-            (k for k, v in FANDIRECTION_SWING_MAPPING.items() if v == swing_mode), None
-        )
+        target_mode = SWING_FANDIRECTION_MAPPING.get(swing_mode)
         if target_mode is not None:
             self._device.queue_fan_direction_update(target_mode.value)
 
             # Log state after queueing update
             temp_after_queue = self.target_temperature
-            _LOGGER.debug("Temperature after queueing swing update: %s°C", temp_after_queue)
+            _LOGGER.debug(
+                "Temperature after queueing swing update: %s°C", temp_after_queue
+            )
 
             await self.execute_and_refresh()
         else:
@@ -207,65 +258,46 @@ class SharpCocoroAircon(ClimateEntity):
 
     async def async_turn_on(self, **kwargs: Any) -> None:
         """Turn the entity on."""
-        _LOGGER.info("Turning on the device")
-        temp = self._device.get_temperature()
+        _LOGGER.debug("Turning on the device")
+        temp = self._state.temperature
         self._device.queue_power_on()
-        self._device.queue_temperature_update(temp)
-        opmode = self._device.get_property_status(StatusCode.OPERATION_MODE)
-        if opmode:
-            self._device.queue_property_status_update(opmode)
+        if temp is not None:
+            self._device.queue_temperature_update(temp)
+        self._queue_current_operation_mode()
         await self.execute_and_refresh()
 
     async def async_turn_off(self, **kwargs: Any) -> None:
         """Turn the entity off."""
-        _LOGGER.info("Turning off the device")
+        _LOGGER.debug("Turning off the device")
         self._device.queue_power_off()
         await self.execute_and_refresh()
 
     @property
     def supported_features(self) -> int:
         """Return the list of supported features."""
-        operation_mode = self._device.get_operation_mode()
-        if operation_mode in [
-            ValueSingle.OPERATION_AUTO,
-            ValueSingle.OPERATION_DEHUMIDIFY,
-            ValueSingle.OPERATION_VENTILATION,
-        ]:
+        if self._state.operation_mode in NO_TEMPERATURE_OPERATION_MODES:
             return SUPPORTED_FEATURES_NO_TEMPERATURE
         return SUPPORTED_FEATURES
 
     @property
     def hvac_mode(self) -> HVACMode | None:
         """Return hvac operation ie. heat, cool mode."""
-        if self._device.get_power_status() == ValueSingle.POWER_OFF:
+        state = self._state
+        if state.power == ValueSingle.POWER_OFF:
             return HVACMode.OFF
-
-        operation_mode = self._device.get_operation_mode()
-        mode_mapping = {
-            ValueSingle.OPERATION_HEAT: HVACMode.HEAT,
-            ValueSingle.OPERATION_COOL: HVACMode.COOL,
-            ValueSingle.OPERATION_AUTO: HVACMode.AUTO,
-            ValueSingle.OPERATION_DEHUMIDIFY: HVACMode.DRY,
-            ValueSingle.OPERATION_VENTILATION: HVACMode.FAN_ONLY,
-        }
-        return mode_mapping.get(operation_mode, HVACMode.AUTO)
+        return OPERATION_MODE_HVAC_MODE.get(state.operation_mode, HVACMode.AUTO)
 
     async def async_set_hvac_mode(self, hvac_mode: HVACMode) -> None:
         """Set new target hvac mode."""
-        _LOGGER.info("Setting HVAC mode to %s", hvac_mode)
+        _LOGGER.debug("Setting HVAC mode to %s", hvac_mode)
         self._device.queue_power_on()
-        self._device.queue_temperature_update(self._device.get_temperature())
-
-        mode_mapping = {
-            HVACMode.HEAT: ValueSingle.OPERATION_HEAT,
-            HVACMode.COOL: ValueSingle.OPERATION_COOL,
-            HVACMode.AUTO: ValueSingle.OPERATION_AUTO,
-            HVACMode.DRY: ValueSingle.OPERATION_DEHUMIDIFY,
-            HVACMode.FAN_ONLY: ValueSingle.OPERATION_VENTILATION,
-        }
+        if (temp := self._state.temperature) is not None:
+            self._device.queue_temperature_update(temp)
 
-        if hvac_mode in mode_mapping:
-            self._device.queue_operation_mode_update(mode_mapping[hvac_mode])
+        if hvac_mode in HVAC_MODE_OPERATION_MODE:
+            self._device.queue_operation_mode_update(
+                HVAC_MODE_OPERATION_MODE[hvac_mode]
+            )
         elif hvac_mode == HVACMode.OFF:
             self._device.queue_power_off()
 
@@ -274,52 +306,36 @@ class SharpCocoroAircon(ClimateEntity):
     @property
     def hvac_action(self) -> HVACAction | None:
         """Return the current running hvac operation if supported."""
-        if self._device.get_power_status() == ValueSingle.POWER_OFF:
+        state = self._state
+        if state.power == ValueSingle.POWER_OFF:
             return HVACAction.OFF
-
-        operation_mode = self._device.get_operation_mode()
-        action_mapping = {
-            ValueSingle.OPERATION_HEAT: HVACAction.HEATING,
-            ValueSingle.OPERATION_COOL: HVACAction.COOLING,
-            ValueSingle.OPERATION_DEHUMIDIFY: HVACAction.DRYING,
-            ValueSingle.OPERATION_VENTILATION: HVACAction.FAN,
-            ValueSingle.OPERATION_AUTO: HVACAction.IDLE,
-            ValueSingle.OPERATION_OTHER: HVACAction.FAN,
-        }
-        return action_mapping.get(operation_mode, HVACAction.OFF)
+        return OPERATION_MODE_HVAC_ACTION.get(state.operation_mode, HVACAction.OFF)
 
     @property
     def current_temperature(self) -> float | None:
         """Return the current temperature."""
-        return self._device.get_room_temperature()
+        return self._state.room_temperature
 
     @property
     def target_temperature(self) -> float | None:
         """Return the temperature we try to reach."""
-        state = self._device.get_state8()
-        return state.temperature if state else None
+        return self._state.temperature
 
     @property
     def fan_mode(self) -> str | None:
         """Return the fan setting."""
-        windspeed = self._device.get_windspeed()
-        if windspeed and hasattr(windspeed, "value"):
-            return WINDSPEED_FANMODE_MAPPING.get(windspeed.value, FAN_AUTO)
-        return FAN_AUTO
+        return WINDSPEED_FANMODE_MAPPING.get(self._state.windspeed, FAN_AUTO)
 
     async def async_set_fan_mode(self, fan_mode: str) -> None:
         """Set new target fan mode."""
-        _LOGGER.info("Setting fan mode to %s", fan_mode)
+        _LOGGER.debug("Setting fan mode to %s", fan_mode)
         self._device.queue_windspeed_update(FANMODE_WINDSPEED_MAPPING[fan_mode])
         await self.execute_and_refresh()
 
     @property
     def swing_mode(self) -> str | None:
         """Return the fan setting."""
-        swing_status = self._device.get_fan_direction()
-        if swing_status and hasattr(swing_status, "value"):
-            return FANDIRECTION_SWING_MAPPING.get(swing_status.value, "Auto")
-        return "Auto"
+        return FANDIRECTION_SWING_MAPPING.get(self._state.fan_direction, "Auto")
 
     async def execute_and_refresh(self) -> None:
         """Execute queued updates and schedule a debounced refresh."""
@@ -328,11 +344,9 @@ class SharpCocoroAircon(ClimateEntity):
 
         await shared_execute_and_refresh(
             device=self._device,
-            cocoro=self._cocoro,
             cocoro_data=self._cocoro_data,
-            debounced_refresh=self._debounced_refresh,
             async_write_ha_state=self.async_write_ha_state,
-            entity_name="Sharp Cocoro Aircon"
+            entity_name="Sharp Cocoro Aircon",
         )
 
         # Log state after execution
@@ -0,0 +1,243 @@
+"""Control completion tracking for the Sharp Cocoro Air integration."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections.abc import Iterable
+from dataclasses import dataclass
+from datetime import timedelta
+from functools import partial
+from typing import TYPE_CHECKING
+
+from sharp_cocoro.response_types import ControlResultStatus
+
+from .const import API_CHECK_CONTROLS
+from .const import CONTROL_COMPLETION_TIMEOUT
+from .const import CONTROL_POLL_INTERVAL
+from .log import ThrottledLogger
+
+from homeassistant.core import HomeAssistant
+
+if TYPE_CHECKING:
+    from .data import SharpCocoroData
+
+_LOGGER = logging.getLogger(__name__)
+_THROTTLED_LOGGER = ThrottledLogger(_LOGGER)
+
+_FINISHED = frozenset({ControlResultStatus.SUCCESS, ControlResultStatus.UNMATCH})
+
+
+@dataclass
+class _Waiter:
+    """A caller waiting for its controls of one device."""
+
+    future: asyncio.Future[None]
+    remaining: set[str]
+    deadline: float
+    refresh: bool
+
+
+class ControlCompletionTracker:
+    """Wait for accepted controls of all devices of an account together.
+
+    Instead of every command running its own polling loop, outstanding
+    control IDs are registered here and checked on one shared tick: a single
+    ``check_control_results`` request per device carries the IDs of every
+    caller waiting on it. Once a caller's controls have all finished, the
+    account is refreshed once for everything that finished on that tick and
+    the caller's future is resolved, so it returns with up to date state.
+    Callers that opt out of the refresh are resolved right away.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        cocoro_data: SharpCocoroData,
+        *,
+        poll_interval: timedelta = CONTROL_POLL_INTERVAL,
+        timeout: timedelta = CONTROL_COMPLETION_TIMEOUT,
+    ) -> None:
+        """Initialize the tracker."""
+        self.hass = hass
+        self._cocoro_data = cocoro_data
+        self._poll_interval = poll_interval.total_seconds()
+        self._timeout = timeout.total_seconds()
+        self._waiters: dict[int, list[_Waiter]] = {}
+        self._task: asyncio.Task[None] | None = None
+
+    @property
+    def outstanding(self) -> int:
+        """Return the number of control IDs still being waited for."""
+        return sum(
+            len(waiter.remaining)
+            for waiters in self._waiters.values()
+            for waiter in waiters
+        )
+
+    async def async_wait(
+        self, device_id: int, control_ids: Iterable[str], *, refresh: bool = True
+    ) -> None:
+        """Wait until the controls finished and the device was refreshed.
+
+        Args:
+            device_id: ID of the device the controls were sent to
+            control_ids: IDs returned when the controls were accepted
+            refresh: Refresh the account before returning; callers that
+                already show the outcome optimistically can skip it
+
+        Raises:
+            TimeoutError: If the controls did not finish in time
+            Exception: If the cloud reported an error for one of the controls
+
+        """
+        ids = tuple(control_ids)
+        if not ids:
+            return
+
+        waiter = _Waiter(
+            future=self.hass.loop.create_future(),
+            remaining=set(ids),
+            deadline=time.monotonic() + self._timeout,
+            refresh=refresh,
+        )
+        self._waiters.setdefault(device_id, []).append(waiter)
+        if self._task is None:
+            self._task = self.hass.async_create_background_task(
+                self._async_run(), "sharp_cocoro control completion"
+            )
+
+        try:
+            await waiter.future
+        finally:
+            self._async_forget(device_id, waiter)
+
+    async def async_shutdown(self) -> None:
+        """Stop polling and cancel all waiters."""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        for waiters in self._waiters.values():
+            for waiter in waiters:
+                if not waiter.future.done():
+                    waiter.future.cancel()
+        self._waiters.clear()
+
+    def _async_forget(self, device_id: int, waiter: _Waiter) -> None:
+        """Stop tracking a waiter."""
+        waiters = self._waiters.get(device_id)
+        if waiters and waiter in waiters:
+            waiters.remove(waiter)
+            if not waiters:
+                del self._waiters[device_id]
+
+    async def _async_run(self) -> None:
+        """Check outstanding controls on every tick until none are left."""
+        try:
+            while self.outstanding:
+                await asyncio.sleep(self._poll_interval)
+                results = await asyncio.gather(
+                    *(
+                        self._async_check(device_id, waiters)
+                        for device_id, waiters in list(self._waiters.items())
+                    )
+                )
+                finished = [waiter for done in results for waiter in done]
+                self._async_expire()
+                for waiter in finished:
+                    if not waiter.refresh and not waiter.future.done():
+                        waiter.future.set_result(None)
+                if to_refresh := [waiter for waiter in finished if waiter.refresh]:
+                    self.hass.async_create_task(
+                        self._async_refresh_and_resolve(to_refresh),
+                        "sharp_cocoro control refresh",
+                    )
+        finally:
+            self._task = None
+
+    async def _async_check(
+        self, device_id: int, waiters: list[_Waiter]
+    ) -> list[_Waiter]:
+        """Check the controls of one device and return the finished waiters."""
+        # Waiters without remaining IDs are finished or failed already
+        waiters = [waiter for waiter in waiters if waiter.remaining]
+        control_ids = sorted({i for waiter in waiters for i in waiter.remaining})
+        if not control_ids:
+            return []
+
+        cocoro_data = self._cocoro_data
+        device = cocoro_data.devices[device_id]
+        try:
+            # Guarded by the circuit breaker and retried like any other call
+            result = await cocoro_data.async_call(
+                API_CHECK_CONTROLS,
+                partial(cocoro_data.cocoro.check_control_results, device, control_ids),
+                device_id,
+            )
+        except Exception as e:
+            _THROTTLED_LOGGER.error(
+                "Failed to check controls of %s: %s", device.name, e
+            )
+            for waiter in waiters:
+                self._async_fail(waiter, e)
+            return []
+
+        finished_ids: set[str] = set()
+        errors: dict[str, str] = {}
+        for item in result.resultList:
+            if item.status in _FINISHED:
+                finished_ids.add(item.id)
+            elif item.errorCode:
+                errors[item.id] = item.errorCode
+
+        finished = []
+        for waiter in waiters:
+            if failed := [i for i in waiter.remaining if i in errors]:
+                self._async_fail(
+                    waiter,
+                    Exception(
+                        "Control errors: "
+                        + ", ".join(f"Control {i}: {errors[i]}" for i in failed)
+                    ),
+                )
+                continue
+            waiter.remaining -= finished_ids
+            if not waiter.remaining:
+                finished.append(waiter)
+        _LOGGER.debug(
+            "Checked %d controls of %s, %d finished",
+            len(control_ids),
+            device.name,
+            len(finished_ids),
+        )
+        return finished
+
+    def _async_expire(self) -> None:
+        """Fail waiters whose controls did not finish in time."""
+        now = time.monotonic()
+        for waiters in self._waiters.values():
+            for waiter in waiters:
+                if waiter.remaining and now >= waiter.deadline:
+                    self._async_fail(
+                        waiter,
+                        TimeoutError(
+                            f"Control completion timed out after {self._timeout} seconds"
+                        ),
+                    )
+
+    def _async_fail(self, waiter: _Waiter, err: Exception) -> None:
+        """Fail a waiter, unless it is already resolved."""
+        waiter.remaining.clear()
+        if not waiter.future.done():
+            waiter.future.set_exception(err)
+
+    async def _async_refresh_and_resolve(self, waiters: list[_Waiter]) -> None:
+        """Refresh the account once, then resolve the finished waiters."""
+        _LOGGER.debug("Refreshing device state after %d completions", len(waiters))
+        try:
+            await self._cocoro_data.async_refresh_data(fresh=True)
+        finally:
+            for waiter in waiters:
+                if not waiter.future.done():
+                    waiter.future.set_result(None)
@@ -3,24 +3,30 @@
 from __future__ import annotations
 
 import logging
+import time
+from importlib import import_module
+from typing import TYPE_CHECKING
 from typing import Any
 
 import voluptuous as vol
+from aiohttp import CookieJar
 
-from sharp_cocoro import Cocoro
-
+from .const import CONF_DEVICES
+from .const import CONF_KEY
+from .const import CONF_SECRET
 from .const import DOMAIN
 
 from homeassistant.config_entries import ConfigFlow
 from homeassistant.config_entries import ConfigFlowResult
 from homeassistant.core import HomeAssistant
 from homeassistant.exceptions import HomeAssistantError
-from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers.aiohttp_client import async_create_clientsession
 
-_LOGGER = logging.getLogger(__name__)
+if TYPE_CHECKING:
+    from .discovery import FlowDiscovery
 
-CONF_KEY = "app_key"
-CONF_SECRET = "app_secret"
+_LOGGER = logging.getLogger(__name__)
 
 STEP_USER_DATA_SCHEMA = vol.Schema(
     {
@@ -30,33 +36,48 @@ STEP_USER_DATA_SCHEMA = vol.Schema(
 )
 
 
-class PlaceholderHub:
-    """Placeholder class to make tests pass."""
-
-    def __init__(self, host: str) -> None:
-        """Initialize."""
-        self.host = host
-
-    async def authenticate(self, username: str, password: str, session) -> bool:
-        """Test if we can authenticate with the host."""
-        async with Cocoro(app_secret=password, app_key=username, session=session) as cocoro:
-            await cocoro.login()
-            return cocoro.is_authenticated
-
-
-async def validate_input(hass: HomeAssistant, data: dict[str, Any]) -> dict[str, Any]:
-    """Validate the user input allows us to connect.
+async def validate_input(hass: HomeAssistant, data: dict[str, Any]) -> FlowDiscovery:
+    """Log in and discover the supported devices of the account.
 
     Data has the keys from STEP_USER_DATA_SCHEMA with values provided by the user.
+    The login uses a cookie jar of its own, so the setup of the entry can
+    take it over instead of logging in again.
     """
-    hub = PlaceholderHub("host")
-    session = async_get_clientsession(hass)
-
-    if not await hub.authenticate(data[CONF_KEY], data[CONF_SECRET], session):
-        raise InvalidAuthError
-
-    # Return info that you want to store in the config entry.
-    return {"title": "Sharp Cocoro Air"}
+    # The client library is only needed once credentials are entered
+    await hass.async_add_import_executor_job(import_module, f"{__package__}.data")
+    from sharp_cocoro import Cocoro  # noqa: PLC0415
+
+    from .auth import AuthManager  # noqa: PLC0415
+    from .data import async_discover_aircons  # noqa: PLC0415
+    from .discovery import FlowDiscovery  # noqa: PLC0415
+    from .errors import ErrorCategory  # noqa: PLC0415
+    from .errors import classify_error  # noqa: PLC0415
+    from .stats import ApiStats  # noqa: PLC0415
+
+    cookie_jar = CookieJar()
+    session = async_create_clientsession(hass, cookie_jar=cookie_jar)
+    cocoro = Cocoro(
+        app_secret=data[CONF_SECRET], app_key=data[CONF_KEY], session=session
+    )
+    logged_in_at = time.monotonic()
+    try:
+        devices = await async_discover_aircons(cocoro, AuthManager(cocoro, ApiStats()))
+    except Exception as err:
+        category = classify_error(err)
+        if category is ErrorCategory.AUTH:
+            raise InvalidAuthError from err
+        if category is not ErrorCategory.PERMANENT:
+            raise CannotConnectError from err
+        raise
+    finally:
+        # The cookie jar outlives the session
+        await session.close()
+
+    if not devices:
+        raise NoDevicesError
+    return FlowDiscovery(
+        cookie_jar=cookie_jar, logged_in_at=logged_in_at, devices=devices
+    )
 
 
 class ConfigFlow(ConfigFlow, domain=DOMAIN):
@@ -64,6 +85,11 @@ class ConfigFlow(ConfigFlow, domain=DOMAIN):
 
     VERSION = 1
 
+    def __init__(self) -> None:
+        """Initialize the flow."""
+        self._credentials: dict[str, Any] = {}
+        self._discovery: FlowDiscovery | None = None
+
     async def async_step_user(
         self, user_input: dict[str, Any] | None = None
     ) -> ConfigFlowResult:
@@ -71,21 +97,62 @@ class ConfigFlow(ConfigFlow, domain=DOMAIN):
         errors: dict[str, str] = {}
         if user_input is not None:
             try:
-                info = await validate_input(self.hass, user_input)
+                self._discovery = await validate_input(self.hass, user_input)
             except CannotConnectError:
                 errors["base"] = "cannot_connect"
             except InvalidAuthError:
                 errors["base"] = "invalid_auth"
+            except NoDevicesError:
+                errors["base"] = "no_devices"
             except Exception:
                 _LOGGER.exception("Unexpected exception")
                 errors["base"] = "unknown"
             else:
-                return self.async_create_entry(title=info["title"], data=user_input)
+                self._credentials = user_input
+                return await self.async_step_devices()
 
         return self.async_show_form(
             step_id="user", data_schema=STEP_USER_DATA_SCHEMA, errors=errors
         )
 
+    async def async_step_devices(
+        self, user_input: dict[str, Any] | None = None
+    ) -> ConfigFlowResult:
+        """Let the user choose the devices to import."""
+        assert self._discovery is not None
+        devices = self._discovery.devices
+        options = {str(device_id): device.name for device_id, device in devices.items()}
+        errors: dict[str, str] = {}
+        if user_input is not None:
+            selected = [int(device_id) for device_id in user_input[CONF_DEVICES]]
+            if selected:
+                from .discovery import async_store_flow_discovery  # noqa: PLC0415
+
+                # The first setup of the entry takes over the login and devices
+                self._discovery.devices = {
+                    device_id: devices[device_id] for device_id in selected
+                }
+                async_store_flow_discovery(
+                    self.hass, self._credentials[CONF_KEY], self._discovery
+                )
+                return self.async_create_entry(
+                    title="Sharp Cocoro Air",
+                    data={**self._credentials, CONF_DEVICES: selected},
+                )
+            errors["base"] = "no_devices_selected"
+
+        return self.async_show_form(
+            step_id="devices",
+            data_schema=vol.Schema(
+                {
+                    vol.Required(CONF_DEVICES, default=list(options)): cv.multi_select(
+                        options
+                    ),
+                }
+            ),
+            errors=errors,
+        )
+
 
 class CannotConnectError(HomeAssistantError):
     """Error to indicate we cannot connect."""
@@ -93,3 +160,7 @@ class CannotConnectError(HomeAssistantError):
 
 class InvalidAuthError(HomeAssistantError):
     """Error to indicate there is invalid auth."""
+
+
+class NoDevicesError(HomeAssistantError):
+    """Error to indicate the account has no supported devices."""
@@ -1,3 +1,120 @@
 """Constants for the Sharp Cocoro Air integration."""
 
+from datetime import timedelta
+
 DOMAIN = "sharp_cocoro"
+
+# Config entry data keys; CONF_DEVICES lists the IDs of the devices to import,
+# all of the account's devices are imported without it
+CONF_KEY = "app_key"
+CONF_SECRET = "app_secret"
+CONF_DEVICES = "devices"
+
+# Dispatcher signal sent whenever a device's reported status changed, formatted
+# with the device ID; carries the changed properties, or None for all of them
+SIGNAL_DEVICE_UPDATED = f"{DOMAIN}_device_updated_{{}}"
+
+# Fired when optimistic values of a write are dropped because it failed
+EVENT_WRITE_ROLLED_BACK = f"{DOMAIN}.write_rolled_back"
+
+# Device properties tracked for changes; sent with SIGNAL_DEVICE_UPDATED
+PROP_POWER = "power"
+PROP_OPERATION_MODE = "operation_mode"
+PROP_TEMPERATURE = "temperature"
+PROP_WINDSPEED = "windspeed"
+PROP_FAN_DIRECTION = "fan_direction"
+PROP_ROOM_TEMPERATURE = "room_temperature"
+PROP_HUMIDITY = "humidity"
+PROP_OUTDOOR_TEMPERATURE = "outdoor_temperature"
+PROP_POWER_CONSUMPTION = "power_consumption"
+PROP_ENERGY = "energy"
+
+# Changes of a sensor value that are too small to write a new state for
+HUMIDITY_TOLERANCE = 1  # %
+POWER_CONSUMPTION_TOLERANCE = 10  # W
+ENERGY_TOLERANCE = 0.01  # kWh
+
+# Base interval at which the account's devices are polled from the cloud
+UPDATE_INTERVAL = timedelta(seconds=15)
+
+# Poll quickly for a short window after a command was sent
+FAST_UPDATE_INTERVAL = timedelta(seconds=5)
+FAST_POLL_WINDOW = timedelta(seconds=60)
+
+# Upper bounds the interval stretches to while nothing changes
+MAX_IDLE_INTERVAL = timedelta(minutes=2)
+POWERED_OFF_INTERVAL = timedelta(minutes=5)
+
+# Upper bound for the exponential backoff after failed polls
+MAX_BACKOFF_INTERVAL = timedelta(minutes=10)
+
+# How long commands for one device are collected before being sent together
+WRITE_BATCH_WINDOW = timedelta(milliseconds=250)
+
+# Quiet period before a requested follow-up refresh of a device runs
+REFRESH_DEBOUNCE_DELAY = timedelta(seconds=2)
+
+# Cloud calls whose latency and outcome are tracked
+API_LOGIN = "login"
+API_QUERY_DEVICES = "query_devices"
+API_EXECUTE = "execute_queued_updates"
+API_WAIT_FOR_COMPLETION = "wait_for_control_completion"
+API_CHECK_CONTROLS = "check_control_results"
+API_CALLS = (
+    API_LOGIN,
+    API_QUERY_DEVICES,
+    API_EXECUTE,
+    API_WAIT_FOR_COMPLETION,
+    API_CHECK_CONTROLS,
+)
+
+# Number of recent durations kept per cloud call for latency percentiles
+API_LATENCY_SAMPLES = 200
+
+# Number of recent cloud calls of an account kept for diagnostics
+API_CALL_LOG_SIZE = 100
+
+# How long snapshot writes are delayed so bursts of changes are saved once
+SNAPSHOT_SAVE_DELAY = timedelta(seconds=30)
+
+# Log in again proactively once the session is this old
+TOKEN_REFRESH_INTERVAL = timedelta(minutes=30)
+
+# How long the login and devices of a finished config flow are kept for the
+# setup of its entry
+FLOW_DISCOVERY_TIMEOUT = timedelta(minutes=5)
+
+# Consecutive failed calls that open the circuit to the cloud, and how long it
+# stays open before a probe is let through (doubled for every failed probe,
+# up to MAX_BACKOFF_INTERVAL)
+CIRCUIT_FAILURE_THRESHOLD = 3
+CIRCUIT_RESET_TIMEOUT = timedelta(seconds=30)
+
+# How often outstanding controls are checked, and how long they may take
+CONTROL_POLL_INTERVAL = timedelta(milliseconds=500)
+CONTROL_COMPLETION_TIMEOUT = timedelta(seconds=5)
+
+# Repeats of the same warning or error are logged at most once per interval,
+# and hot-path activity is logged as one summary per interval
+LOG_THROTTLE_INTERVAL = timedelta(minutes=5)
+LOG_SUMMARY_INTERVAL = timedelta(minutes=10)
+
+# Cloud traffic of all accounts: at most this many requests in flight at once,
+# accounts start this far apart, and poll delays vary by up to this fraction
+MAX_CONCURRENT_REQUESTS = 4
+ACCOUNT_STAGGER = timedelta(milliseconds=500)
+POLL_JITTER = 0.1
+
+# Timeout of a single cloud request, and how long idle pooled connections are
+# kept; longer than the poll interval so polls reuse their connection
+REQUEST_TIMEOUT = timedelta(seconds=15)
+CONNECTION_KEEPALIVE = timedelta(seconds=60)
+
+# Token bucket for cloud calls of all accounts: sustained calls per second and
+# how many may go out back to back
+REQUEST_RATE = 10.0
+REQUEST_BURST = 20
+
+# Devices the apply_state service writes to at once, by default and at most
+APPLY_STATE_CONCURRENCY = 8
+MAX_APPLY_STATE_CONCURRENCY = 32
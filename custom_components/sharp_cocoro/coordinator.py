@@ -1,116 +1,512 @@
 """Shared coordination logic for Sharp Cocoro Air integration."""
 
+from __future__ import annotations
+
 import asyncio
+import copy
 import logging
-from typing import Any, Callable, Dict
+from collections.abc import Sequence
+from datetime import datetime
+from datetime import timedelta
+from functools import partial
+from typing import TYPE_CHECKING
+from typing import Any
+
+from sharp_cocoro import Cocoro
+from sharp_cocoro import Device
+from sharp_cocoro.devices.aircon.aircon_properties import ValueSingle
+from sharp_cocoro.properties import PropertyStatus
 
-from sharp_cocoro import Cocoro, Device
+from .batcher import WriteOutcome
+from .batcher import WriteStateCallback
+from .const import API_EXECUTE
+from .const import API_QUERY_DEVICES
+from .const import API_WAIT_FOR_COMPLETION
+from .const import EVENT_WRITE_ROLLED_BACK
+from .const import SIGNAL_DEVICE_UPDATED
+from .errors import describe_error
+from .log import ThrottledLogger
+from .pending import PendingWrites
+from .pending import expected_values
+from .pending import known_values
+from .polling import AdaptivePollInterval
+from .snapshot import DeviceSnapshot
 
-from . import SharpCocoroData
+from homeassistant.core import CALLBACK_TYPE
+from homeassistant.core import HomeAssistant
+from homeassistant.core import callback
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers.dispatcher import async_dispatcher_send
+from homeassistant.helpers.event import async_call_later
+
+if TYPE_CHECKING:
+    from .data import SharpCocoroData
 
 _LOGGER = logging.getLogger(__name__)
-_LOGGER.setLevel(logging.DEBUG)
+_THROTTLED_LOGGER = ThrottledLogger(_LOGGER)
+
+
+@callback
+def async_notify_device_updated(
+    hass: HomeAssistant, device_id: int, changed: list[str] | None
+) -> None:
+    """Tell the entities of a device that its state changed.
+
+    Args:
+        hass: Home Assistant instance
+        device_id: ID of the device
+        changed: Names of the properties that changed, None for all of them
+
+    """
+    async_dispatcher_send(hass, SIGNAL_DEVICE_UPDATED.format(device_id), changed)
+
+
+class SharpCocoroCoordinator:
+    """Poll all devices of a Cocoro account and publish only real changes.
+
+    One ``query_devices()`` call is made per cycle for the whole account and
+    its result is indexed into ``SharpCocoroData.devices`` by device ID. The
+    returned status of each tracked device is compared with what we already
+    hold, and ``SIGNAL_DEVICE_UPDATED`` is only sent for devices whose
+    tracked properties actually differ, so unchanged entities do not rewrite
+    their state. The signal is per device and only reaches the entities of
+    that device.
+
+    The delay before the next poll is worked out after every refresh by an
+    ``AdaptivePollInterval``: fast after commands, stretched while idle and
+    backed off after failures.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        cocoro_data: SharpCocoroData,
+        poll_interval: AdaptivePollInterval | None = None,
+    ) -> None:
+        """Initialize the coordinator."""
+        self.hass = hass
+        self._cocoro_data = cocoro_data
+        self.poll_interval = poll_interval or AdaptivePollInterval()
+        self.update_interval: timedelta | None = None
+        self.last_update_success = True
+        self.account_device_ids: set[int] = set()
+        self._running = False
+        self._unsub_refresh: CALLBACK_TYPE | None = None
+        self._refresh_task: asyncio.Task[None] | None = None
+        self._published_available = True
+        self._shed = False
+
+    @property
+    def available(self) -> bool:
+        """Return False while the circuit to the cloud is not closed."""
+        return self._cocoro_data.circuit.closed
+
+    @callback
+    def async_update_availability(self) -> None:
+        """Tell the entities if availability changed since they last heard.
+
+        The circuit also opens and closes with calls made between polls, so
+        this runs after every cloud call and not just with refreshes.
+        """
+        if self.available != self._published_available:
+            self._published_available = self.available
+            self._async_notify_all()
+
+    @callback
+    def async_start(self, offset: float = 0) -> None:
+        """Start polling the account, the first poll ``offset`` seconds later."""
+        self._running = True
+        self._async_schedule_refresh(offset)
+
+    @callback
+    def async_shutdown(self) -> None:
+        """Stop polling."""
+        self._running = False
+        self._async_cancel_refresh()
+        if self._refresh_task is not None and not self._refresh_task.done():
+            self._refresh_task.cancel()
+
+    @callback
+    def async_boost(self) -> None:
+        """Poll fast for a while because a command was just sent."""
+        self.poll_interval.boost()
+        if self._running:
+            self._async_schedule_refresh()
+
+    @callback
+    def _async_cancel_refresh(self) -> None:
+        """Cancel the pending poll, if any."""
+        if self._unsub_refresh is not None:
+            self._unsub_refresh()
+            self._unsub_refresh = None
+
+    @callback
+    def _async_schedule_refresh(self, offset: float = 0) -> None:
+        """Schedule the next poll, replacing any pending one."""
+        self._async_cancel_refresh()
+        delay = self.poll_interval.next_delay()
+        if (scheduler := self._cocoro_data.scheduler) is not None:
+            # Keeps accounts from polling in lockstep
+            delay = scheduler.jitter(delay)
+        # While the circuit is open the next poll is its half open probe
+        delay = max(delay + offset, self._cocoro_data.circuit.retry_in)
+        self.update_interval = timedelta(seconds=delay)
+        _LOGGER.debug("Next refresh in %.1f seconds", delay)
+        self._unsub_refresh = async_call_later(
+            self.hass, delay, self._async_handle_interval
+        )
+
+    async def _async_handle_interval(self, _now: datetime) -> None:
+        """Refresh when the poll timer fires.
+
+        While commands are waiting for or holding a cloud slot the poll is
+        skipped, so it does not compete with them; the poll after a skipped
+        one always runs.
+        """
+        self._unsub_refresh = None
+        scheduler = self._cocoro_data.scheduler
+        if (
+            scheduler is not None
+            and scheduler.limiter.commands_pending
+            and not self._shed
+        ):
+            _LOGGER.debug("Commands pending, skipping this poll")
+            self._shed = True
+            self._cocoro_data.activity.record("skipped polls")
+            self._async_schedule_refresh()
+            return
+        self._shed = False
+        await self.async_refresh()
+
+    async def async_refresh(self, fresh: bool = False) -> None:
+        """Fetch all devices with a single API call and publish changes.
+
+        Concurrent callers share one in-flight fetch instead of each issuing
+        their own ``query_devices()``. With ``fresh`` the caller needs data
+        that is newer than the call itself, e.g. right after a control
+        completed, so it waits out a fetch that was already running and joins
+        the one started after it.
+        """
+        stale: asyncio.Task[None] | None = None
+        in_flight = self._refresh_task
+        if fresh and in_flight is not None and not in_flight.done():
+            stale = in_flight
+            await asyncio.shield(stale)
+
+        task = self._refresh_task
+        if task is None or task.done() or task is stale:
+            task = self._refresh_task = self.hass.async_create_task(
+                self._async_refresh(), "sharp_cocoro refresh"
+            )
+        else:
+            _LOGGER.debug("Joining in-flight refresh")
+
+        await asyncio.shield(task)
+
+    async def _async_refresh(self) -> None:
+        """Run one fetch of all devices and schedule the next poll."""
+        _LOGGER.debug("Refreshing device data")
+        activity = self._cocoro_data.activity
+        activity.record("refreshes")
+
+        try:
+            devices = await self._async_fetch_devices()
+        except Exception:
+            activity.record("failed refreshes")
+            self.last_update_success = False
+            self.poll_interval.record_failure()
+        else:
+            self.last_update_success = True
+            changed = self._async_apply_devices(devices)
+            self.poll_interval.record_success(changed, self._any_powered_on())
+
+        if self._running:
+            self._async_schedule_refresh()
+
+    async def _async_fetch_devices(self) -> Sequence[Device]:
+        """Query all devices through the circuit breaker and retry policies."""
+        try:
+            return await self._cocoro_data.async_call(
+                API_QUERY_DEVICES, self._cocoro_data.cocoro.query_devices
+            )
+        except Exception as e:
+            _THROTTLED_LOGGER.error("Failed to refresh device data: %s", e)
+            raise
+
+    @callback
+    def _async_apply_devices(self, devices: Sequence[Device]) -> bool:
+        """Swap in refreshed devices and notify listeners of changed ones.
+
+        The event carries the names of the properties that changed, so
+        entities that do not depend on any of them can skip writing state.
+        Returns True if any tracked device changed.
+        """
+        known = self._cocoro_data.devices
+        snapshots = self._cocoro_data.snapshots
+        changed = False
+        self.account_device_ids = {device.device_id for device in devices}
+        for device in devices:
+            current = known.get(device.device_id)
+            if current is None:
+                continue
+
+            known[device.device_id] = device
+            # Only decode devices whose raw status changed
+            old = snapshots[device.device_id]
+            new = (
+                old
+                if current.status == device.status
+                else DeviceSnapshot.from_device(device)
+            )
+            snapshots[device.device_id] = new
+            changed_properties = old.diff(new)
+            pending = self._cocoro_data.pending_writes[device.device_id]
+            if pending:
+                # Settled optimistic values make entities fall back to the
+                # reported ones, which may differ from what was written
+                changed_properties |= pending.reconcile(new)
+            if not changed_properties:
+                continue
+
+            changed = True
+            self._cocoro_data.activity.record("changes")
+            if _LOGGER.isEnabledFor(logging.DEBUG):
+                _LOGGER.debug(
+                    "Device %s changed: %s",
+                    device.device_id,
+                    sorted(changed_properties),
+                )
+            async_notify_device_updated(
+                self.hass, device.device_id, sorted(changed_properties)
+            )
+
+        if changed and self._cocoro_data.snapshot_store is not None:
+            self._cocoro_data.snapshot_store.async_schedule_save(known)
+        return changed
+
+    @callback
+    def _async_notify_all(self) -> None:
+        """Tell every entity to write its state, e.g. to update availability."""
+        for device_id in self._cocoro_data.devices:
+            async_notify_device_updated(self.hass, device_id, None)
+
+    def _any_powered_on(self) -> bool:
+        """Return True if at least one device reports power on."""
+        # A missing or unknown power status is assumed to be running
+        return any(
+            snapshot.power != ValueSingle.POWER_OFF
+            for snapshot in self._cocoro_data.snapshots.values()
+        )
 
 
 async def execute_and_refresh(
     device: Device,
-    cocoro: Cocoro,
     cocoro_data: SharpCocoroData,
-    debounced_refresh: Callable,
-    async_write_ha_state: Callable,
-    entity_name: str = "Sharp Cocoro"
-) -> None:
-    """Execute queued updates and refresh device state.
-    
+    async_write_ha_state: WriteStateCallback,
+    entity_name: str = "Sharp Cocoro",
+) -> WriteOutcome:
+    """Send the device's queued updates and refresh device state.
+
+    The updates are handed to the device's write batcher, so commands issued
+    in quick succession by several entities go out as one cloud write. The
+    values they set are shown optimistically right away.
+
     Args:
-        device: The device to update
-        cocoro: Cocoro API client
+        device: The device with queued property updates
         cocoro_data: Shared data container
-        debounced_refresh: Debounced refresh function
         async_write_ha_state: Function to update HA state
         entity_name: Name for logging purposes
+
+    Returns:
+        The outcome of the write that carried the updates; a write whose
+        controls failed or timed out was rolled back
+
+    Raises:
+        HomeAssistantError: If the batch carrying the updates failed
+
     """
-    _LOGGER.info(
-        "Executing updates for %s: %s",
-        entity_name,
-        device.property_updates,
-    )
+    updates = dict(device.property_updates)
+    device.property_updates.clear()
+    if not updates:
+        return WriteOutcome.COMPLETED
 
-    try:
-        result = await cocoro.execute_queued_updates(device)
-        
-        # Extract control IDs from the response
-        control_ids = []
-        if 'controlList' in result:
-            for control in result['controlList']:
-                if 'id' in control:
-                    control_ids.append(control['id'])
-            _LOGGER.debug("Control IDs to monitor: %s", control_ids)
-
-        # Immediately update Home Assistant state with optimistic values
+    if _LOGGER.isEnabledFor(logging.DEBUG):
+        _LOGGER.debug("Queueing updates for %s: %s", entity_name, sorted(updates))
+
+    # Show predictable values at once instead of after the batch window; the
+    # batch settles them: completed or rolled back with its write
+    token = None
+    if expected := expected_values(updates):
+        token = cocoro_data.pending_writes[device.device_id].add(expected)
         async_write_ha_state()
-        _LOGGER.debug("Home Assistant state updated with optimistic values")
-
-        # If we have control IDs, wait for completion before refreshing
-        if control_ids:
-            try:
-                _LOGGER.debug("Waiting for control completion...")
-                # Wait for controls to complete with shorter poll interval
-                completion_result = await cocoro.wait_for_control_completion(
-                    device,
-                    control_ids,
-                    timeout=5.0,  # 5 second timeout
-                    poll_interval=0.5  # Poll every 0.5 seconds
-                )
-                _LOGGER.debug("Controls completed successfully: %s", completion_result)
-                
-                # Immediately refresh after completion
-                _LOGGER.debug("Refreshing device state after control completion")
-                await cocoro_data.async_refresh_data()
-                
-            except TimeoutError:
-                _LOGGER.warning("Control completion timed out, falling back to debounced refresh")
-                # Fall back to debounced refresh
-                await debounced_refresh()
-            except Exception as e:
-                _LOGGER.error("Error waiting for control completion: %s", e)
-                # Fall back to debounced refresh
-                await debounced_refresh()
-        else:
-            # No control IDs, use debounced refresh as before
-            await debounced_refresh()
 
+    batcher = cocoro_data.write_batchers[device.device_id]
+    try:
+        return await batcher.async_submit(updates, async_write_ha_state, token)
+    except Exception as err:
+        raise HomeAssistantError(
+            f"Failed to update {entity_name}: {describe_error(err)}"
+        ) from err
+
+
+async def async_execute_batch(
+    cocoro_data: SharpCocoroData,
+    device_id: int,
+    updates: dict[str, PropertyStatus],
+    write_states: list[WriteStateCallback],
+    tokens: list[int],
+) -> WriteOutcome:
+    """Execute one merged batch of updates and refresh device state.
+
+    The pending values of the submitters are completed once the controls
+    completed, or rolled back if the write failed or timed out.
+
+    Args:
+        cocoro_data: Shared data container
+        device_id: ID of the device to update
+        updates: Property updates to send, keyed by status code
+        write_states: Functions to update HA state of the affected entities
+        tokens: Tokens of the submitters' pending values
+
+    Returns:
+        The outcome of the write for its submitters
+
+    """
+    device = cocoro_data.devices[device_id]
+    cocoro = cocoro_data.cocoro
+    refresh_debouncer = cocoro_data.refresh_debouncers[device_id]
+    pending = cocoro_data.pending_writes[device_id]
+    cocoro_data.activity.record("commands")
+    if _LOGGER.isEnabledFor(logging.DEBUG):
+        _LOGGER.debug("Executing updates for %s: %s", device.name, sorted(updates))
+
+    # Submitters showed their values right away; drop those the merged
+    # write does not carry. Writes we cannot predict show up with the
+    # refresh after their controls completed
+    expected = expected_values(updates)
+    sent = expected if expected is not None else known_values(updates)
+    _async_drop_unsent(pending, tokens, sent, write_states)
+
+    try:
+        # A 401 replay stages the updates again
+        result = await cocoro_data.async_call(
+            API_EXECUTE,
+            partial(_async_send_updates, cocoro, device, updates),
+            device_id,
+        )
     except Exception as e:
+        # Retries per error category already happened in async_call
         _LOGGER.error("Failed to execute updates: %s", e)
+        _async_rollback_all(cocoro_data, device_id, tokens, WriteOutcome.FAILED)
+        raise
 
-        # Try to re-authenticate on authentication errors
-        if (
-            "401" in str(e)
-            or "unauthorized" in str(e).lower()
-            or "authentication" in str(e).lower()
-        ):
-            _LOGGER.info(
-                "Authentication error during execute, attempting to re-login"
-            )
-            try:
-                await cocoro_data.async_login()
-                # Retry the operation after re-authentication
-                await cocoro.execute_queued_updates(device)
-                await debounced_refresh()
-                _LOGGER.info(
-                    "Successfully executed updates after re-authentication"
-                )
+    # Poll fast for a while so the outcome of the command shows up quickly
+    cocoro_data.coordinator.async_boost()
 
-            except Exception as retry_error:
-                _LOGGER.error(
-                    "Failed to execute updates after re-authentication: %s",
-                    retry_error,
-                )
-                # Clear the queued updates to prevent them from piling up
-                device.property_updates.clear()
-        else:
-            # For non-authentication errors, clear the queue to prevent issues
-            _LOGGER.error(
-                "Non-authentication error during execute, clearing update queue"
+    # Extract control IDs from the response
+    control_ids = [
+        control["id"] for control in result.get("controlList", []) if "id" in control
+    ]
+    _LOGGER.debug("Control IDs to monitor: %s", control_ids)
+
+    if not control_ids:
+        # No control IDs, use debounced refresh as before
+        refresh_debouncer.async_schedule()
+        return WriteOutcome.COMPLETED
+
+    try:
+        _LOGGER.debug("Waiting for control completion...")
+        # The tracker checks the controls of all devices on a shared tick.
+        # Predicted writes skip the refresh: the overlay already shows them
+        # and the next (boosted) poll reconciles it
+        api_stats = cocoro_data.api_stats
+        with api_stats.track(API_WAIT_FOR_COMPLETION, device_id) as record:
+            record.control_ids = tuple(control_ids)
+            await cocoro_data.completion_tracker.async_wait(
+                device_id, control_ids, refresh=expected is None
             )
-            device.property_updates.clear()
\ No newline at end of file
+        for token in tokens:
+            pending.complete(token)
+        _LOGGER.debug("Controls completed")
+
+    except TimeoutError:
+        _LOGGER.warning(
+            "Control completion timed out, falling back to debounced refresh"
+        )
+        _async_rollback_all(cocoro_data, device_id, tokens, WriteOutcome.TIMEOUT)
+        refresh_debouncer.async_schedule()
+        return WriteOutcome.TIMEOUT
+    except Exception as e:
+        _LOGGER.error("Error waiting for control completion: %s", e)
+        _async_rollback_all(cocoro_data, device_id, tokens, WriteOutcome.FAILED)
+        refresh_debouncer.async_schedule()
+        return WriteOutcome.FAILED
+    return WriteOutcome.COMPLETED
+
+
+async def _async_send_updates(
+    cocoro: Cocoro, device: Device, updates: dict[str, PropertyStatus]
+) -> dict[str, Any]:
+    """Send updates to a device without touching its shared update queue.
+
+    The updates are only staged on a copy of the device, right before the
+    request is built and without an await in between, so commands queued on
+    the device meanwhile neither take nor clear them. The copy also keeps
+    the status as reported by the cloud; the overlay holds the optimistic
+    values and can be rolled back.
+    """
+    staged = copy.copy(device)
+    staged.property_updates = dict(updates)
+    staged.status = list(device.status)
+    result: dict[str, Any] = await cocoro.execute_queued_updates(staged)
+    return result
+
+
+@callback
+def _async_drop_unsent(
+    pending: PendingWrites,
+    tokens: list[int],
+    sent: dict[str, Any],
+    write_states: list[WriteStateCallback],
+) -> None:
+    """Drop the pending values of submitters that a batch does not send."""
+    dropped = [pending.retain(token, sent) for token in tokens]
+    if any(dropped):
+        for async_write_ha_state in write_states:
+            async_write_ha_state()
+
+
+@callback
+def _async_rollback_all(
+    cocoro_data: SharpCocoroData,
+    device_id: int,
+    tokens: list[int],
+    reason: WriteOutcome,
+) -> None:
+    """Roll back the pending values of every submitter of a batch."""
+    for token in tokens:
+        _async_rollback(cocoro_data, device_id, token, reason)
+
+
+@callback
+def _async_rollback(
+    cocoro_data: SharpCocoroData, device_id: int, token: int, reason: WriteOutcome
+) -> None:
+    """Drop the optimistic values of a failed write and notify listeners."""
+    names = cocoro_data.pending_writes[device_id].rollback(token)
+    if not names:
+        return
+
+    cocoro_data.activity.record("rollbacks")
+    _LOGGER.warning(
+        "Rolling back %s of device %s, the write %s",
+        sorted(names),
+        device_id,
+        "timed out" if reason is WriteOutcome.TIMEOUT else "failed",
+    )
+    hass = cocoro_data.hass
+    hass.bus.async_fire(
+        EVENT_WRITE_ROLLED_BACK,
+        {"device_id": device_id, "properties": sorted(names), "reason": reason.value},
+    )
+    async_notify_device_updated(hass, device_id, sorted(names))
@@ -0,0 +1,207 @@
+"""Runtime state of a Sharp Cocoro Air config entry.
+
+Everything that needs the ``sharp_cocoro`` client library at runtime is
+reached through this module, so the integration package itself can be
+imported without loading it.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections.abc import Awaitable
+from collections.abc import Callable
+from dataclasses import InitVar
+from dataclasses import dataclass
+from dataclasses import field
+from datetime import datetime
+from functools import partial
+from typing import TypeVar
+
+from sharp_cocoro import Aircon
+from sharp_cocoro import Cocoro
+from sharp_cocoro import Device
+
+from .auth import AuthManager
+from .batcher import DeviceWriteBatcher
+from .circuit import CircuitBreaker
+from .completion import ControlCompletionTracker
+from .const import API_QUERY_DEVICES
+from .coordinator import SharpCocoroCoordinator
+from .coordinator import async_execute_batch
+from .debounce import RefreshDebouncer
+from .errors import RETRY_POLICIES
+from .errors import CloudUnavailableError
+from .errors import classify_error
+from .errors import retry_after
+from .log import ActivitySummary
+from .pending import PendingWrites
+from .scheduler import CloudScheduler
+from .snapshot import DeviceSnapshot
+from .stats import ApiStats
+from .storage import DeviceSnapshotStore
+
+from homeassistant.core import HomeAssistant
+
+_LOGGER = logging.getLogger(__name__)
+
+_T = TypeVar("_T")
+
+
+@dataclass
+class SharpCocoroData:
+    """State container for Sharp Cocoro integration."""
+
+    cocoro: Cocoro
+    devices: dict[int, Device]
+    hass: HomeAssistant
+    app_key: str = field(default="")
+    app_secret: str = field(default="")
+    api_stats: ApiStats = field(default_factory=ApiStats)
+    circuit: CircuitBreaker = field(default_factory=CircuitBreaker)
+    snapshot_store: DeviceSnapshotStore | None = field(default=None)
+    activity: ActivitySummary = field(default_factory=ActivitySummary)
+    scheduler: CloudScheduler | None = field(default=None)
+    # Auth manager to take over, e.g. the one setup logged in with
+    auth_manager: InitVar[AuthManager | None] = None
+    auth: AuthManager = field(init=False)
+    coordinator: SharpCocoroCoordinator = field(init=False)
+    write_batchers: dict[int, DeviceWriteBatcher] = field(init=False)
+    refresh_debouncers: dict[int, RefreshDebouncer] = field(init=False)
+    completion_tracker: ControlCompletionTracker = field(init=False)
+    pending_writes: dict[int, PendingWrites] = field(init=False)
+    snapshots: dict[int, DeviceSnapshot] = field(init=False)
+
+    def __post_init__(self, auth_manager: AuthManager | None) -> None:
+        """Create the coordinator and the per-device helpers."""
+        if auth_manager is None:
+            auth_manager = AuthManager(
+                self.cocoro,
+                self.api_stats,
+                limiter=self.scheduler.limiter if self.scheduler else None,
+            )
+        self.auth = auth_manager
+        self.coordinator = SharpCocoroCoordinator(self.hass, self)
+        self.completion_tracker = ControlCompletionTracker(self.hass, self)
+        self.write_batchers = {
+            device_id: DeviceWriteBatcher(
+                self.hass, partial(async_execute_batch, self, device_id)
+            )
+            for device_id in self.devices
+        }
+        self.pending_writes = {device_id: PendingWrites() for device_id in self.devices}
+        self.snapshots = {
+            device_id: DeviceSnapshot.from_device(device)
+            for device_id, device in self.devices.items()
+        }
+        self.refresh_debouncers = {
+            device_id: RefreshDebouncer(self.hass, self.async_refresh_data)
+            for device_id in self.devices
+        }
+
+    def device_state(self, device_id: int) -> DeviceSnapshot:
+        """Return the decoded state of a device, including pending writes."""
+        return self.pending_writes[device_id].apply(self.snapshots[device_id])
+
+    async def async_ensure_authenticated(self) -> bool:
+        """Ensure the client is authenticated, re-login if necessary."""
+        try:
+            # Refresh the token proactively; concurrent logins are shared
+            await self.auth.async_ensure_fresh()
+            return True
+        except Exception as e:
+            _LOGGER.error("Failed to ensure authentication: %s", e)
+            return False
+
+    async def async_login(self) -> None:
+        """Perform login to the Cocoro API."""
+        await self.auth.async_login()
+
+    async def async_call(
+        self,
+        name: str,
+        request: Callable[[], Awaitable[_T]],
+        device_id: int | None = None,
+    ) -> _T:
+        """Run an API request guarded by the circuit breaker.
+
+        Failures are classified and retried according to their category's
+        retry policy; authentication errors are handled by the auth manager.
+
+        Args:
+            name: API call name the request is tracked under
+            request: Function starting the request; called again for retries
+            device_id: ID of the device the request is about, for the call log
+
+        Raises:
+            CloudUnavailableError: If the circuit is open
+
+        """
+        if not self.circuit.allow_request():
+            raise CloudUnavailableError(
+                f"Sharp Cocoro cloud unavailable, retrying in {self.circuit.retry_in:.0f}s"
+            )
+
+        attempt = 0
+        while True:
+            try:
+                result = await self.auth.async_call(name, request, device_id)
+            except asyncio.CancelledError:
+                self.circuit.abort_probe()
+                raise
+            except Exception as e:
+                category = classify_error(e)
+                policy = RETRY_POLICIES[category]
+                if attempt < policy.retries:
+                    delay = policy.retry_delay(attempt)
+                    attempt += 1
+                    _LOGGER.debug(
+                        "%s failed (%s), retry %d in %.1fs: %s",
+                        name,
+                        category,
+                        attempt,
+                        delay,
+                        e,
+                    )
+                    self.api_stats.record_retry(name)
+                    await asyncio.sleep(delay)
+                    continue
+                self.circuit.record_failure(category, retry_after(e))
+                self.coordinator.async_update_availability()
+                raise
+            self.circuit.record_success()
+            self.coordinator.async_update_availability()
+            return result
+
+    async def async_refresh_data(
+        self, _: datetime | None = None, *, fresh: bool = False
+    ) -> None:
+        """Refresh device data through the account coordinator."""
+        await self.coordinator.async_refresh(fresh=fresh)
+
+
+async def async_discover_aircons(
+    cocoro: Cocoro, auth: AuthManager
+) -> dict[int, Device]:
+    """Log in and return the supported devices of the account keyed by ID."""
+    await auth.async_login()
+
+    _LOGGER.debug("Querying devices")
+    devices = await auth.async_call(API_QUERY_DEVICES, cocoro.query_devices)
+    _LOGGER.info(
+        "Query devices successful, found %d devices", len(devices) if devices else 0
+    )
+
+    # Index supported devices by ID so refreshes can swap them in O(1)
+    aircons: dict[int, Device] = {}
+    for device in devices or []:
+        if not isinstance(device, Aircon):
+            _LOGGER.info(
+                "Skipping unsupported device: %s (ID: %s)",
+                device.name,
+                device.device_id,
+            )
+            continue
+        _LOGGER.info("Discovered device: %s (ID: %s)", device.name, device.device_id)
+        aircons[device.device_id] = device
+    return aircons
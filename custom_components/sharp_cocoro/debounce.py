@@ -0,0 +1,100 @@
+"""Refresh debouncing for the Sharp Cocoro Air integration."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections.abc import Awaitable
+from collections.abc import Callable
+from datetime import datetime
+from datetime import timedelta
+
+from .const import REFRESH_DEBOUNCE_DELAY
+from .log import ThrottledLogger
+
+from homeassistant.core import CALLBACK_TYPE
+from homeassistant.core import HomeAssistant
+from homeassistant.core import callback
+from homeassistant.helpers.event import async_call_later
+
+_LOGGER = logging.getLogger(__name__)
+_THROTTLED_LOGGER = ThrottledLogger(_LOGGER)
+
+
+class RefreshDebouncer:
+    """Run a refresh once a burst of requests for it has settled.
+
+    One debouncer exists per device and is shared by all of its entities, so
+    a burst of commands from the climate and fan entities of the same unit
+    leads to exactly one follow-up refresh. Every request restarts the
+    cooldown (trailing edge). The returned future resolves once the refresh
+    that covers the request has run; callers may await it or ignore it.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        function: Callable[[], Awaitable[None]],
+        cooldown: timedelta = REFRESH_DEBOUNCE_DELAY,
+    ) -> None:
+        """Initialize the debouncer."""
+        self.hass = hass
+        self._function = function
+        self._cooldown = cooldown.total_seconds()
+        self._waiters: list[asyncio.Future[None]] = []
+        self._unsub_timer: CALLBACK_TYPE | None = None
+        self._shutdown = False
+
+    @callback
+    def async_schedule(self) -> asyncio.Future[None]:
+        """Request a refresh after the cooldown, restarting a pending one."""
+        waiter: asyncio.Future[None] = self.hass.loop.create_future()
+        if self._shutdown:
+            waiter.cancel()
+            return waiter
+
+        self._waiters.append(waiter)
+        self._async_cancel_timer()
+        self._unsub_timer = async_call_later(self.hass, self._cooldown, self._async_run)
+        return waiter
+
+    @callback
+    def async_cancel(self) -> None:
+        """Drop a pending refresh and cancel everyone waiting for it."""
+        self._async_cancel_timer()
+        waiters, self._waiters = self._waiters, []
+        for waiter in waiters:
+            waiter.cancel()
+
+    @callback
+    def async_shutdown(self) -> None:
+        """Cancel any pending refresh and refuse new requests."""
+        self._shutdown = True
+        self.async_cancel()
+
+    @callback
+    def _async_cancel_timer(self) -> None:
+        """Cancel the cooldown timer, if any."""
+        if self._unsub_timer is not None:
+            self._unsub_timer()
+            self._unsub_timer = None
+
+    async def _async_run(self, _now: datetime) -> None:
+        """Run the refresh once the cooldown passed."""
+        self._unsub_timer = None
+        waiters, self._waiters = self._waiters, []
+
+        try:
+            await self._function()
+        except asyncio.CancelledError:
+            for waiter in waiters:
+                waiter.cancel()
+            raise
+        except Exception as err:
+            # Failures are reported by the refresh itself; waiters only care
+            # that it ran
+            _THROTTLED_LOGGER.error("Debounced refresh failed: %s", err)
+
+        for waiter in waiters:
+            if not waiter.done():
+                waiter.set_result(None)
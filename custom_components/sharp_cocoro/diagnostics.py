@@ -0,0 +1,88 @@
+"""Diagnostics support for Sharp Cocoro Air."""
+
+from __future__ import annotations
+
+from enum import Enum
+from typing import Any
+
+from . import CocoroConfigEntry
+from .const import CONF_KEY
+from .const import CONF_SECRET
+from .const import DOMAIN
+from .scheduler import DATA_SCHEDULER
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.device_registry import DeviceEntry
+
+TO_REDACT = {CONF_KEY, CONF_SECRET}
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: CocoroConfigEntry
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    data = entry.runtime_data
+    coordinator = data.coordinator
+    scheduler = hass.data.get(DATA_SCHEDULER)
+    return {
+        "entry": async_redact_data(entry.as_dict(), TO_REDACT),
+        "devices": [
+            {"device_id": device.device_id, "name": device.name, "model": device.model}
+            for device in data.devices.values()
+        ],
+        "coordinator": {
+            "last_update_success": coordinator.last_update_success,
+            "update_interval": (
+                coordinator.update_interval.total_seconds()
+                if coordinator.update_interval
+                else None
+            ),
+            "consecutive_failures": coordinator.poll_interval.failures,
+        },
+        "circuit": data.circuit.as_dict(),
+        "auth": data.auth.as_dict(),
+        "scheduler": scheduler.as_dict() if scheduler is not None else None,
+        "api_stats": data.api_stats.as_dict(),
+        "recent_calls": data.api_stats.recent_calls(),
+    }
+
+
+async def async_get_device_diagnostics(
+    hass: HomeAssistant, entry: CocoroConfigEntry, device: DeviceEntry
+) -> dict[str, Any]:
+    """Return diagnostics for a device."""
+    data = entry.runtime_data
+    device_id = _device_id(device)
+    if device_id is None or device_id not in data.devices:
+        # The service device holding the API stats sensors
+        return {"circuit": data.circuit.as_dict()}
+
+    cocoro_device = data.devices[device_id]
+    return {
+        "device": {
+            "device_id": device_id,
+            "name": cocoro_device.name,
+            "model": cocoro_device.model,
+        },
+        "state": _plain(data.snapshots[device_id].as_dict()),
+        "pending_writes": _plain(data.pending_writes[device_id].as_dict()),
+        "circuit": data.circuit.as_dict(),
+        "recent_calls": data.api_stats.recent_calls(device_id),
+    }
+
+
+def _device_id(device: DeviceEntry) -> int | None:
+    """Return the Cocoro ID of a registered device."""
+    for domain, identifier in device.identifiers:
+        if domain == DOMAIN and str(identifier).isdigit():
+            return int(identifier)
+    return None
+
+
+def _plain(values: dict[str, Any]) -> dict[str, Any]:
+    """Replace decoded enum values by their names."""
+    return {
+        name: value.name if isinstance(value, Enum) else value
+        for name, value in values.items()
+    }
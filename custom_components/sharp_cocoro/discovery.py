@@ -0,0 +1,69 @@
+"""Hand over the login and devices found by the config flow to the setup."""
+
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+from aiohttp.abc import AbstractCookieJar
+
+from .const import DOMAIN
+from .const import FLOW_DISCOVERY_TIMEOUT
+
+from homeassistant.core import HomeAssistant
+from homeassistant.core import callback
+from homeassistant.helpers.event import async_call_later
+from homeassistant.util.hass_dict import HassKey
+
+if TYPE_CHECKING:
+    from sharp_cocoro import Device
+
+_LOGGER = logging.getLogger(__name__)
+
+DATA_FLOW_DISCOVERY: HassKey[dict[str, FlowDiscovery]] = HassKey(
+    f"{DOMAIN}_flow_discovery"
+)
+
+
+@dataclass(slots=True)
+class FlowDiscovery:
+    """What the config flow learned about an account.
+
+    Attributes:
+        cookie_jar: Holds the session cookie of the flow's login
+        logged_in_at: Monotonic time of that login
+        devices: Devices the user chose to import, keyed by ID
+
+    """
+
+    cookie_jar: AbstractCookieJar
+    logged_in_at: float
+    devices: dict[int, Device]
+
+
+@callback
+def async_store_flow_discovery(
+    hass: HomeAssistant, app_key: str, discovery: FlowDiscovery
+) -> None:
+    """Keep a discovery for the first setup of the account's entry.
+
+    A discovery that is not picked up in time is dropped; the setup then
+    logs in and queries the devices itself.
+    """
+    discoveries = hass.data.setdefault(DATA_FLOW_DISCOVERY, {})
+    discoveries[app_key] = discovery
+
+    @callback
+    def _async_expire(_now: object) -> None:
+        if discoveries.get(app_key) is discovery:
+            _LOGGER.debug("Dropping unused discovery of the config flow")
+            del discoveries[app_key]
+
+    async_call_later(hass, FLOW_DISCOVERY_TIMEOUT, _async_expire)
+
+
+@callback
+def async_pop_flow_discovery(hass: HomeAssistant, app_key: str) -> FlowDiscovery | None:
+    """Return and forget the discovery of an account, if there is one."""
+    return hass.data.get(DATA_FLOW_DISCOVERY, {}).pop(app_key, None)
@@ -0,0 +1,110 @@
+"""Error classification for the Sharp Cocoro Air integration."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from enum import StrEnum
+
+from aiohttp import ClientConnectionError
+from aiohttp import ClientPayloadError
+from aiohttp import ClientResponseError
+
+from homeassistant.exceptions import HomeAssistantError
+
+
+class ErrorCategory(StrEnum):
+    """Kinds of failures a cloud call can end with."""
+
+    AUTH = "auth"
+    RATE_LIMIT = "rate_limit"
+    TRANSIENT = "transient"
+    SERVER = "server"
+    PERMANENT = "permanent"
+
+
+class CloudUnavailableError(HomeAssistantError):
+    """The circuit to the Cocoro cloud is open, no request was sent."""
+
+
+@dataclass(frozen=True, slots=True)
+class RetryPolicy:
+    """How a category of failures is retried.
+
+    Attributes:
+        retries: Immediate retries of the failed call
+        delay: Seconds before the first retry, doubled for each further one
+        trips_circuit: The failure counts towards opening the circuit
+        opens_circuit: The failure opens the circuit right away
+
+    """
+
+    retries: int = 0
+    delay: float = 0.0
+    trips_circuit: bool = False
+    opens_circuit: bool = False
+
+    def retry_delay(self, attempt: int) -> float:
+        """Return the delay before the given retry, counting from zero."""
+        return self.delay * 2.0**attempt
+
+
+RETRY_POLICIES: dict[ErrorCategory, RetryPolicy] = {
+    # Logging in again and replaying the call is left to the AuthManager
+    ErrorCategory.AUTH: RetryPolicy(),
+    # Retrying makes it worse, back off for at least the reset timeout
+    ErrorCategory.RATE_LIMIT: RetryPolicy(opens_circuit=True),
+    ErrorCategory.TRANSIENT: RetryPolicy(retries=2, delay=0.5, trips_circuit=True),
+    ErrorCategory.SERVER: RetryPolicy(retries=1, delay=2.0, trips_circuit=True),
+    # Rejected commands and malformed requests fail the same way again
+    ErrorCategory.PERMANENT: RetryPolicy(),
+}
+
+
+def classify_error(err: BaseException) -> ErrorCategory:
+    """Return the category of an exception raised by a cloud call."""
+    if isinstance(err, ClientResponseError):
+        return _classify_status(err.status)
+    if isinstance(err, (ClientConnectionError, ClientPayloadError, TimeoutError)):
+        return ErrorCategory.TRANSIENT
+
+    # The library reports some failures as plain exceptions
+    message = str(err).lower()
+    if "401" in message or "unauthorized" in message or "authentication" in message:
+        return ErrorCategory.AUTH
+    return ErrorCategory.PERMANENT
+
+
+def describe_error(err: BaseException) -> str:
+    """Return a description of a failed call that is safe to show.
+
+    The messages of HTTP errors include the request URL, which carries the
+    app secret; only the type, category and HTTP status of an error are kept.
+    """
+    if isinstance(err, CloudUnavailableError):
+        # Raised before any request, the message is our own
+        return str(err)
+    details = [classify_error(err).value]
+    if isinstance(err, ClientResponseError):
+        details.append(f"HTTP {err.status}")
+    return f"{type(err).__name__} ({', '.join(details)})"
+
+
+def _classify_status(status: int) -> ErrorCategory:
+    """Return the category of an HTTP error status."""
+    if status in (401, 403):
+        return ErrorCategory.AUTH
+    if status == 429:
+        return ErrorCategory.RATE_LIMIT
+    if status >= 500:
+        return ErrorCategory.SERVER
+    return ErrorCategory.PERMANENT
+
+
+def retry_after(err: BaseException) -> float | None:
+    """Return the seconds a rate limited response asked us to wait."""
+    if not isinstance(err, ClientResponseError) or not err.headers:
+        return None
+    try:
+        return float(err.headers.get("Retry-After", ""))
+    except ValueError:
+        return None
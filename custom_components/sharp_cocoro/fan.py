@@ -1,57 +1,38 @@
 """Fan platform for Sharp Cocoro Air."""
 
-import asyncio
 import logging
 import math
-from functools import wraps
+from typing import TYPE_CHECKING
 from typing import Any
+from typing import ClassVar
 
 from propcache.api import cached_property
-from sharp_cocoro import Aircon
-from sharp_cocoro import Cocoro
-from sharp_cocoro.devices.aircon.aircon_properties import StatusCode
+
 from sharp_cocoro.devices.aircon.aircon_properties import ValueSingle
 
-from . import SharpCocoroData
 from .const import DOMAIN
+from .const import PROP_POWER
+from .const import PROP_WINDSPEED
+from .const import SIGNAL_DEVICE_UPDATED
 from .coordinator import execute_and_refresh as shared_execute_and_refresh
+from .data import SharpCocoroData
+from .snapshot import DeviceSnapshot
 
 from homeassistant.components.fan import FanEntity
 from homeassistant.components.fan import FanEntityFeature
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
+from homeassistant.core import callback
 from homeassistant.helpers.device_registry import DeviceInfo
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.util.percentage import percentage_to_ranged_value
 
-_LOGGER = logging.getLogger(__name__)
-_LOGGER.setLevel(logging.DEBUG)
-
-
-def debounce(wait_time):
-    """Debounce a function for a specified amount of time."""
-
-    def decorator(fn):
-        pending_task = None
-
-        @wraps(fn)
-        async def debounced(*args, **kwargs):
-            nonlocal pending_task
+if TYPE_CHECKING:
+    from sharp_cocoro import Aircon
+    from sharp_cocoro import Cocoro
 
-            # Cancel any existing task
-            if pending_task is not None and not pending_task.done():
-                pending_task.cancel()
-
-            # Create a new task with delay
-            async def delayed_call():
-                await asyncio.sleep(wait_time)
-                await fn(*args, **kwargs)
-
-            pending_task = asyncio.create_task(delayed_call())
-
-        return debounced
-
-    return decorator
+_LOGGER = logging.getLogger(__name__)
 
 
 PRESET_MODE_AUTO = "Auto"
@@ -61,6 +42,21 @@ FEATURES = FanEntityFeature.SET_SPEED | FanEntityFeature.PRESET_MODE
 SUPPORTED_PRESET_MODES = [PRESET_MODE_AUTO, PRESET_MODE_NORMAL]
 SPEED_RANGE = (1, 8)
 
+WINDSPEED_SPEED_MAPPING = {
+    ValueSingle.WINDSPEED_LEVEL_1: 1,
+    ValueSingle.WINDSPEED_LEVEL_2: 2,
+    ValueSingle.WINDSPEED_LEVEL_3: 3,
+    ValueSingle.WINDSPEED_LEVEL_4: 4,
+    ValueSingle.WINDSPEED_LEVEL_5: 5,
+    ValueSingle.WINDSPEED_LEVEL_6: 6,
+    ValueSingle.WINDSPEED_LEVEL_7: 7,
+    ValueSingle.WINDSPEED_LEVEL_8: 8,
+}
+
+SPEED_WINDSPEED_MAPPING = {
+    speed: windspeed for windspeed, speed in WINDSPEED_SPEED_MAPPING.items()
+}
+
 
 async def async_setup_entry(
     hass: HomeAssistant, entry: ConfigEntry, async_add_entities: AddEntitiesCallback
@@ -69,27 +65,36 @@ async def async_setup_entry(
     cocoro_device = entry.runtime_data
     assert isinstance(cocoro_device, SharpCocoroData)
 
-    async_add_entities([SharpCocoroAirFan(cocoro_device)])
+    async_add_entities(
+        SharpCocoroAirFan(cocoro_device, device_id)
+        for device_id in cocoro_device.devices
+    )
 
 
 class SharpCocoroAirFan(FanEntity):
     """Representation of a Sharp Cocoro Air fan."""
 
+    # Properties whose changes are reflected in this entity's state
+    _watched_properties: ClassVar[frozenset[str]] = frozenset(
+        {PROP_POWER, PROP_WINDSPEED}
+    )
+    _attr_should_poll = False
     _attr_speed_count = 8
     _attr_supported_features = FEATURES
 
     @property
-    def _device(self) -> Aircon:
-        return self._cocoro_data.device  # type: ignore[return-value]
+    def _device(self) -> "Aircon":
+        return self._cocoro_data.devices[self._device_id]
 
     @property
-    def _cocoro(self) -> Cocoro:
+    def _cocoro(self) -> "Cocoro":
         return self._cocoro_data.cocoro
 
-    def __init__(self, cocoro_device: SharpCocoroData):
+    def __init__(self, cocoro_device: SharpCocoroData, device_id: int):
         """Initialize the fan."""
-        _LOGGER.info("Initializing Sharp Cocoro Air Fan")
+        _LOGGER.debug("Initializing Sharp Cocoro Air Fan")
         self._cocoro_data = cocoro_device
+        self._device_id = device_id
 
         self._attr_name = f"{self._device.name} Fan"
         self._attr_unique_id = str(self._device.device_id)
@@ -101,69 +106,72 @@ class SharpCocoroAirFan(FanEntity):
             serial_number=self._device.serial_number,
         )
 
-        self._speed_mapping = {
-            ValueSingle.WINDSPEED_LEVEL_1: 1,
-            ValueSingle.WINDSPEED_LEVEL_2: 2,
-            ValueSingle.WINDSPEED_LEVEL_3: 3,
-            ValueSingle.WINDSPEED_LEVEL_4: 4,
-            ValueSingle.WINDSPEED_LEVEL_5: 5,
-            ValueSingle.WINDSPEED_LEVEL_6: 6,
-            ValueSingle.WINDSPEED_LEVEL_7: 7,
-            ValueSingle.WINDSPEED_LEVEL_8: 8,
-        }
-
-        # Create debounced refresh function (reduced from 5 to 2 seconds for faster feedback)
-        self._debounced_refresh = debounce(2)(self._cocoro_data.async_refresh_data)
-
-    async def async_added_to_hass(self):
+    @property
+    def _state(self) -> DeviceSnapshot:
+        """Return the decoded device state, including writes in flight."""
+        return self._cocoro_data.device_state(self._device_id)
+
+    def _queue_current_operation_mode(self) -> None:
+        """Queue the current (or pending) operation mode again."""
+        opmode = self._state.operation_mode
+        if opmode:
+            self._device.queue_operation_mode_update(opmode)
+
+    @property
+    def available(self) -> bool:
+        """Return False while the Sharp Cocoro cloud is unreachable."""
+        return self._cocoro_data.coordinator.available
+
+    async def async_added_to_hass(self) -> None:
         """Run when entity about to be added to hass."""
         await super().async_added_to_hass()
-        self._remove_listener = self.hass.bus.async_listen(
-            "sharp_cocoro.device_updated", self._handle_device_update
+        self.async_on_remove(
+            async_dispatcher_connect(
+                self.hass,
+                SIGNAL_DEVICE_UPDATED.format(self._device_id),
+                self._handle_device_update,
+            )
         )
 
-    async def _handle_device_update(self, event):
-        _LOGGER.info("Handling device update for Sharp Cocoro Air Fan")
-        device_id = event.data.get("device_id")
-        if device_id == self._device.device_id:
+    @callback
+    def _handle_device_update(self, changed: list[str] | None) -> None:
+        if changed is None or not self._watched_properties.isdisjoint(changed):
             self.async_write_ha_state()
 
     @property
-    def is_on(self):
+    def is_on(self) -> bool:
         """Return true if the fan is on."""
-        return self._device.get_power_status() == ValueSingle.POWER_ON
+        return self._state.power == ValueSingle.POWER_ON
 
     @property
     def percentage(self) -> int | None:
         """Return the current speed percentage."""
-        windspeed = self._device.get_windspeed()
+        windspeed = self._state.windspeed
 
         if windspeed == ValueSingle.WINDSPEED_LEVEL_AUTO:
             return 100
 
-        if windspeed not in self._speed_mapping:
+        if windspeed not in WINDSPEED_SPEED_MAPPING:
             return None
 
-        speed_level = self._speed_mapping[windspeed]
+        speed_level = WINDSPEED_SPEED_MAPPING[windspeed]
         return int((speed_level / 8) * 100)
 
     async def async_turn_off(self, **kwargs: Any) -> None:
         """Turn the entity off."""
-        _LOGGER.info("Turning off Sharp Cocoro Air Fan")
+        _LOGGER.debug("Turning off Sharp Cocoro Air Fan")
         self._device.queue_power_off()
         await self.execute_and_refresh()
 
     async def async_set_percentage(self, percentage: int) -> None:
         """Set the speed of the fan."""
-        _LOGGER.info("Setting Sharp Cocoro Air Fan speed to %s%%", percentage)
+        _LOGGER.debug("Setting Sharp Cocoro Air Fan speed to %s%%", percentage)
         if percentage == 0:
             await self.async_turn_off()
             return
 
         target_speed = math.ceil(percentage_to_ranged_value(SPEED_RANGE, percentage))
-        target_speed_setting = next(
-            (v for v, k in self._speed_mapping.items() if k == target_speed), None
-        )
+        target_speed_setting = SPEED_WINDSPEED_MAPPING.get(target_speed)
 
         if target_speed_setting:
             self._device.queue_windspeed_update(target_speed_setting)
@@ -179,7 +187,7 @@ class SharpCocoroAirFan(FanEntity):
     @property
     def preset_mode(self) -> str | None:
         """Return the current selected preset mode."""
-        windspeed = self._device.get_windspeed()
+        windspeed = self._state.windspeed
         return (
             PRESET_MODE_AUTO
             if windspeed == ValueSingle.WINDSPEED_LEVEL_AUTO
@@ -188,7 +196,7 @@ class SharpCocoroAirFan(FanEntity):
 
     async def async_set_preset_mode(self, preset_mode: str) -> None:
         """Set the preset mode of the fan."""
-        _LOGGER.info("Setting Sharp Cocoro Air Fan preset mode to %s", preset_mode)
+        _LOGGER.debug("Setting Sharp Cocoro Air Fan preset mode to %s", preset_mode)
         windspeed = (
             ValueSingle.WINDSPEED_LEVEL_AUTO
             if preset_mode == PRESET_MODE_AUTO
@@ -197,13 +205,16 @@ class SharpCocoroAirFan(FanEntity):
         self._device.queue_windspeed_update(windspeed)
         await self.execute_and_refresh()
 
-    async def async_turn_on( self, percentage: int | None = None, preset_mode: str | None = None, **kwargs: Any) -> None:
+    async def async_turn_on(
+        self,
+        percentage: int | None = None,
+        preset_mode: str | None = None,
+        **kwargs: Any,
+    ) -> None:
         """Turn the entity on."""
-        _LOGGER.info("Turning on Sharp Cocoro Air Fan")
+        _LOGGER.debug("Turning on Sharp Cocoro Air Fan")
         self._device.queue_power_on()
-        opmode = self._device.get_property_status(StatusCode.OPERATION_MODE)
-        if opmode:
-            self._device.queue_property_status_update(opmode)
+        self._queue_current_operation_mode()
 
         await self.execute_and_refresh()
 
@@ -211,9 +222,7 @@ class SharpCocoroAirFan(FanEntity):
         """Execute queued updates and schedule a debounced refresh."""
         await shared_execute_and_refresh(
             device=self._device,
-            cocoro=self._cocoro,
             cocoro_data=self._cocoro_data,
-            debounced_refresh=self._debounced_refresh,
             async_write_ha_state=self.async_write_ha_state,
-            entity_name="Sharp Cocoro Air Fan"
+            entity_name="Sharp Cocoro Air Fan",
         )
@@ -0,0 +1,104 @@
+"""Logging helpers for the Sharp Cocoro Air integration."""
+
+from __future__ import annotations
+
+import logging
+import time
+from collections import Counter
+from datetime import datetime
+from datetime import timedelta
+from typing import Any
+
+from .const import LOG_SUMMARY_INTERVAL
+from .const import LOG_THROTTLE_INTERVAL
+
+from homeassistant.core import callback
+
+_LOGGER = logging.getLogger(__package__)
+
+
+class ThrottledLogger:
+    """Log repeats of a message at most once per interval.
+
+    Messages are keyed by their format string, so the same failure with a
+    different error text counts as a repeat. Suppressed repeats are counted
+    and reported with the next message that gets through. Nothing is
+    formatted or recorded while the logger is disabled for the level.
+    """
+
+    def __init__(
+        self,
+        logger: logging.Logger,
+        interval: timedelta = LOG_THROTTLE_INTERVAL,
+    ) -> None:
+        """Initialize the logger."""
+        self._logger = logger
+        self._interval = interval.total_seconds()
+        # Format string -> (time last logged, repeats suppressed since)
+        self._seen: dict[str, tuple[float, int]] = {}
+
+    def log(self, level: int, msg: str, *args: Any) -> None:
+        """Log a message unless it was logged less than an interval ago."""
+        if not self._logger.isEnabledFor(level):
+            return
+        now = time.monotonic()
+        if (seen := self._seen.get(msg)) is not None:
+            last, suppressed = seen
+            if now - last < self._interval:
+                self._seen[msg] = (last, suppressed + 1)
+                return
+            if suppressed:
+                self._seen[msg] = (now, 0)
+                self._logger.log(
+                    level,
+                    f"{msg} (%d similar messages suppressed)",
+                    *args,
+                    suppressed,
+                    stacklevel=3,
+                )
+                return
+        self._seen[msg] = (now, 0)
+        self._logger.log(level, msg, *args, stacklevel=3)
+
+    def warning(self, msg: str, *args: Any) -> None:
+        """Log a throttled warning."""
+        self.log(logging.WARNING, msg, *args)
+
+    def error(self, msg: str, *args: Any) -> None:
+        """Log a throttled error."""
+        self.log(logging.ERROR, msg, *args)
+
+
+class ActivitySummary:
+    """Count hot-path events and log them as one periodic summary.
+
+    Refreshes and commands are only counted where they happen, which costs
+    a dict update; ``async_log`` is called on an interval and logs e.g.
+    "40 refreshes, 3 changes in the last 10 min".
+    """
+
+    def __init__(
+        self,
+        logger: logging.Logger = _LOGGER,
+        interval: timedelta = LOG_SUMMARY_INTERVAL,
+    ) -> None:
+        """Initialize the summary."""
+        self.interval = interval
+        self._logger = logger
+        self._counts: Counter[str] = Counter()
+
+    def record(self, name: str, count: int = 1) -> None:
+        """Count ``count`` events of a kind, named in plural."""
+        self._counts[name] += count
+
+    @callback
+    def async_log(self, _now: datetime | None = None) -> None:
+        """Log and reset the counts of the past interval."""
+        counts, self._counts = self._counts, Counter()
+        if not counts:
+            return
+        self._logger.info(
+            "%s in the last %d min",
+            ", ".join(f"{count} {name}" for name, count in counts.items()),
+            self.interval.total_seconds() // 60,
+        )
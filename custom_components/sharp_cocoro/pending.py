@@ -0,0 +1,173 @@
+"""Optimistic pending writes for the Sharp Cocoro Air integration."""
+
+from __future__ import annotations
+
+import itertools
+from collections.abc import Mapping
+from dataclasses import dataclass
+from typing import Any
+
+from sharp_cocoro.devices.aircon.aircon_properties import FanDirection
+from sharp_cocoro.devices.aircon.aircon_properties import StatusCode
+from sharp_cocoro.devices.aircon.aircon_properties import ValueSingle
+from sharp_cocoro.properties import PropertyStatus
+from sharp_cocoro.state import State8
+
+from .const import PROP_FAN_DIRECTION
+from .const import PROP_OPERATION_MODE
+from .const import PROP_POWER
+from .const import PROP_TEMPERATURE
+from .const import PROP_WINDSPEED
+from .snapshot import DeviceSnapshot
+
+_SINGLE_PROPERTIES = {
+    StatusCode.POWER.value: PROP_POWER,
+    StatusCode.OPERATION_MODE.value: PROP_OPERATION_MODE,
+    StatusCode.WINDSPEED.value: PROP_WINDSPEED,
+}
+
+_tokens = itertools.count(1)
+
+
+def expected_values(updates: Mapping[str, PropertyStatus]) -> dict[str, Any] | None:
+    """Decode queued property updates into the values they will set.
+
+    Returns None if an update is not understood, so the caller cannot
+    predict the outcome of the write and has to refresh instead.
+    """
+    values: dict[str, Any] = {}
+    for code, status in updates.items():
+        try:
+            if code in _SINGLE_PROPERTIES:
+                values[_SINGLE_PROPERTIES[code]] = ValueSingle(
+                    status.valueSingle["code"]  # type: ignore[attr-defined]
+                )
+            elif code == StatusCode.STATE_DETAIL:
+                state = State8(status.valueBinary["code"])  # type: ignore[attr-defined]
+                # Temperature commands flag themselves in nibble 6, fan
+                # direction commands use a template without that flag
+                if state.state[6] == "2":
+                    values[PROP_TEMPERATURE] = state.temperature
+                else:
+                    values[PROP_FAN_DIRECTION] = FanDirection(state.fan_direction)
+            else:
+                return None
+        except (AttributeError, KeyError, ValueError):
+            return None
+    return values
+
+
+def known_values(updates: Mapping[str, PropertyStatus]) -> dict[str, Any]:
+    """Decode the updates that are understood, skipping the others."""
+    values: dict[str, Any] = {}
+    for code, status in updates.items():
+        values.update(expected_values({code: status}) or {})
+    return values
+
+
+@dataclass(slots=True)
+class _PendingValue:
+    """A value written by a command but not yet confirmed by a refresh."""
+
+    value: Any
+    token: int
+    completed: bool = False
+
+
+class PendingWrites:
+    """Overlay of values a device was told to take but has not reported yet.
+
+    Entities read the device snapshot through the overlay, so a command shows
+    its effect right away instead of after the cloud has relayed it to the
+    unit and a refresh has picked it up. Each write gets a token; values
+    from a later write replace those of an earlier one.
+
+    A value is dropped once a refresh reports it, or on the first refresh
+    after its control completed, whatever the device reports then (e.g. a
+    clamped temperature). A failed or timed out write is rolled back, which
+    drops the values it still owns.
+    """
+
+    def __init__(self) -> None:
+        """Initialize an empty overlay."""
+        self._values: dict[str, _PendingValue] = {}
+        self._view: tuple[DeviceSnapshot, DeviceSnapshot] | None = None
+
+    def __bool__(self) -> bool:
+        """Return True if any value is pending."""
+        return bool(self._values)
+
+    def __contains__(self, name: str) -> bool:
+        """Return True if the property has a pending value."""
+        return name in self._values
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the pending values keyed by property name."""
+        return {name: pending.value for name, pending in self._values.items()}
+
+    def apply(self, snapshot: DeviceSnapshot) -> DeviceSnapshot:
+        """Return the snapshot with the pending values applied.
+
+        The result is cached until the snapshot or the overlay changes.
+        """
+        if not self._values:
+            return snapshot
+        if self._view is None or self._view[0] is not snapshot:
+            self._view = (snapshot, snapshot.replace(self.as_dict()))
+        return self._view[1]
+
+    def add(self, values: Mapping[str, Any]) -> int:
+        """Overlay the values of a new write and return its token."""
+        token = next(_tokens)
+        for name, value in values.items():
+            self._values[name] = _PendingValue(value, token)
+        self._view = None
+        return token
+
+    def complete(self, token: int) -> None:
+        """Mark the values of a write as accepted by the device."""
+        for pending in self._values.values():
+            if pending.token == token:
+                pending.completed = True
+
+    def retain(self, token: int, values: Mapping[str, Any]) -> set[str]:
+        """Drop the values of a write that are not among ``values``.
+
+        A write merged with others only sets what the request carries;
+        anything else it overlaid would never be confirmed. Returns the
+        names of the dropped values.
+        """
+        names = {
+            name
+            for name, p in self._values.items()
+            if p.token == token and (name not in values or values[name] != p.value)
+        }
+        for name in names:
+            del self._values[name]
+        self._view = None
+        return names
+
+    def rollback(self, token: int) -> set[str]:
+        """Drop the values a write still owns and return their names."""
+        names = {name for name, p in self._values.items() if p.token == token}
+        for name in names:
+            del self._values[name]
+        self._view = None
+        return names
+
+    def reconcile(self, snapshot: DeviceSnapshot) -> set[str]:
+        """Drop values settled by a refresh and return their names.
+
+        Args:
+            snapshot: Decoded state of the refreshed device
+
+        """
+        settled = {
+            name
+            for name, pending in self._values.items()
+            if pending.completed or getattr(snapshot, name) == pending.value
+        }
+        for name in settled:
+            del self._values[name]
+        self._view = None
+        return settled
@@ -0,0 +1,103 @@
+"""Adaptive poll interval for the Sharp Cocoro Air integration."""
+
+from __future__ import annotations
+
+import random
+import time
+from collections.abc import Callable
+from datetime import timedelta
+
+from .const import FAST_POLL_WINDOW
+from .const import FAST_UPDATE_INTERVAL
+from .const import MAX_BACKOFF_INTERVAL
+from .const import MAX_IDLE_INTERVAL
+from .const import POWERED_OFF_INTERVAL
+from .const import UPDATE_INTERVAL
+
+# Growth factor applied to the interval for every poll that saw no change
+IDLE_GROWTH = 1.5
+
+# Cap on the exponent so long idle or failure streaks cannot overflow
+_MAX_EXPONENT = 16
+
+
+class AdaptivePollInterval:
+    """Decide how long to wait before the next poll of an account.
+
+    - Right after a command the account is polled every ``fast`` interval for
+      ``fast_window`` so the result shows up quickly.
+    - While polls keep returning the same state the interval grows from
+      ``base`` up to ``idle_max``; when every device is powered off it jumps
+      straight to ``powered_off``.
+    - After failures the interval backs off exponentially with jitter, up to
+      ``max_backoff``.
+
+    The fast window is timed with ``clock``, which replays replace by their
+    virtual time.
+    """
+
+    def __init__(
+        self,
+        *,
+        base: timedelta = UPDATE_INTERVAL,
+        fast: timedelta = FAST_UPDATE_INTERVAL,
+        fast_window: timedelta = FAST_POLL_WINDOW,
+        idle_max: timedelta = MAX_IDLE_INTERVAL,
+        powered_off: timedelta = POWERED_OFF_INTERVAL,
+        max_backoff: timedelta = MAX_BACKOFF_INTERVAL,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """Initialize the interval policy."""
+        self._base = base.total_seconds()
+        self._fast = fast.total_seconds()
+        self._fast_window = fast_window.total_seconds()
+        self._idle_max = idle_max.total_seconds()
+        self._powered_off = powered_off.total_seconds()
+        self._max_backoff = max_backoff.total_seconds()
+        self._clock = clock
+
+        self._fast_until = 0.0
+        self._unchanged_polls = 0
+        self._failures = 0
+        self._powered_on = True
+
+    @property
+    def failures(self) -> int:
+        """Return the number of consecutive failed polls."""
+        return self._failures
+
+    def boost(self) -> None:
+        """Poll fast for a while, e.g. after a command was sent."""
+        self._fast_until = self._clock() + self._fast_window
+        self._unchanged_polls = 0
+
+    def record_success(self, changed: bool, powered_on: bool) -> None:
+        """Record a successful poll."""
+        self._failures = 0
+        self._powered_on = powered_on
+        if changed:
+            self._unchanged_polls = 0
+        else:
+            self._unchanged_polls += 1
+
+    def record_failure(self) -> None:
+        """Record a failed poll."""
+        self._failures += 1
+
+    def next_delay(self) -> float:
+        """Return the number of seconds to wait before the next poll."""
+        if self._failures:
+            exponent = min(self._failures, _MAX_EXPONENT)
+            delay = min(self._base * 2.0**exponent, self._max_backoff)
+            # Equal jitter keeps accounts that failed together from retrying
+            # in lockstep while still guaranteeing half of the backoff
+            return delay / 2 + random.uniform(0, delay / 2)
+
+        if self._clock() < self._fast_until:
+            return self._fast
+
+        if not self._powered_on:
+            return self._powered_off
+
+        exponent = min(self._unchanged_polls, _MAX_EXPONENT)
+        return min(self._base * IDLE_GROWTH**exponent, self._idle_max)
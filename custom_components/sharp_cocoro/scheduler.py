@@ -0,0 +1,267 @@
+"""Shared scheduling of the cloud traffic of all Sharp Cocoro Air accounts."""
+
+from __future__ import annotations
+
+import asyncio
+import heapq
+import itertools
+import random
+import time
+from collections import Counter
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from enum import IntEnum
+from typing import Any
+
+from aiohttp import ClientSession
+from aiohttp import ClientTimeout
+from aiohttp import CookieJar
+from aiohttp import TCPConnector
+from aiohttp.abc import AbstractCookieJar
+
+from .const import ACCOUNT_STAGGER
+from .const import API_CHECK_CONTROLS
+from .const import API_EXECUTE
+from .const import API_LOGIN
+from .const import API_QUERY_DEVICES
+from .const import CONNECTION_KEEPALIVE
+from .const import DOMAIN
+from .const import MAX_CONCURRENT_REQUESTS
+from .const import POLL_JITTER
+from .const import REQUEST_BURST
+from .const import REQUEST_RATE
+from .const import REQUEST_TIMEOUT
+from .stats import payload_trace_config
+
+from homeassistant.core import callback
+from homeassistant.util.hass_dict import HassKey
+from homeassistant.util.ssl import get_default_context
+
+DATA_SCHEDULER: HassKey[CloudScheduler] = HassKey(DOMAIN)
+
+
+class RequestPriority(IntEnum):
+    """Order in which waiting cloud calls are sent, lowest first."""
+
+    COMMAND = 0
+    COMPLETION = 1
+    REFRESH = 2
+
+
+# Logins go first, every other call of the account waits for them
+REQUEST_PRIORITIES: dict[str, RequestPriority] = {
+    API_LOGIN: RequestPriority.COMMAND,
+    API_EXECUTE: RequestPriority.COMMAND,
+    API_CHECK_CONTROLS: RequestPriority.COMPLETION,
+    API_QUERY_DEVICES: RequestPriority.REFRESH,
+}
+
+
+class RequestLimiter:
+    """Hand out slots for cloud calls by priority, under a rate limit.
+
+    At most ``max_concurrent`` calls hold a slot at a time, and every slot
+    takes a token from a bucket refilled at ``rate`` per second that holds
+    up to ``burst`` tokens. Waiting calls get slots in priority order, and
+    in arrival order within a priority, so a command never waits behind
+    refreshes that were queued before it.
+    """
+
+    def __init__(
+        self,
+        max_concurrent: int = MAX_CONCURRENT_REQUESTS,
+        rate: float = REQUEST_RATE,
+        burst: int = REQUEST_BURST,
+    ) -> None:
+        """Initialize the limiter."""
+        self._free = max_concurrent
+        self._rate = rate
+        self._burst = burst
+        self._tokens = float(burst)
+        self._refilled_at = time.monotonic()
+        # (priority, arrival, future) of the calls waiting for a slot
+        self._waiting: list[tuple[int, int, asyncio.Future[None]]] = []
+        self._arrivals = itertools.count()
+        self._active: Counter[RequestPriority] = Counter()
+        self._refill_timer: asyncio.TimerHandle | None = None
+
+    @property
+    def commands_pending(self) -> bool:
+        """Return True while commands are waiting or being sent."""
+        return self._active[RequestPriority.COMMAND] > 0
+
+    @asynccontextmanager
+    async def slot(self, priority: RequestPriority) -> AsyncIterator[None]:
+        """Wait for a slot and hold it for the duration of the call."""
+        self._active[priority] += 1
+        try:
+            await self._async_acquire(priority)
+            try:
+                yield
+            finally:
+                self._free += 1
+                self._dispatch()
+        finally:
+            self._active[priority] -= 1
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the limiter state for diagnostics."""
+        self._refill()
+        return {
+            "free_slots": self._free,
+            "waiting": sum(not future.done() for *_, future in self._waiting),
+            "tokens": round(self._tokens, 1),
+            "active": {
+                priority.name.lower(): self._active[priority]
+                for priority in RequestPriority
+            },
+        }
+
+    async def _async_acquire(self, priority: RequestPriority) -> None:
+        """Queue up and wait until the call is handed a slot."""
+        future: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiting, (priority, next(self._arrivals), future))
+        self._dispatch()
+        try:
+            await future
+        except asyncio.CancelledError:
+            # Handed a slot just before the cancellation arrived
+            if future.done() and not future.cancelled():
+                self._free += 1
+                self._dispatch()
+            raise
+
+    def _dispatch(self) -> None:
+        """Hand free slots to the first waiting calls while tokens last."""
+        self._refill()
+        while self._waiting and self._free:
+            if self._waiting[0][2].done():
+                # Cancelled while waiting
+                heapq.heappop(self._waiting)
+                continue
+            if self._tokens < 1:
+                self._async_schedule_refill()
+                return
+            _priority, _arrival, future = heapq.heappop(self._waiting)
+            self._free -= 1
+            self._tokens -= 1
+            future.set_result(None)
+
+    def _refill(self) -> None:
+        """Add the tokens that accrued since the last refill."""
+        now = time.monotonic()
+        self._tokens = min(
+            self._burst, self._tokens + (now - self._refilled_at) * self._rate
+        )
+        self._refilled_at = now
+
+    def _async_schedule_refill(self) -> None:
+        """Dispatch again once the next token is available."""
+        if self._refill_timer is not None:
+            return
+
+        def _on_refill() -> None:
+            self._refill_timer = None
+            self._dispatch()
+
+        self._refill_timer = asyncio.get_running_loop().call_later(
+            (1 - self._tokens) / self._rate, _on_refill
+        )
+
+
+class CloudScheduler:
+    """Spread the cloud traffic of all configured accounts.
+
+    - Accounts are given start offsets ``stagger`` apart, so after a restart
+      they do not all log in and poll at the same moment
+    - Poll delays are jittered, so accounts do not fall into lockstep
+    - ``limiter`` caps and rate limits the cloud requests of all accounts,
+      and sends waiting commands before completion checks and refreshes
+    - All accounts share one connection pool; each gets its own session on
+      top of it, as the cloud keeps the login in a cookie
+
+    One scheduler is kept in ``hass.data`` while any account is set up.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_concurrent: int = MAX_CONCURRENT_REQUESTS,
+        stagger: float = ACCOUNT_STAGGER.total_seconds(),
+        jitter: float = POLL_JITTER,
+    ) -> None:
+        """Initialize the scheduler."""
+        self.limiter = RequestLimiter(max_concurrent)
+        self._max_concurrent = max_concurrent
+        self._stagger = stagger
+        self._jitter = jitter
+        self._slots: dict[str, int] = {}
+        self._sessions: dict[str, ClientSession] = {}
+        self._connector: TCPConnector | None = None
+
+    @property
+    def accounts(self) -> int:
+        """Return the number of registered accounts."""
+        return len(self._slots)
+
+    @callback
+    def async_register(self, entry_id: str) -> float:
+        """Add an account and return the seconds it should wait before polling.
+
+        Accounts take the lowest free slot, so the offsets of a restart stay
+        the same however the entries were added and removed before.
+        """
+        taken = set(self._slots.values())
+        slot = next(i for i in itertools.count() if i not in taken)
+        self._slots[entry_id] = slot
+        return slot * self._stagger + random.uniform(0, self._stagger * self._jitter)
+
+    async def async_unregister(self, entry_id: str) -> bool:
+        """Remove an account and close its session.
+
+        The shared pool is closed with the last account; returns True then.
+        """
+        self._slots.pop(entry_id, None)
+        if (session := self._sessions.pop(entry_id, None)) is not None:
+            await session.close()
+        if self._slots:
+            return False
+        if self._connector is not None:
+            await self._connector.close()
+            self._connector = None
+        return True
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the scheduler state for diagnostics."""
+        return {
+            "accounts": self.accounts,
+            "max_concurrent": self._max_concurrent,
+            "limiter": self.limiter.as_dict(),
+        }
+
+    def jitter(self, delay: float) -> float:
+        """Return the delay varied randomly by up to the jitter fraction."""
+        return delay * random.uniform(1 - self._jitter, 1 + self._jitter)
+
+    @callback
+    def async_create_session(
+        self, entry_id: str, cookie_jar: AbstractCookieJar | None = None
+    ) -> ClientSession:
+        """Return the session of an account, on top of the shared pool."""
+        if self._connector is None or self._connector.closed:
+            # Requests are capped by the limiter, so the pool never needs
+            # more connections than that
+            self._connector = TCPConnector(
+                ssl=get_default_context(),
+                limit=self._max_concurrent,
+                keepalive_timeout=CONNECTION_KEEPALIVE.total_seconds(),
+                ttl_dns_cache=300,
+            )
+        session = self._sessions[entry_id] = ClientSession(
+            connector=self._connector,
+            connector_owner=False,
+            cookie_jar=CookieJar() if cookie_jar is None else cookie_jar,
+            timeout=ClientTimeout(total=REQUEST_TIMEOUT.total_seconds()),
+            trace_configs=[payload_trace_config()],
+        )
+        return session
@@ -1,25 +1,157 @@
 """Sensor platform for Sharp Cocoro Air."""
 
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import timedelta
 from typing import TYPE_CHECKING
 
-from propcache.api import cached_property
-
-from sharp_cocoro import Cocoro
-
-from . import SharpCocoroData
+from .const import API_CALLS
 from .const import DOMAIN
+from .const import ENERGY_TOLERANCE
+from .const import HUMIDITY_TOLERANCE
+from .const import POWER_CONSUMPTION_TOLERANCE
+from .const import PROP_ENERGY
+from .const import PROP_HUMIDITY
+from .const import PROP_OUTDOOR_TEMPERATURE
+from .const import PROP_POWER_CONSUMPTION
+from .const import PROP_ROOM_TEMPERATURE
+from .const import SIGNAL_DEVICE_UPDATED
+from .data import SharpCocoroData
+from .stats import CallStats
 
 from homeassistant.components.sensor import SensorDeviceClass
 from homeassistant.components.sensor import SensorEntity
+from homeassistant.components.sensor import SensorEntityDescription
+from homeassistant.components.sensor import SensorStateClass
 from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import PERCENTAGE
 from homeassistant.const import PRECISION_TENTHS
+from homeassistant.const import EntityCategory
+from homeassistant.const import UnitOfEnergy
+from homeassistant.const import UnitOfPower
 from homeassistant.const import UnitOfTemperature
+from homeassistant.const import UnitOfTime
 from homeassistant.core import HomeAssistant
+from homeassistant.core import callback
+from homeassistant.helpers.device_registry import DeviceEntryType
 from homeassistant.helpers.device_registry import DeviceInfo
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 
 if TYPE_CHECKING:
     from sharp_cocoro import Aircon
+    from sharp_cocoro import Cocoro
+
+# The API stats sensors are polled, everything else is pushed by the coordinator
+SCAN_INTERVAL = timedelta(seconds=60)
+
+
+def _ms(seconds: float | None) -> float | None:
+    return None if seconds is None else round(seconds * 1000, 1)
+
+
+@dataclass(frozen=True, kw_only=True)
+class ApiStatsSensorEntityDescription(SensorEntityDescription):
+    """Describes a sensor derived from the stats of one kind of cloud call."""
+
+    value_fn: Callable[[CallStats], float | int | None]
+
+
+API_STATS_SENSORS: tuple[ApiStatsSensorEntityDescription, ...] = (
+    ApiStatsSensorEntityDescription(
+        key="latency_p50",
+        name="latency p50",
+        device_class=SensorDeviceClass.DURATION,
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda stats: _ms(stats.percentile(50)),
+    ),
+    ApiStatsSensorEntityDescription(
+        key="latency_p95",
+        name="latency p95",
+        device_class=SensorDeviceClass.DURATION,
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda stats: _ms(stats.percentile(95)),
+    ),
+    ApiStatsSensorEntityDescription(
+        key="successes",
+        name="successes",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        value_fn=lambda stats: stats.successes,
+    ),
+    ApiStatsSensorEntityDescription(
+        key="failures",
+        name="failures",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        value_fn=lambda stats: stats.failures,
+    ),
+    ApiStatsSensorEntityDescription(
+        key="retries",
+        name="retries",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        value_fn=lambda stats: stats.retries,
+    ),
+)
+
+
+@dataclass(frozen=True, kw_only=True)
+class SharpCocoroSensorEntityDescription(SensorEntityDescription):
+    """Describes a numeric device property; the key names the snapshot attribute."""
+
+    # State is only written when the value moved by more than this
+    tolerance: float = 0
+    # None keeps the unique ID the room temperature sensor always had
+    unique_id_suffix: str | None
+
+
+DEVICE_SENSORS: tuple[SharpCocoroSensorEntityDescription, ...] = (
+    SharpCocoroSensorEntityDescription(
+        key=PROP_ROOM_TEMPERATURE,
+        name="Temperature",
+        unique_id_suffix=None,
+        device_class=SensorDeviceClass.TEMPERATURE,
+        native_unit_of_measurement=UnitOfTemperature.CELSIUS,
+        state_class=SensorStateClass.MEASUREMENT,
+        suggested_display_precision=int(PRECISION_TENTHS),
+    ),
+    SharpCocoroSensorEntityDescription(
+        key=PROP_HUMIDITY,
+        name="Humidity",
+        unique_id_suffix=PROP_HUMIDITY,
+        device_class=SensorDeviceClass.HUMIDITY,
+        native_unit_of_measurement=PERCENTAGE,
+        state_class=SensorStateClass.MEASUREMENT,
+        tolerance=HUMIDITY_TOLERANCE,
+    ),
+    SharpCocoroSensorEntityDescription(
+        key=PROP_OUTDOOR_TEMPERATURE,
+        name="Outdoor temperature",
+        unique_id_suffix=PROP_OUTDOOR_TEMPERATURE,
+        device_class=SensorDeviceClass.TEMPERATURE,
+        native_unit_of_measurement=UnitOfTemperature.CELSIUS,
+        state_class=SensorStateClass.MEASUREMENT,
+    ),
+    SharpCocoroSensorEntityDescription(
+        key=PROP_POWER_CONSUMPTION,
+        name="Power",
+        unique_id_suffix=PROP_POWER_CONSUMPTION,
+        device_class=SensorDeviceClass.POWER,
+        native_unit_of_measurement=UnitOfPower.WATT,
+        state_class=SensorStateClass.MEASUREMENT,
+        tolerance=POWER_CONSUMPTION_TOLERANCE,
+    ),
+    SharpCocoroSensorEntityDescription(
+        key=PROP_ENERGY,
+        name="Energy",
+        unique_id_suffix=PROP_ENERGY,
+        device_class=SensorDeviceClass.ENERGY,
+        native_unit_of_measurement=UnitOfEnergy.KILO_WATT_HOUR,
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        suggested_display_precision=2,
+        tolerance=ENERGY_TOLERANCE,
+    ),
+)
 
 
 async def async_setup_entry(
@@ -29,32 +161,52 @@ async def async_setup_entry(
     cocoro_device = entry.runtime_data
     assert isinstance(cocoro_device, SharpCocoroData)
 
-    async_add_entities([SharpCocoroSensor(cocoro_device)])
+    # Only properties the device actually reports get a sensor
+    async_add_entities(
+        SharpCocoroSensor(cocoro_device, device_id, description)
+        for device_id, snapshot in cocoro_device.snapshots.items()
+        for description in DEVICE_SENSORS
+        if getattr(snapshot, description.key) is not None
+    )
+    async_add_entities(
+        SharpCocoroApiStatsSensor(cocoro_device, entry.entry_id, call, description)
+        for call in API_CALLS
+        for description in API_STATS_SENSORS
+    )
 
 
 class SharpCocoroSensor(SensorEntity):
-    """Representation of a Sharp Cocoro Air fan."""
+    """Numeric property of a Sharp Cocoro Air device."""
 
-    _attr_native_unit_of_measurement = UnitOfTemperature.CELSIUS
-    _attr_device_class = SensorDeviceClass.TEMPERATURE
-    _attr_suggested_display_precision = int(PRECISION_TENTHS)
+    entity_description: SharpCocoroSensorEntityDescription
+    _attr_should_poll = False
 
     @property
     def _device(self) -> "Aircon":
-        return self._cocoro_data.device  # type: ignore[return-value]
+        return self._cocoro_data.devices[self._device_id]
 
     @property
-    def _cocoro(self) -> Cocoro:
+    def _cocoro(self) -> "Cocoro":
         return self._cocoro_data.cocoro
 
-    def __init__(self, cocoro_device: SharpCocoroData):
-        """Initialize the fan."""
+    def __init__(
+        self,
+        cocoro_device: SharpCocoroData,
+        device_id: int,
+        description: SharpCocoroSensorEntityDescription,
+    ):
+        """Initialize the sensor."""
+        self.entity_description = description
         self._cocoro_data = cocoro_device
+        self._device_id = device_id
+        self._written_value: float | int | None = None
 
-        # Initialize other necessary attributes
-        # concat device_id and "fan"
-        self.name = self._device.name + " Temperature"
-        self.unique_id = str(self._device.device_id)
+        self._attr_name = f"{self._device.name} {description.name}"
+        self._attr_unique_id = (
+            str(device_id)
+            if description.unique_id_suffix is None
+            else f"{device_id}_{description.unique_id_suffix}"
+        )
         self._attr_device_info = DeviceInfo(
             identifiers={(DOMAIN, str(self._device.device_id))},
             name=self._device.name,
@@ -63,21 +215,78 @@ class SharpCocoroSensor(SensorEntity):
             serial_number=self._device.serial_number,
         )
 
-    async def async_added_to_hass(self):
+    @property
+    def available(self) -> bool:
+        """Return False while the Sharp Cocoro cloud is unreachable."""
+        return self._cocoro_data.coordinator.available
+
+    async def async_added_to_hass(self) -> None:
         """Run when entity about to be added to hass."""
         await super().async_added_to_hass()
-        self._remove_listener = self.hass.bus.async_listen(
-            "sharp_cocoro.device_updated", self._handle_device_update
+        self.async_on_remove(
+            async_dispatcher_connect(
+                self.hass,
+                SIGNAL_DEVICE_UPDATED.format(self._device_id),
+                self._handle_device_update,
+            )
         )
 
-    async def _handle_device_update(self, event):
-        print("handle device update called", event)
-        device_id = event.data.get("device_id")
-        if device_id == self._device.device_id:
-            # await self.async_update_ha_state()
+    @callback
+    def _handle_device_update(self, changed: list[str] | None) -> None:
+        if changed is None or (
+            self.entity_description.key in changed and self._exceeds_tolerance()
+        ):
             self.async_write_ha_state()
 
-    @cached_property
-    def native_value(self):
+    def _exceeds_tolerance(self) -> bool:
+        """Return True if the value moved beyond the tolerance since the last write."""
+        value = self.native_value
+        if value is None or self._written_value is None:
+            return value != self._written_value
+        return abs(value - self._written_value) > self.entity_description.tolerance
+
+    @callback
+    def async_write_ha_state(self) -> None:
+        """Write the state and remember the value it was written with."""
+        self._written_value = self.native_value
+        super().async_write_ha_state()
+
+    @property
+    def native_value(self) -> float | int | None:
         """Return the state of the sensor."""
-        return self._device.get_room_temperature()
+        snapshot = self._cocoro_data.snapshots[self._device_id]
+        value: float | int | None = getattr(snapshot, self.entity_description.key)
+        return value
+
+
+class SharpCocoroApiStatsSensor(SensorEntity):
+    """Diagnostic sensor exposing latency or outcome counts of a cloud call."""
+
+    entity_description: ApiStatsSensorEntityDescription
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_entity_registry_enabled_default = False
+
+    def __init__(
+        self,
+        cocoro_data: SharpCocoroData,
+        entry_id: str,
+        call: str,
+        description: ApiStatsSensorEntityDescription,
+    ):
+        """Initialize the sensor."""
+        self.entity_description = description
+        self._stats = cocoro_data.api_stats.calls[call]
+
+        self._attr_name = f"Sharp Cocoro {call} {description.name}"
+        self._attr_unique_id = f"{entry_id}_{call}_{description.key}"
+        self._attr_device_info = DeviceInfo(
+            identifiers={(DOMAIN, entry_id)},
+            name="Sharp Cocoro Air",
+            manufacturer="Sharp",
+            entry_type=DeviceEntryType.SERVICE,
+        )
+
+    @property
+    def native_value(self) -> float | int | None:
+        """Return the current value of the stat."""
+        return self.entity_description.value_fn(self._stats)
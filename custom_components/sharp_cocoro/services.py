@@ -0,0 +1,134 @@
+"""Services of the Sharp Cocoro Air integration."""
+
+from __future__ import annotations
+
+import logging
+
+import voluptuous as vol
+
+from .const import APPLY_STATE_CONCURRENCY
+from .const import DOMAIN
+from .const import MAX_APPLY_STATE_CONCURRENCY
+
+from homeassistant.components.climate.const import ATTR_FAN_MODE
+from homeassistant.components.climate.const import ATTR_HVAC_MODE
+from homeassistant.components.climate.const import ATTR_SWING_MODE
+from homeassistant.components.climate.const import DOMAIN as CLIMATE_DOMAIN
+from homeassistant.components.climate.const import HVACMode
+from homeassistant.config_entries import ConfigEntryState
+from homeassistant.const import ATTR_TEMPERATURE
+from homeassistant.core import HomeAssistant
+from homeassistant.core import ServiceCall
+from homeassistant.core import ServiceResponse
+from homeassistant.core import SupportsResponse
+from homeassistant.core import callback
+from homeassistant.exceptions import ServiceValidationError
+from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers import entity_registry as er
+from homeassistant.helpers.service import async_extract_referenced_entity_ids
+
+_LOGGER = logging.getLogger(__name__)
+
+SERVICE_APPLY_STATE = "apply_state"
+ATTR_MAX_CONCURRENT = "max_concurrent"
+
+APPLY_STATE_SCHEMA = vol.All(
+    cv.make_entity_service_schema(
+        {
+            vol.Optional(ATTR_HVAC_MODE): vol.Coerce(HVACMode),
+            vol.Optional(ATTR_TEMPERATURE): vol.Coerce(float),
+            vol.Optional(ATTR_FAN_MODE): cv.string,
+            vol.Optional(ATTR_SWING_MODE): cv.string,
+            vol.Optional(ATTR_MAX_CONCURRENT, default=APPLY_STATE_CONCURRENCY): vol.All(
+                vol.Coerce(int), vol.Range(min=1, max=MAX_APPLY_STATE_CONCURRENCY)
+            ),
+        }
+    ),
+    cv.has_at_least_one_key(
+        ATTR_HVAC_MODE, ATTR_TEMPERATURE, ATTR_FAN_MODE, ATTR_SWING_MODE
+    ),
+)
+
+
+@callback
+def async_setup_services(hass: HomeAssistant) -> None:
+    """Register the services of the integration."""
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_APPLY_STATE,
+        _async_apply_state,
+        schema=APPLY_STATE_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+
+
+async def _async_apply_state(call: ServiceCall) -> ServiceResponse:
+    """Bring the targeted air conditioners to one state together.
+
+    The response maps every targeted climate entity to whether its write
+    succeeded, and the error if it did not.
+    """
+    hass = call.hass
+    # Targets are resolved to the climate entities of loaded entries, which
+    # are keyed by the ID of their device
+    entity_registry = er.async_get(hass)
+    selected = async_extract_referenced_entity_ids(hass, call)
+    entity_ids = []
+    targets = []
+    for entity_id in sorted(selected.referenced | selected.indirectly_referenced):
+        entity = entity_registry.async_get(entity_id)
+        if (
+            entity is None
+            or entity.platform != DOMAIN
+            or entity.domain != CLIMATE_DOMAIN
+            or entity.config_entry_id is None
+        ):
+            continue
+        entry = hass.config_entries.async_get_entry(entity.config_entry_id)
+        if entry is None or entry.state is not ConfigEntryState.LOADED:
+            continue
+        device_id = int(entity.unique_id)
+        if device_id not in entry.runtime_data.devices:
+            continue
+        entity_ids.append(entity_id)
+        targets.append((entry.runtime_data, device_id))
+
+    if not targets:
+        raise ServiceValidationError("No Sharp Cocoro air conditioners targeted")
+
+    # With a loaded entry the client library is imported already
+    from .bulk import TargetState  # noqa: PLC0415
+    from .bulk import async_apply_state  # noqa: PLC0415
+    from .climate import FANMODE_WINDSPEED_MAPPING  # noqa: PLC0415
+    from .climate import HVAC_MODES  # noqa: PLC0415
+    from .climate import SWING_FANDIRECTION_MAPPING  # noqa: PLC0415
+
+    for key, allowed in (
+        (ATTR_HVAC_MODE, HVAC_MODES),
+        (ATTR_FAN_MODE, FANMODE_WINDSPEED_MAPPING),
+        (ATTR_SWING_MODE, SWING_FANDIRECTION_MAPPING),
+    ):
+        if (value := call.data.get(key)) is not None and value not in allowed:
+            raise ServiceValidationError(f"Unsupported {key}: {value}")
+
+    target = TargetState(
+        hvac_mode=call.data.get(ATTR_HVAC_MODE),
+        temperature=call.data.get(ATTR_TEMPERATURE),
+        fan_mode=call.data.get(ATTR_FAN_MODE),
+        swing_mode=call.data.get(ATTR_SWING_MODE),
+    )
+    _LOGGER.debug("Applying %s to %d devices", target, len(targets))
+    errors = await async_apply_state(targets, target, call.data[ATTR_MAX_CONCURRENT])
+
+    if failed := [
+        entity_id
+        for entity_id, error in zip(entity_ids, errors, strict=True)
+        if error is not None
+    ]:
+        _LOGGER.warning("Failed to apply state to %s", ", ".join(failed))
+    return {
+        "results": {
+            entity_id: {"success": error is None, "error": error}
+            for entity_id, error in zip(entity_ids, errors, strict=True)
+        }
+    }
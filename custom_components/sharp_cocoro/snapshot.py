@@ -0,0 +1,151 @@
+"""Decoded device state for the Sharp Cocoro Air integration."""
+
+from __future__ import annotations
+
+from collections.abc import Mapping
+from typing import Any
+
+from sharp_cocoro import Device
+from sharp_cocoro.devices.aircon.aircon_properties import FanDirection
+from sharp_cocoro.devices.aircon.aircon_properties import StatusCode
+from sharp_cocoro.devices.aircon.aircon_properties import ValueSingle
+from sharp_cocoro.state import State8
+
+from .const import PROP_ENERGY
+from .const import PROP_FAN_DIRECTION
+from .const import PROP_HUMIDITY
+from .const import PROP_OPERATION_MODE
+from .const import PROP_OUTDOOR_TEMPERATURE
+from .const import PROP_POWER
+from .const import PROP_POWER_CONSUMPTION
+from .const import PROP_ROOM_TEMPERATURE
+from .const import PROP_TEMPERATURE
+from .const import PROP_WINDSPEED
+
+TRACKED_PROPERTIES = (
+    PROP_POWER,
+    PROP_OPERATION_MODE,
+    PROP_TEMPERATURE,
+    PROP_WINDSPEED,
+    PROP_FAN_DIRECTION,
+    PROP_ROOM_TEMPERATURE,
+    PROP_HUMIDITY,
+    PROP_OUTDOOR_TEMPERATURE,
+    PROP_POWER_CONSUMPTION,
+    PROP_ENERGY,
+)
+
+_SINGLE_PROPERTIES = {
+    StatusCode.POWER.value: PROP_POWER,
+    StatusCode.OPERATION_MODE.value: PROP_OPERATION_MODE,
+    StatusCode.WINDSPEED.value: PROP_WINDSPEED,
+}
+
+# Numeric (valueRange) properties by ECHONET Lite code, with the factor that
+# turns the reported integer into the unit we expose
+_RANGE_PROPERTIES: dict[str, tuple[str, float]] = {
+    StatusCode.ROOM_TEMPERATURE.value: (PROP_ROOM_TEMPERATURE, 1),
+    "BA": (PROP_HUMIDITY, 1),
+    "BE": (PROP_OUTDOOR_TEMPERATURE, 1),
+    "84": (PROP_POWER_CONSUMPTION, 1),
+    # Reported in 0.001 kWh
+    "85": (PROP_ENERGY, 0.001),
+}
+
+
+def _decode_status(device: Device) -> dict[str, Any]:
+    """Decode the tracked properties from one pass over the device status.
+
+    Properties the device does not report, or reports with a value the
+    library does not know, are left out.
+    """
+    values: dict[str, Any] = {}
+    for status in device.status:
+        code = status.statusCode
+        if isinstance(code, StatusCode):
+            code = code.value
+        try:
+            if (name := _SINGLE_PROPERTIES.get(code)) is not None:
+                values[name] = ValueSingle(status.valueSingle["code"])
+            elif code == StatusCode.STATE_DETAIL:
+                state = State8(status.valueBinary["code"])
+                values[PROP_TEMPERATURE] = state.temperature
+                values[PROP_FAN_DIRECTION] = FanDirection(state.fan_direction)
+            elif (prop := _RANGE_PROPERTIES.get(code)) is not None:
+                name, factor = prop
+                value = int(status.valueRange["code"])
+                values[name] = value if factor == 1 else round(value * factor, 3)
+        except (AttributeError, KeyError, TypeError, ValueError):
+            continue
+    return values
+
+
+class DeviceSnapshot:
+    """Immutable, decoded view of the tracked properties of a device.
+
+    A snapshot is built once per refresh that changed a device's status, so
+    entities read plain attributes instead of decoding the raw status on
+    every state write. Properties that could not be decoded are None.
+    """
+
+    __slots__ = TRACKED_PROPERTIES
+
+    power: ValueSingle | None
+    operation_mode: ValueSingle | None
+    temperature: float | None
+    windspeed: ValueSingle | None
+    fan_direction: FanDirection | None
+    room_temperature: int | None
+    humidity: int | None
+    outdoor_temperature: int | None
+    power_consumption: int | None
+    energy: float | None
+
+    def __init__(self, values: Mapping[str, Any]) -> None:
+        """Initialize the snapshot from decoded values."""
+        for name in TRACKED_PROPERTIES:
+            object.__setattr__(self, name, values.get(name))
+
+    @classmethod
+    def from_device(cls, device: Device) -> DeviceSnapshot:
+        """Decode a device's reported status."""
+        return cls(_decode_status(device))
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        """Refuse to change the snapshot."""
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __delattr__(self, name: str) -> None:
+        """Refuse to change the snapshot."""
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __eq__(self, other: object) -> bool:
+        """Return True if both snapshots hold the same values."""
+        if not isinstance(other, DeviceSnapshot):
+            return NotImplemented
+        return self.as_dict() == other.as_dict()
+
+    def __hash__(self) -> int:
+        """Hash the values."""
+        return hash(tuple(getattr(self, name) for name in TRACKED_PROPERTIES))
+
+    def __repr__(self) -> str:
+        """Return a readable representation."""
+        values = ", ".join(f"{k}={v!r}" for k, v in self.as_dict().items())
+        return f"{type(self).__name__}({values})"
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the values keyed by property name."""
+        return {name: getattr(self, name) for name in TRACKED_PROPERTIES}
+
+    def replace(self, values: Mapping[str, Any]) -> DeviceSnapshot:
+        """Return a copy with some values replaced."""
+        return DeviceSnapshot({**self.as_dict(), **values})
+
+    def diff(self, other: DeviceSnapshot) -> set[str]:
+        """Return the names of the properties that differ from another snapshot."""
+        return {
+            name
+            for name in TRACKED_PROPERTIES
+            if getattr(self, name) != getattr(other, name)
+        }
@@ -0,0 +1,199 @@
+"""Cloud call instrumentation for the Sharp Cocoro Air integration."""
+
+from __future__ import annotations
+
+import time
+from collections import deque
+from collections.abc import Iterator
+from collections.abc import MutableSequence
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from datetime import UTC
+from datetime import datetime
+from types import SimpleNamespace
+from typing import Any
+
+from aiohttp import ClientSession
+from aiohttp import TraceConfig
+from aiohttp import TraceRequestChunkSentParams
+from aiohttp import TraceResponseChunkReceivedParams
+
+from .const import API_CALL_LOG_SIZE
+from .const import API_CALLS
+from .const import API_LATENCY_SAMPLES
+from .errors import describe_error
+
+# Record of the call the current task is making, for the HTTP trace hooks
+_CURRENT_CALL: ContextVar[CallRecord | None] = ContextVar(
+    "sharp_cocoro_call", default=None
+)
+
+
+class CallStats:
+    """Latency samples and outcome counters for one kind of cloud call."""
+
+    def __init__(self, max_samples: int = API_LATENCY_SAMPLES) -> None:
+        """Initialize the counters."""
+        self.durations: deque[float] = deque(maxlen=max_samples)
+        self.successes = 0
+        self.failures = 0
+        self.retries = 0
+        self.last_error: str | None = None
+
+    def percentile(self, pct: float) -> float | None:
+        """Return a percentile of the recent durations in seconds."""
+        if not self.durations:
+            return None
+        ordered = sorted(self.durations)
+        index = min(len(ordered) - 1, round(pct / 100 * (len(ordered) - 1)))
+        return ordered[index]
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the stats for diagnostics."""
+        return {
+            "samples": len(self.durations),
+            "p50_ms": _to_ms(self.percentile(50)),
+            "p95_ms": _to_ms(self.percentile(95)),
+            "p99_ms": _to_ms(self.percentile(99)),
+            "max_ms": _to_ms(max(self.durations, default=None)),
+            "successes": self.successes,
+            "failures": self.failures,
+            "retries": self.retries,
+            "last_error": self.last_error,
+        }
+
+
+@dataclass(slots=True)
+class CallRecord:
+    """One cloud call as kept in the recent call log.
+
+    Only sizes of the payloads are kept, never their content.
+    """
+
+    name: str
+    device_id: int | None
+    started: float
+    duration: float | None = None
+    outcome: str | None = None
+    control_ids: tuple[str, ...] = ()
+    request_bytes: int = 0
+    response_bytes: int = 0
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the record for diagnostics."""
+        return {
+            "call": self.name,
+            "device_id": self.device_id,
+            "started": datetime.fromtimestamp(self.started, UTC).isoformat(),
+            "duration_ms": _to_ms(self.duration),
+            "outcome": self.outcome,
+            "control_ids": list(self.control_ids),
+            "request_bytes": self.request_bytes,
+            "response_bytes": self.response_bytes,
+        }
+
+
+class ApiStats:
+    """Time every cloud call of an account and count its outcomes.
+
+    The last ``log_size`` calls are also kept one by one, for diagnostics.
+    The log holds small fixed records and drops the oldest one when full, so
+    it can stay on all the time.
+    """
+
+    def __init__(self, log_size: int = API_CALL_LOG_SIZE) -> None:
+        """Initialize stats for all tracked calls."""
+        self.calls: dict[str, CallStats] = {name: CallStats() for name in API_CALLS}
+        self.log: deque[CallRecord] = deque(maxlen=log_size)
+
+    @contextmanager
+    def track(self, name: str, device_id: int | None = None) -> Iterator[CallRecord]:
+        """Time the wrapped call and record whether it raised.
+
+        The yielded record is added to the call log; HTTP requests made by
+        the call add their payload sizes to it.
+        """
+        stats = self.calls[name]
+        record = CallRecord(name, device_id, time.time())
+        self.log.append(record)
+        token = _CURRENT_CALL.set(record)
+        start = time.monotonic()
+        try:
+            yield record
+        except Exception as err:
+            stats.failures += 1
+            stats.last_error = describe_error(err)
+            record.outcome = type(err).__name__
+            raise
+        else:
+            stats.successes += 1
+            record.outcome = "success"
+        finally:
+            _CURRENT_CALL.reset(token)
+            record.duration = time.monotonic() - start
+            stats.durations.append(record.duration)
+
+    def record_retry(self, name: str) -> None:
+        """Record that a failed call is being retried."""
+        self.calls[name].retries += 1
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the stats of all calls for diagnostics."""
+        return {name: stats.as_dict() for name, stats in self.calls.items()}
+
+    def recent_calls(self, device_id: int | None = None) -> list[dict[str, Any]]:
+        """Return the call log, oldest first, optionally of one device only."""
+        return [
+            record.as_dict()
+            for record in self.log
+            if device_id is None or record.device_id == device_id
+        ]
+
+
+def control_ids(result: Any) -> tuple[str, ...]:
+    """Return the IDs of the controls a call's response refers to."""
+    if isinstance(result, dict):
+        # Accepted controls, as returned when executing updates
+        return tuple(
+            control["id"]
+            for control in result.get("controlList", ())
+            if "id" in control
+        )
+    # Results of checked controls
+    return tuple(item.id for item in getattr(result, "resultList", ()))
+
+
+def payload_trace_config() -> TraceConfig:
+    """Return a trace config counting the payload bytes of tracked calls."""
+
+    async def _on_request_chunk_sent(
+        _session: ClientSession,
+        _context: SimpleNamespace,
+        params: TraceRequestChunkSentParams,
+    ) -> None:
+        if (record := _CURRENT_CALL.get()) is not None:
+            record.request_bytes += len(params.chunk)
+
+    async def _on_response_chunk_received(
+        _session: ClientSession,
+        _context: SimpleNamespace,
+        params: TraceResponseChunkReceivedParams,
+    ) -> None:
+        if (record := _CURRENT_CALL.get()) is not None:
+            record.response_bytes += len(params.chunk)
+
+    trace_config = TraceConfig()
+    # aiohttp 3.12.13 annotates its signals for aiosignal < 1.4, which newer
+    # aiosignal reads as lists of callbacks taking the callback protocol
+    request_chunk_sent: MutableSequence[Any] = trace_config.on_request_chunk_sent
+    request_chunk_sent.append(_on_request_chunk_sent)
+    response_chunk_received: MutableSequence[Any] = (
+        trace_config.on_response_chunk_received
+    )
+    response_chunk_received.append(_on_response_chunk_received)
+    return trace_config
+
+
+def _to_ms(seconds: float | None) -> float | None:
+    return None if seconds is None else round(seconds * 1000, 1)
@@ -0,0 +1,145 @@
+"""Persisted device snapshot for the Sharp Cocoro Air integration."""
+
+from __future__ import annotations
+
+import dataclasses
+import logging
+from typing import Any
+
+from sharp_cocoro import Aircon
+from sharp_cocoro import Device
+from sharp_cocoro.properties import BinaryProperty
+from sharp_cocoro.properties import BinaryPropertyStatus
+from sharp_cocoro.properties import DeviceType
+from sharp_cocoro.properties import Property
+from sharp_cocoro.properties import PropertyStatus
+from sharp_cocoro.properties import RangeProperty
+from sharp_cocoro.properties import RangePropertyStatus
+from sharp_cocoro.properties import SingleProperty
+from sharp_cocoro.properties import SinglePropertyStatus
+from sharp_cocoro.properties import ValueType
+from sharp_cocoro.properties import enum_to_str
+from sharp_cocoro.response_types import Box
+
+from .const import DOMAIN
+from .const import SNAPSHOT_SAVE_DELAY
+
+from homeassistant.core import HomeAssistant
+from homeassistant.core import callback
+from homeassistant.helpers.storage import Store
+
+_LOGGER = logging.getLogger(__name__)
+
+STORAGE_VERSION = 1
+
+_PROPERTY_TYPES: dict[ValueType, type[Property]] = {
+    ValueType.SINGLE: SingleProperty,
+    ValueType.BINARY: BinaryProperty,
+    ValueType.RANGE: RangeProperty,
+}
+
+_STATUS_TYPES: dict[ValueType, type[PropertyStatus]] = {
+    ValueType.SINGLE: SinglePropertyStatus,
+    ValueType.BINARY: BinaryPropertyStatus,
+    ValueType.RANGE: RangePropertyStatus,
+}
+
+
+def device_to_dict(device: Device) -> dict[str, Any]:
+    """Serialize a device into JSON compatible data."""
+    return {
+        "name": device.name,
+        "device_id": device.device_id,
+        "echonet_node": device.echonet_node,
+        "echonet_object": device.echonet_object,
+        "maker": device.maker,
+        "model": device.model,
+        "serial_number": device.serial_number,
+        "box": dataclasses.asdict(device.box),
+        "properties": [
+            {**dataclasses.asdict(prop), "valueType": enum_to_str(prop.valueType)}
+            for prop in device.properties
+        ],
+        "status": [status.to_map() for status in device.status],
+    }
+
+
+def device_from_dict(data: dict[str, Any]) -> Aircon:
+    """Restore an aircon serialized with device_to_dict."""
+    properties = []
+    for prop in data["properties"]:
+        value_type = ValueType(prop["valueType"])
+        properties.append(
+            _PROPERTY_TYPES[value_type](**{**prop, "valueType": value_type})
+        )
+
+    status = []
+    for item in data["status"]:
+        value_type = ValueType(item["valueType"])
+        status.append(
+            _STATUS_TYPES[value_type](
+                item["statusCode"], item[value_type.value], valueType=value_type
+            )
+        )
+
+    return Aircon(
+        name=data["name"],
+        kind=DeviceType.AirCondition,
+        device_id=data["device_id"],
+        echonet_node=data["echonet_node"],
+        echonet_object=data["echonet_object"],
+        properties=properties,
+        status=status,
+        maker=data["maker"],
+        model=data["model"],
+        serial_number=data["serial_number"],
+        box=Box(**data["box"]),
+    )
+
+
+class DeviceSnapshotStore:
+    """Keep the last known devices of an account on disk.
+
+    The snapshot lets setup create entities with their last known state
+    before the cloud has answered.
+    """
+
+    def __init__(self, hass: HomeAssistant, entry_id: str) -> None:
+        """Initialize the store."""
+        self._store: Store[dict[str, Any]] = Store(
+            hass, STORAGE_VERSION, f"{DOMAIN}.{entry_id}"
+        )
+
+    async def async_load(self) -> dict[int, Device] | None:
+        """Return the stored devices keyed by ID, or None if there are none."""
+        data = await self._store.async_load()
+        if not data or not data.get("devices"):
+            return None
+
+        devices: dict[int, Device] = {}
+        try:
+            for item in data["devices"]:
+                device = device_from_dict(item)
+                devices[device.device_id] = device
+        except (KeyError, TypeError, ValueError) as e:
+            _LOGGER.warning("Ignoring unreadable device snapshot: %s", e)
+            return None
+        return devices
+
+    @callback
+    def async_schedule_save(self, devices: dict[int, Device]) -> None:
+        """Save the devices once the save delay passed."""
+        self._store.async_delay_save(
+            lambda: {"devices": [device_to_dict(d) for d in devices.values()]},
+            SNAPSHOT_SAVE_DELAY.total_seconds(),
+        )
+
+    async def async_save(self, devices: dict[int, Device]) -> None:
+        """Save the devices right away."""
+        await self._store.async_save(
+            {"devices": [device_to_dict(d) for d in devices.values()]}
+        )
+
+    async def async_remove(self) -> None:
+        """Delete the snapshot."""
+        await self._store.async_remove()
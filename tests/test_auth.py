@@ -0,0 +1,81 @@
+"""Tests for the auth manager."""
+
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from custom_components.sharp_cocoro.auth import AuthManager
+from custom_components.sharp_cocoro.const import API_LOGIN
+from custom_components.sharp_cocoro.const import API_QUERY_DEVICES
+from custom_components.sharp_cocoro.stats import ApiStats
+
+
+class _FakeCocoro:
+    """Count logins and reject requests until one succeeded."""
+
+    def __init__(self) -> None:
+        self.logins = 0
+        self.requests = 0
+
+    async def login(self) -> None:
+        await asyncio.sleep(0)
+        self.logins += 1
+
+    async def query_devices(self) -> list[str]:
+        self.requests += 1
+        if not self.logins:
+            raise RuntimeError("401 Unauthorized")
+        return ["device"]
+
+
+def test_concurrent_rejected_requests_log_in_once() -> None:
+    """A stampede of 401s is answered by a single login."""
+    cocoro = _FakeCocoro()
+    api_stats = ApiStats()
+    auth = AuthManager(cocoro, api_stats)
+
+    async def _async_run() -> list[list[str]]:
+        return await asyncio.gather(
+            *(
+                auth.async_call(API_QUERY_DEVICES, cocoro.query_devices)
+                for _ in range(5)
+            )
+        )
+
+    assert asyncio.run(_async_run()) == [["device"]] * 5
+    assert cocoro.logins == 1
+    assert cocoro.requests == 10
+    assert api_stats.calls[API_LOGIN].successes == 1
+    assert api_stats.calls[API_QUERY_DEVICES].retries == 5
+
+
+def test_rejected_request_is_replayed_once() -> None:
+    """A request still rejected after logging in again is not replayed again."""
+    cocoro = _FakeCocoro()
+    api_stats = ApiStats()
+    auth = AuthManager(cocoro, api_stats)
+
+    async def _always_rejected() -> None:
+        cocoro.requests += 1
+        raise RuntimeError("401 Unauthorized")
+
+    with pytest.raises(RuntimeError, match="401"):
+        asyncio.run(auth.async_call(API_QUERY_DEVICES, _always_rejected))
+    assert cocoro.logins == 1
+    assert cocoro.requests == 2
+
+
+def test_other_errors_are_not_replayed() -> None:
+    cocoro = _FakeCocoro()
+    auth = AuthManager(cocoro, ApiStats())
+
+    async def _failing() -> None:
+        cocoro.requests += 1
+        raise RuntimeError("500 Internal Server Error")
+
+    with pytest.raises(RuntimeError, match="500"):
+        asyncio.run(auth.async_call(API_QUERY_DEVICES, _failing))
+    assert cocoro.logins == 0
+    assert cocoro.requests == 1
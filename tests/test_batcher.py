@@ -0,0 +1,121 @@
+"""Tests for the write batcher."""
+
+from __future__ import annotations
+
+import asyncio
+import tempfile
+from datetime import timedelta
+
+from sharp_cocoro.devices.aircon.aircon_properties import StatusCode
+from sharp_cocoro.properties import BinaryPropertyStatus
+from sharp_cocoro.properties import PropertyStatus
+from sharp_cocoro.properties import SinglePropertyStatus
+
+from custom_components.sharp_cocoro.batcher import DeviceWriteBatcher
+from custom_components.sharp_cocoro.batcher import WriteOutcome
+
+from homeassistant.core import HomeAssistant
+
+WINDOW = timedelta(milliseconds=20)
+
+# State detail writes of a target temperature and of a fan direction
+TEMPERATURE = BinaryPropertyStatus(StatusCode.STATE_DETAIL, {"code": "c6000000002"})
+FAN_DIRECTION = BinaryPropertyStatus(StatusCode.STATE_DETAIL, {"code": "00000000001"})
+POWER_ON = SinglePropertyStatus(StatusCode.POWER, {"code": "30"})
+POWER_OFF = SinglePropertyStatus(StatusCode.POWER, {"code": "31"})
+WINDSPEED = SinglePropertyStatus(StatusCode.WINDSPEED, {"code": "41"})
+
+
+def _run_batches(
+    *submissions: dict[str, PropertyStatus],
+) -> list[dict[str, PropertyStatus]]:
+    """Submit updates within one batch window and return the flushed batches."""
+    flushed: list[dict[str, PropertyStatus]] = []
+
+    async def _flush(
+        updates: dict[str, PropertyStatus], _write_states: list, _tokens: list
+    ) -> WriteOutcome:
+        flushed.append(dict(updates))
+        return WriteOutcome.COMPLETED
+
+    async def _async_run() -> None:
+        with tempfile.TemporaryDirectory() as config_dir:
+            hass = HomeAssistant(config_dir)
+            batcher = DeviceWriteBatcher(hass, _flush, WINDOW)
+            await asyncio.gather(
+                *(
+                    batcher.async_submit(updates, lambda: None)
+                    for updates in submissions
+                )
+            )
+            await hass.async_stop(force=True)
+
+    asyncio.run(_async_run())
+    return flushed
+
+
+def test_merges_updates_within_window() -> None:
+    """Updates of different status codes go out as one write."""
+    assert _run_batches(
+        {StatusCode.POWER: POWER_ON}, {StatusCode.WINDSPEED: WINDSPEED}
+    ) == [{StatusCode.POWER: POWER_ON, StatusCode.WINDSPEED: WINDSPEED}]
+
+
+def test_later_single_value_wins() -> None:
+    """A later value of a single value status code replaces the earlier one."""
+    assert _run_batches(
+        {StatusCode.POWER: POWER_ON}, {StatusCode.POWER: POWER_OFF}
+    ) == [{StatusCode.POWER: POWER_OFF}]
+
+
+def test_temperature_and_swing_are_not_merged() -> None:
+    """A fan direction write does not replace a pending temperature write."""
+    assert _run_batches(
+        {StatusCode.POWER: POWER_ON, StatusCode.STATE_DETAIL: TEMPERATURE},
+        {StatusCode.STATE_DETAIL: FAN_DIRECTION},
+    ) == [
+        {StatusCode.POWER: POWER_ON, StatusCode.STATE_DETAIL: TEMPERATURE},
+        {StatusCode.STATE_DETAIL: FAN_DIRECTION},
+    ]
+
+
+def test_identical_state_detail_writes_merge() -> None:
+    """Repeating the same state detail write keeps a single write."""
+    assert _run_batches(
+        {StatusCode.STATE_DETAIL: TEMPERATURE}, {StatusCode.STATE_DETAIL: TEMPERATURE}
+    ) == [{StatusCode.STATE_DETAIL: TEMPERATURE}]
+
+
+def test_submitters_receive_the_outcome_of_their_batch() -> None:
+    """A timed out write is reported to every command it carried."""
+
+    async def _flush(
+        updates: dict[str, PropertyStatus], _write_states: list, _tokens: list
+    ) -> WriteOutcome:
+        if StatusCode.WINDSPEED in updates:
+            return WriteOutcome.TIMEOUT
+        return WriteOutcome.COMPLETED
+
+    async def _async_run() -> list[WriteOutcome]:
+        with tempfile.TemporaryDirectory() as config_dir:
+            hass = HomeAssistant(config_dir)
+            batcher = DeviceWriteBatcher(hass, _flush, WINDOW)
+            outcomes = await asyncio.gather(
+                batcher.async_submit({StatusCode.POWER: POWER_ON}, lambda: None),
+                batcher.async_submit({StatusCode.WINDSPEED: WINDSPEED}, lambda: None),
+                batcher.async_submit(
+                    {StatusCode.STATE_DETAIL: TEMPERATURE}, lambda: None
+                ),
+                batcher.async_submit(
+                    {StatusCode.STATE_DETAIL: FAN_DIRECTION}, lambda: None
+                ),
+            )
+            await hass.async_stop(force=True)
+            return list(outcomes)
+
+    assert asyncio.run(_async_run()) == [
+        WriteOutcome.TIMEOUT,
+        WriteOutcome.TIMEOUT,
+        WriteOutcome.TIMEOUT,
+        WriteOutcome.COMPLETED,
+    ]
@@ -0,0 +1,71 @@
+"""Tests for bulk state changes across devices."""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Iterable
+from typing import Any
+
+from aiohttp import ClientResponseError
+from aiohttp import RequestInfo
+from multidict import CIMultiDict
+from multidict import CIMultiDictProxy
+from yarl import URL
+
+from benchmarks.common import async_account
+from custom_components.sharp_cocoro.bulk import TargetState
+from custom_components.sharp_cocoro.bulk import _error_category
+from custom_components.sharp_cocoro.bulk import async_apply_state
+from custom_components.sharp_cocoro.errors import CloudUnavailableError
+
+from homeassistant.components.climate.const import HVACMode
+from homeassistant.exceptions import HomeAssistantError
+
+
+def test_errors_are_reported_by_category() -> None:
+    """The message of a failed cloud call, with its URL, is not reported."""
+    url = URL("https://example.com/control/deviceControl?appSecret=s3cr3t")
+    cause = ClientResponseError(
+        RequestInfo(url, "POST", CIMultiDictProxy(CIMultiDict()), url),
+        (),
+        status=502,
+    )
+    try:
+        raise HomeAssistantError(f"Failed to update Aircon: {cause}") from cause
+    except HomeAssistantError as err:
+        wrapped = err
+
+    assert _error_category(wrapped) == "server"
+    assert _error_category(CloudUnavailableError("retrying in 30s")) == "unavailable"
+
+
+def test_timed_out_writes_are_reported_per_device() -> None:
+    """A timeout is reported even if a refresh settled the values meanwhile."""
+
+    async def _async_run() -> list[str | None]:
+        async with async_account(num_devices=2, completion_delay=0) as (
+            _hass,
+            _server,
+            data,
+        ):
+            fast_id, slow_id = data.devices
+            tracker = data.completion_tracker
+            async_wait = tracker.async_wait
+
+            async def _async_wait(
+                device_id: int, control_ids: Iterable[str], **kwargs: Any
+            ) -> None:
+                if device_id != slow_id:
+                    await async_wait(device_id, control_ids, **kwargs)
+                    return
+                # Nothing is left to roll back when the check times out
+                pending = data.pending_writes[device_id]
+                pending.reconcile(data.device_state(device_id))
+                raise TimeoutError
+
+            tracker.async_wait = _async_wait  # type: ignore[method-assign]
+            return await async_apply_state(
+                [(data, fast_id), (data, slow_id)], TargetState(hvac_mode=HVACMode.OFF)
+            )
+
+    assert asyncio.run(_async_run()) == [None, "Write timed out"]
@@ -0,0 +1,126 @@
+"""Tests for the circuit breaker."""
+
+from __future__ import annotations
+
+from datetime import timedelta
+
+import pytest
+
+from custom_components.sharp_cocoro.circuit import CircuitBreaker
+from custom_components.sharp_cocoro.circuit import CircuitState
+from custom_components.sharp_cocoro.errors import ErrorCategory
+
+RESET_TIMEOUT = timedelta(seconds=10)
+
+
+class _Clock:
+    """Monotonic clock the tests move forward by hand."""
+
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch: pytest.MonkeyPatch) -> _Clock:
+    clock = _Clock()
+    monkeypatch.setattr("custom_components.sharp_cocoro.circuit.time.monotonic", clock)
+    return clock
+
+
+def _breaker() -> CircuitBreaker:
+    return CircuitBreaker(
+        failure_threshold=3,
+        reset_timeout=RESET_TIMEOUT,
+        max_reset_timeout=timedelta(seconds=30),
+    )
+
+
+def test_opens_after_consecutive_failures(clock: _Clock) -> None:
+    breaker = _breaker()
+    for _ in range(2):
+        breaker.record_failure(ErrorCategory.SERVER)
+    assert breaker.closed
+
+    breaker.record_failure(ErrorCategory.TRANSIENT)
+    assert breaker.state is CircuitState.OPEN
+    assert breaker.last_category is ErrorCategory.TRANSIENT
+    assert not breaker.allow_request()
+    assert breaker.retry_in == RESET_TIMEOUT.total_seconds()
+
+
+def test_success_resets_the_failure_count(clock: _Clock) -> None:
+    breaker = _breaker()
+    for _ in range(2):
+        breaker.record_failure(ErrorCategory.SERVER)
+    breaker.record_success()
+    breaker.record_failure(ErrorCategory.SERVER)
+    assert breaker.closed
+    assert breaker.failures == 1
+
+
+def test_rejected_requests_do_not_count(clock: _Clock) -> None:
+    breaker = _breaker()
+    for _ in range(5):
+        breaker.record_failure(ErrorCategory.PERMANENT)
+        breaker.record_failure(ErrorCategory.AUTH)
+    assert breaker.closed
+    assert breaker.failures == 0
+
+
+def test_rate_limit_opens_at_once_for_retry_after(clock: _Clock) -> None:
+    breaker = _breaker()
+    breaker.record_failure(ErrorCategory.RATE_LIMIT, retry_after=20)
+    assert breaker.state is CircuitState.OPEN
+    assert breaker.retry_in == 20
+
+
+def test_single_probe_closes_the_circuit(clock: _Clock) -> None:
+    breaker = _breaker()
+    breaker.record_failure(ErrorCategory.RATE_LIMIT)
+
+    clock.now += RESET_TIMEOUT.total_seconds()
+    assert breaker.allow_request()
+    assert breaker.state is CircuitState.HALF_OPEN
+    # Only one probe is in flight at a time
+    assert not breaker.allow_request()
+
+    breaker.record_success()
+    assert breaker.closed
+    assert breaker.allow_request()
+
+
+def test_failed_probe_doubles_the_open_time_up_to_the_cap(clock: _Clock) -> None:
+    breaker = _breaker()
+    breaker.record_failure(ErrorCategory.RATE_LIMIT)
+
+    for open_for in (20, 30, 30):
+        clock.now += breaker.retry_in
+        assert breaker.allow_request()
+        breaker.record_failure(ErrorCategory.SERVER)
+        assert breaker.state is CircuitState.OPEN
+        assert breaker.retry_in == open_for
+
+
+def test_rejected_probe_closes_the_circuit(clock: _Clock) -> None:
+    """A probe the cloud answered with an error still shows it is reachable."""
+    breaker = _breaker()
+    breaker.record_failure(ErrorCategory.RATE_LIMIT)
+    clock.now += RESET_TIMEOUT.total_seconds()
+    assert breaker.allow_request()
+
+    breaker.record_failure(ErrorCategory.PERMANENT)
+    assert breaker.closed
+
+
+def test_aborted_probe_lets_the_next_call_probe(clock: _Clock) -> None:
+    breaker = _breaker()
+    breaker.record_failure(ErrorCategory.RATE_LIMIT)
+    clock.now += RESET_TIMEOUT.total_seconds()
+    assert breaker.allow_request()
+
+    breaker.abort_probe()
+    assert breaker.state is CircuitState.OPEN
+    assert breaker.allow_request()
@@ -0,0 +1,73 @@
+"""Tests for the config flow."""
+
+from __future__ import annotations
+
+import asyncio
+import tempfile
+from types import SimpleNamespace
+from typing import Any
+
+from aiohttp import CookieJar
+
+from custom_components.sharp_cocoro.config_flow import ConfigFlow
+from custom_components.sharp_cocoro.const import CONF_DEVICES
+from custom_components.sharp_cocoro.const import CONF_KEY
+from custom_components.sharp_cocoro.const import CONF_SECRET
+from custom_components.sharp_cocoro.discovery import FlowDiscovery
+from custom_components.sharp_cocoro.discovery import async_pop_flow_discovery
+
+from homeassistant.core import HomeAssistant
+from homeassistant.data_entry_flow import FlowResultType
+
+CREDENTIALS = {CONF_KEY: "key", CONF_SECRET: "secret"}
+
+
+def _flow(hass: HomeAssistant) -> ConfigFlow:
+    """Return a flow whose user step found three devices."""
+    flow = ConfigFlow()
+    flow.hass = hass
+    flow.context = {"source": "user"}
+    flow._credentials = CREDENTIALS
+    flow._discovery = FlowDiscovery(
+        cookie_jar=CookieJar(),
+        logged_in_at=0.0,
+        devices={
+            device_id: SimpleNamespace(name=f"Aircon {device_id}")
+            for device_id in (1, 2, 3)
+        },
+    )
+    return flow
+
+
+def test_devices_step_hands_the_chosen_devices_to_the_setup() -> None:
+    async def _async_run() -> tuple[dict[str, Any], list[int]]:
+        with tempfile.TemporaryDirectory() as config_dir:
+            hass = HomeAssistant(config_dir)
+            flow = _flow(hass)
+            result = await flow.async_step_devices({CONF_DEVICES: ["1", "3"]})
+            discovery = async_pop_flow_discovery(hass, CREDENTIALS[CONF_KEY])
+            await hass.async_stop(force=True)
+        assert discovery is not None
+        return dict(result), list(discovery.devices)
+
+    result, handed_over = asyncio.run(_async_run())
+    assert result["type"] is FlowResultType.CREATE_ENTRY
+    assert result["data"] == {**CREDENTIALS, CONF_DEVICES: [1, 3]}
+    assert handed_over == [1, 3]
+
+
+def test_devices_step_requires_a_device() -> None:
+    async def _async_run() -> tuple[dict[str, Any], bool]:
+        with tempfile.TemporaryDirectory() as config_dir:
+            hass = HomeAssistant(config_dir)
+            flow = _flow(hass)
+            result = await flow.async_step_devices({CONF_DEVICES: []})
+            stored = async_pop_flow_discovery(hass, CREDENTIALS[CONF_KEY]) is not None
+            await hass.async_stop(force=True)
+        return dict(result), stored
+
+    result, stored = asyncio.run(_async_run())
+    assert result["type"] is FlowResultType.FORM
+    assert result["step_id"] == "devices"
+    assert result["errors"] == {"base": "no_devices_selected"}
+    assert not stored
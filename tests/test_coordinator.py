@@ -0,0 +1,246 @@
+"""Tests for the shared coordination logic."""
+
+from __future__ import annotations
+
+import asyncio
+import tempfile
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from datetime import timedelta
+from functools import partial
+from types import SimpleNamespace
+from typing import Any
+
+import pytest
+from aiohttp import ClientResponseError
+from aiohttp import ClientSession
+from aiohttp import CookieJar
+from sharp_cocoro import Aircon
+from sharp_cocoro import Device
+from sharp_cocoro.devices.aircon.aircon_properties import StatusCode
+from sharp_cocoro.devices.aircon.aircon_properties import ValueSingle
+from sharp_cocoro.properties import PropertyStatus
+from sharp_cocoro.properties import SinglePropertyStatus
+
+from benchmarks.common import async_account
+from benchmarks.fake_cocoro import FakeCocoroServer
+from custom_components.sharp_cocoro.auth import AuthManager
+from custom_components.sharp_cocoro.circuit import CircuitBreaker
+from custom_components.sharp_cocoro.const import API_CHECK_CONTROLS
+from custom_components.sharp_cocoro.const import API_EXECUTE
+from custom_components.sharp_cocoro.const import SIGNAL_DEVICE_UPDATED
+from custom_components.sharp_cocoro.const import WRITE_BATCH_WINDOW
+from custom_components.sharp_cocoro.coordinator import _async_send_updates
+from custom_components.sharp_cocoro.coordinator import execute_and_refresh
+from custom_components.sharp_cocoro.data import SharpCocoroData
+from custom_components.sharp_cocoro.errors import CloudUnavailableError
+from custom_components.sharp_cocoro.errors import ErrorCategory
+from custom_components.sharp_cocoro.scheduler import RequestLimiter
+from custom_components.sharp_cocoro.scheduler import RequestPriority
+from custom_components.sharp_cocoro.stats import ApiStats
+
+from homeassistant.core import HomeAssistant
+from homeassistant.core import callback
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
+
+CONTROL_ENDPOINT = "/control/deviceControl"
+
+POWER_ON = SinglePropertyStatus(StatusCode.POWER, {"code": "30"})
+WINDSPEED = SinglePropertyStatus(StatusCode.WINDSPEED, {"code": "41"})
+
+
+class _SlowCocoro:
+    """Build the request like the library, then wait for the response."""
+
+    def __init__(self) -> None:
+        self.sent: list[list[str]] = []
+        self.respond = asyncio.Event()
+
+    async def execute_queued_updates(self, device: Any) -> dict[str, Any]:
+        self.sent.append(list(device.property_updates))
+        await self.respond.wait()
+        device.property_updates.clear()
+        return {"controlList": []}
+
+
+@asynccontextmanager
+async def _async_account(
+    limiter: RequestLimiter,
+) -> AsyncIterator[tuple[SharpCocoroData, list[list[str]]]]:
+    """Set up an account with one aircon; yield it and the controls sent."""
+    controls: list[list[str]] = []
+    with tempfile.TemporaryDirectory() as config_dir:
+        hass = HomeAssistant(config_dir)
+        async with (
+            FakeCocoroServer(num_devices=1, completion_delay=0) as server,
+            ClientSession(cookie_jar=CookieJar(unsafe=True)) as session,
+        ):
+            cocoro = server.create_client(session)
+            send_post = cocoro.send_post_request
+
+            async def _send_post(path: str, body: dict[str, Any]) -> dict[str, Any]:
+                if path.startswith(CONTROL_ENDPOINT):
+                    controls.append(
+                        [
+                            status["statusCode"]
+                            for control in body["controlList"]
+                            for status in control["status"]
+                        ]
+                    )
+                return await send_post(path, body)
+
+            cocoro.send_post_request = _send_post  # type: ignore[method-assign]
+            await cocoro.login()
+            devices: dict[int, Device] = {
+                device.device_id: device
+                for device in await cocoro.query_devices()
+                if isinstance(device, Aircon)
+            }
+            api_stats = ApiStats()
+            data = SharpCocoroData(
+                cocoro=cocoro,
+                devices=devices,
+                hass=hass,
+                api_stats=api_stats,
+                auth_manager=AuthManager(cocoro, api_stats, limiter=limiter),
+            )
+            try:
+                yield data, controls
+            finally:
+                for batcher in data.write_batchers.values():
+                    await batcher.async_shutdown()
+                for debouncer in data.refresh_debouncers.values():
+                    debouncer.async_shutdown()
+                await data.completion_tracker.async_shutdown()
+                await hass.async_stop(force=True)
+
+
+def test_send_leaves_commands_queued_meanwhile_on_the_device() -> None:
+    """A command queued while a batch is sent is neither sent nor cleared."""
+    device = SimpleNamespace(property_updates={}, status=[])
+    queued: dict[str, PropertyStatus] = {StatusCode.WINDSPEED: WINDSPEED}
+
+    async def _async_run() -> None:
+        cocoro = _SlowCocoro()
+        send = asyncio.create_task(
+            _async_send_updates(cocoro, device, {StatusCode.POWER: POWER_ON})
+        )
+        await asyncio.sleep(0)
+        device.property_updates.update(queued)
+        cocoro.respond.set()
+        await send
+        assert cocoro.sent == [[StatusCode.POWER]]
+
+    asyncio.run(_async_run())
+    assert device.property_updates == queued
+
+
+def test_circuit_opened_between_polls_marks_entities_unavailable() -> None:
+    """Entities hear about the circuit opening on a command, not just a poll."""
+
+    async def _async_run() -> list[bool]:
+        async with async_account() as (hass, _server, data):
+            data.circuit = CircuitBreaker(reset_timeout=timedelta(0))
+            published: list[bool] = []
+
+            @callback
+            def _async_updated(_changed: object) -> None:
+                published.append(data.coordinator.available)
+
+            device_id = next(iter(data.devices))
+            async_dispatcher_connect(
+                hass, SIGNAL_DEVICE_UPDATED.format(device_id), _async_updated
+            )
+
+            async def _rate_limited() -> None:
+                raise ClientResponseError(None, (), status=429)  # type: ignore[arg-type]
+
+            with pytest.raises(ClientResponseError):
+                await data.async_call(API_EXECUTE, _rate_limited)
+            await data.async_call(API_EXECUTE, partial(asyncio.sleep, 0))
+            return published
+
+    assert asyncio.run(_async_run()) == [False, True]
+
+
+def test_control_checks_respect_the_circuit() -> None:
+    """Controls are not checked while the circuit to the cloud is open."""
+
+    async def _async_run() -> int:
+        async with async_account() as (_hass, _server, data):
+            device_id = next(iter(data.devices))
+            data.circuit.record_failure(ErrorCategory.RATE_LIMIT)
+            with pytest.raises(CloudUnavailableError):
+                await data.completion_tracker.async_wait(device_id, ["control"])
+            return data.api_stats.calls[API_CHECK_CONTROLS].failures
+
+    assert asyncio.run(_async_run()) == 0
+
+
+def test_pending_values_settle_with_their_batch() -> None:
+    """A shown value does not stick when the device settles on another one."""
+
+    async def _async_run() -> tuple[bool, ValueSingle | None]:
+        async with async_account(completion_delay=0) as (hass, server, data):
+            device = next(iter(data.devices.values()))
+            fake = server.devices[device.device_id]
+            apply = fake.apply
+
+            def _apply(status: dict[str, Any]) -> None:
+                apply(status)
+                # The unit falls back to another fan speed
+                fake.windspeed = ValueSingle.WINDSPEED_LEVEL_3.value
+
+            fake.apply = _apply  # type: ignore[method-assign]
+
+            device.queue_windspeed_update(ValueSingle.WINDSPEED_LEVEL_1)
+            windspeed = hass.async_create_task(
+                execute_and_refresh(device, data, lambda: None)
+            )
+            await asyncio.sleep(0)
+            # Merged into the same write, whose outcome is then unknown
+            device.property_updates[StatusCode.NANOE_MODE] = SinglePropertyStatus(
+                StatusCode.NANOE_MODE, {"code": "41"}
+            )
+            nanoe = hass.async_create_task(
+                execute_and_refresh(device, data, lambda: None)
+            )
+            await asyncio.gather(windspeed, nanoe)
+
+            await data.async_refresh_data(fresh=True)
+            return (
+                bool(data.pending_writes[device.device_id]),
+                data.device_state(device.device_id).windspeed,
+            )
+
+    assert asyncio.run(_async_run()) == (False, ValueSingle.WINDSPEED_LEVEL_3)
+
+
+def test_batches_waiting_for_a_slot_keep_their_updates() -> None:
+    """A command queued while a batch waits for a slot goes out on its own."""
+
+    async def _async_run() -> list[list[str]]:
+        limiter = RequestLimiter(max_concurrent=1)
+        async with _async_account(limiter) as (data, controls):
+            device = next(iter(data.devices.values()))
+            hass = data.hass
+
+            # Hold the only slot, so the first batch waits after its flush
+            async with limiter.slot(RequestPriority.REFRESH):
+                device.queue_power_on()
+                first = hass.async_create_task(
+                    execute_and_refresh(device, data, lambda: None)
+                )
+                await asyncio.sleep(WRITE_BATCH_WINDOW.total_seconds() * 2)
+                device.queue_windspeed_update(ValueSingle.WINDSPEED_LEVEL_1)
+                second = hass.async_create_task(
+                    execute_and_refresh(device, data, lambda: None)
+                )
+                await asyncio.sleep(0)
+            await asyncio.gather(first, second)
+            return controls
+
+    assert asyncio.run(_async_run()) == [
+        [StatusCode.POWER],
+        [StatusCode.WINDSPEED],
+    ]
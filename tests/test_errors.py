@@ -0,0 +1,49 @@
+"""Tests for the cloud error classification."""
+
+from __future__ import annotations
+
+import pytest
+from aiohttp import ClientConnectionError
+from aiohttp import ClientPayloadError
+from aiohttp import ClientResponseError
+from multidict import CIMultiDict
+
+from custom_components.sharp_cocoro.errors import ErrorCategory
+from custom_components.sharp_cocoro.errors import classify_error
+from custom_components.sharp_cocoro.errors import retry_after
+
+
+def _response_error(status: int, **headers: str) -> ClientResponseError:
+    return ClientResponseError(
+        None,  # type: ignore[arg-type]
+        (),
+        status=status,
+        headers=CIMultiDict(headers),
+    )
+
+
+@pytest.mark.parametrize(
+    ("err", "category"),
+    [
+        (_response_error(401), ErrorCategory.AUTH),
+        (_response_error(403), ErrorCategory.AUTH),
+        (_response_error(429), ErrorCategory.RATE_LIMIT),
+        (_response_error(500), ErrorCategory.SERVER),
+        (_response_error(503), ErrorCategory.SERVER),
+        (_response_error(400), ErrorCategory.PERMANENT),
+        (ClientConnectionError(), ErrorCategory.TRANSIENT),
+        (ClientPayloadError(), ErrorCategory.TRANSIENT),
+        (TimeoutError(), ErrorCategory.TRANSIENT),
+        (Exception("401 Unauthorized"), ErrorCategory.AUTH),
+        (Exception("Cocoro API Error: 1=E001"), ErrorCategory.PERMANENT),
+    ],
+)
+def test_classify_error(err: BaseException, category: ErrorCategory) -> None:
+    assert classify_error(err) is category
+
+
+def test_retry_after_of_rate_limited_responses() -> None:
+    assert retry_after(_response_error(429, **{"Retry-After": "30"})) == 30
+    assert retry_after(_response_error(429, **{"Retry-After": "soon"})) is None
+    assert retry_after(_response_error(429)) is None
+    assert retry_after(TimeoutError()) is None
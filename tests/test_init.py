@@ -0,0 +1,66 @@
+"""Tests for the setup of a config entry."""
+
+from __future__ import annotations
+
+import asyncio
+from types import SimpleNamespace
+from typing import Any
+
+from aiohttp import CookieJar
+
+from benchmarks.common import async_account
+from custom_components.sharp_cocoro import _async_find_devices
+from custom_components.sharp_cocoro.const import API_QUERY_DEVICES
+from custom_components.sharp_cocoro.const import CONF_DEVICES
+from custom_components.sharp_cocoro.discovery import FlowDiscovery
+
+
+def _entry(**data: Any) -> Any:
+    return SimpleNamespace(data=data)
+
+
+def test_find_devices_keeps_the_chosen_devices() -> None:
+    async def _async_run() -> tuple[list[int], list[int]]:
+        async with async_account(num_devices=3) as (_hass, _server, data):
+            chosen = sorted(data.devices)[::2]
+            devices = await _async_find_devices(
+                _entry(**{CONF_DEVICES: chosen}), data.cocoro, data.auth, None
+            )
+            return sorted(devices), chosen
+
+    found, chosen = asyncio.run(_async_run())
+    assert found == chosen
+
+
+def test_find_devices_imports_all_devices_without_a_selection() -> None:
+    async def _async_run() -> bool:
+        async with async_account(num_devices=3) as (_hass, _server, data):
+            devices = await _async_find_devices(_entry(), data.cocoro, data.auth, None)
+            return devices.keys() == data.devices.keys()
+
+    assert asyncio.run(_async_run())
+
+
+def test_find_devices_uses_the_config_flow_discovery() -> None:
+    """Right after the config flow, setup makes no cloud calls for devices."""
+
+    async def _async_run() -> tuple[bool, int]:
+        async with async_account(num_devices=3) as (_hass, _server, data):
+            device_id = next(iter(data.devices))
+            discovery = FlowDiscovery(
+                cookie_jar=CookieJar(),
+                logged_in_at=0.0,
+                devices={device_id: data.devices[device_id]},
+            )
+            devices = await _async_find_devices(
+                _entry(**{CONF_DEVICES: [device_id]}),
+                data.cocoro,
+                data.auth,
+                discovery,
+            )
+            return (
+                devices is discovery.devices,
+                data.api_stats.calls[API_QUERY_DEVICES].successes,
+            )
+
+    assert asyncio.run(_async_run()) == (True, 0)
@@ -0,0 +1,78 @@
+"""Tests for the adaptive poll interval."""
+
+from __future__ import annotations
+
+from datetime import timedelta
+
+from custom_components.sharp_cocoro.polling import IDLE_GROWTH
+from custom_components.sharp_cocoro.polling import AdaptivePollInterval
+
+BASE = timedelta(seconds=10)
+FAST = timedelta(seconds=2)
+IDLE_MAX = timedelta(seconds=60)
+POWERED_OFF = timedelta(seconds=300)
+MAX_BACKOFF = timedelta(seconds=120)
+
+
+def _interval(fast_window: timedelta = timedelta(minutes=1)) -> AdaptivePollInterval:
+    return AdaptivePollInterval(
+        base=BASE,
+        fast=FAST,
+        fast_window=fast_window,
+        idle_max=IDLE_MAX,
+        powered_off=POWERED_OFF,
+        max_backoff=MAX_BACKOFF,
+    )
+
+
+def test_boost_polls_fast_until_the_window_ends() -> None:
+    interval = _interval()
+    interval.record_success(changed=False, powered_on=True)
+    interval.boost()
+    assert interval.next_delay() == FAST.total_seconds()
+
+    expired = _interval(fast_window=timedelta(0))
+    expired.boost()
+    assert expired.next_delay() == BASE.total_seconds()
+
+
+def test_boost_restarts_idle_growth() -> None:
+    interval = _interval(fast_window=timedelta(0))
+    for _ in range(3):
+        interval.record_success(changed=False, powered_on=True)
+    interval.boost()
+    assert interval.next_delay() == BASE.total_seconds()
+
+
+def test_unchanged_polls_grow_the_interval_up_to_the_cap() -> None:
+    interval = _interval()
+    delays = []
+    for _ in range(6):
+        interval.record_success(changed=False, powered_on=True)
+        delays.append(interval.next_delay())
+
+    assert delays[0] == BASE.total_seconds() * IDLE_GROWTH
+    assert delays == sorted(delays)
+    assert delays[-1] == IDLE_MAX.total_seconds()
+
+    interval.record_success(changed=True, powered_on=True)
+    assert interval.next_delay() == BASE.total_seconds()
+
+
+def test_powered_off_accounts_poll_slowly() -> None:
+    interval = _interval()
+    interval.record_success(changed=True, powered_on=False)
+    assert interval.next_delay() == POWERED_OFF.total_seconds()
+
+
+def test_failures_back_off_with_jitter_and_reset_on_success() -> None:
+    interval = _interval()
+    for failures in range(1, 6):
+        interval.record_failure()
+        assert interval.failures == failures
+        delay = min(BASE.total_seconds() * 2**failures, MAX_BACKOFF.total_seconds())
+        assert delay / 2 <= interval.next_delay() <= delay
+
+    interval.record_success(changed=True, powered_on=True)
+    assert interval.failures == 0
+    assert interval.next_delay() == BASE.total_seconds()
@@ -0,0 +1,42 @@
+"""Tests for the device sensors."""
+
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from benchmarks.common import async_account
+from custom_components.sharp_cocoro.const import HUMIDITY_TOLERANCE
+from custom_components.sharp_cocoro.const import PROP_HUMIDITY
+from custom_components.sharp_cocoro.sensor import DEVICE_SENSORS
+from custom_components.sharp_cocoro.sensor import SharpCocoroSensor
+
+HUMIDITY = next(d for d in DEVICE_SENSORS if d.key == PROP_HUMIDITY)
+
+
+@pytest.mark.parametrize(
+    ("written", "value", "exceeds"),
+    [
+        (50, 50, False),
+        (50, 50 + HUMIDITY_TOLERANCE, False),
+        (50, 50 - HUMIDITY_TOLERANCE, False),
+        (50, 50 + HUMIDITY_TOLERANCE + 1, True),
+        (50, None, True),
+        (None, 50, True),
+        (None, None, False),
+    ],
+)
+def test_state_is_written_beyond_the_tolerance(
+    written: int | None, value: int | None, exceeds: bool
+) -> None:
+    async def _async_run() -> bool:
+        async with async_account() as (_hass, _server, data):
+            device_id = next(iter(data.devices))
+            sensor = SharpCocoroSensor(data, device_id, HUMIDITY)
+            sensor._written_value = written
+            snapshots = data.snapshots
+            snapshots[device_id] = snapshots[device_id].replace({PROP_HUMIDITY: value})
+            return sensor._exceeds_tolerance()
+
+    assert asyncio.run(_async_run()) is exceeds
@@ -0,0 +1,83 @@
+"""Tests for the decoded device snapshot."""
+
+from __future__ import annotations
+
+from types import SimpleNamespace
+from typing import Any
+
+import pytest
+from sharp_cocoro.devices.aircon.aircon_properties import FanDirection
+from sharp_cocoro.devices.aircon.aircon_properties import StatusCode
+from sharp_cocoro.devices.aircon.aircon_properties import ValueSingle
+from sharp_cocoro.properties import BinaryPropertyStatus
+from sharp_cocoro.properties import PropertyStatus
+from sharp_cocoro.properties import RangePropertyStatus
+from sharp_cocoro.properties import SinglePropertyStatus
+from sharp_cocoro.state import State8
+
+from custom_components.sharp_cocoro.const import PROP_POWER
+from custom_components.sharp_cocoro.const import PROP_TEMPERATURE
+from custom_components.sharp_cocoro.snapshot import DeviceSnapshot
+
+
+def _device(*status: PropertyStatus) -> Any:
+    return SimpleNamespace(status=list(status))
+
+
+def _state_detail(temperature: float, fan_direction: FanDirection) -> PropertyStatus:
+    state = State8()
+    state.temperature = temperature
+    state.fan_direction = fan_direction.value
+    return BinaryPropertyStatus(StatusCode.STATE_DETAIL, {"code": state.state})
+
+
+def test_from_device_decodes_the_tracked_properties() -> None:
+    snapshot = DeviceSnapshot.from_device(
+        _device(
+            SinglePropertyStatus(StatusCode.POWER, {"code": "30"}),
+            SinglePropertyStatus(StatusCode.OPERATION_MODE, {"code": "42"}),
+            SinglePropertyStatus(StatusCode.WINDSPEED, {"code": "41"}),
+            _state_detail(23.5, FanDirection.FAN_DIRECTION_SWING),
+            RangePropertyStatus(StatusCode.ROOM_TEMPERATURE, {"code": "26"}),
+        )
+    )
+
+    assert snapshot.power == ValueSingle.POWER_ON
+    assert snapshot.operation_mode == ValueSingle.OPERATION_COOL
+    assert snapshot.windspeed == ValueSingle.WINDSPEED_LEVEL_AUTO
+    assert snapshot.temperature == 23.5
+    assert snapshot.fan_direction == FanDirection.FAN_DIRECTION_SWING
+    assert snapshot.room_temperature == 26
+
+
+def test_from_device_leaves_unknown_values_out() -> None:
+    """Unreported properties and values the library does not know read as None."""
+    snapshot = DeviceSnapshot.from_device(
+        _device(
+            SinglePropertyStatus(StatusCode.POWER, {"code": "99"}),
+            SinglePropertyStatus(StatusCode.WINDSPEED, {"code": "41"}),
+        )
+    )
+
+    assert snapshot.power is None
+    assert snapshot.temperature is None
+    assert snapshot.windspeed == ValueSingle.WINDSPEED_LEVEL_AUTO
+
+
+def test_diff_names_the_changed_properties() -> None:
+    snapshot = DeviceSnapshot(
+        {PROP_POWER: ValueSingle.POWER_ON, PROP_TEMPERATURE: 22.0}
+    )
+
+    assert snapshot.diff(snapshot.replace({})) == set()
+    assert snapshot.diff(snapshot.replace({PROP_TEMPERATURE: 22.5})) == {
+        PROP_TEMPERATURE
+    }
+    assert snapshot.diff(DeviceSnapshot({})) == {PROP_POWER, PROP_TEMPERATURE}
+
+
+def test_snapshot_is_immutable() -> None:
+    snapshot = DeviceSnapshot({PROP_POWER: ValueSingle.POWER_ON})
+
+    with pytest.raises(AttributeError):
+        snapshot.power = ValueSingle.POWER_OFF
@@ -0,0 +1,47 @@
+"""Tests for the cloud call instrumentation."""
+
+from __future__ import annotations
+
+import pytest
+from aiohttp import ClientResponseError
+from aiohttp import RequestInfo
+from multidict import CIMultiDict
+from multidict import CIMultiDictProxy
+from yarl import URL
+
+from custom_components.sharp_cocoro.const import API_QUERY_DEVICES
+from custom_components.sharp_cocoro.stats import ApiStats
+
+SECRET = "s3cr3t"
+
+
+def test_last_error_leaves_out_the_request_url() -> None:
+    """The app secret in the URL of a failed request is not kept."""
+    url = URL(f"https://example.com/setting/boxInfo/?appSecret={SECRET}&mode=other")
+    err = ClientResponseError(
+        RequestInfo(url, "GET", CIMultiDictProxy(CIMultiDict()), url),
+        (),
+        status=503,
+        message="Service Unavailable",
+    )
+    api_stats = ApiStats()
+    with pytest.raises(ClientResponseError), api_stats.track(API_QUERY_DEVICES):
+        raise err
+
+    assert api_stats.calls[API_QUERY_DEVICES].last_error == (
+        "ClientResponseError (server, HTTP 503)"
+    )
+
+
+def test_call_log_keeps_the_latest_calls() -> None:
+    api_stats = ApiStats(log_size=2)
+    for device_id in (1, 2):
+        with api_stats.track(API_QUERY_DEVICES, device_id):
+            pass
+    with pytest.raises(TimeoutError), api_stats.track(API_QUERY_DEVICES, 3):
+        raise TimeoutError
+
+    assert [(r.device_id, r.outcome) for r in api_stats.log] == [
+        (2, "success"),
+        (3, "TimeoutError"),
+    ]
@@ -0,0 +1,45 @@
+"""Tests for the persisted device snapshot."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+
+from aiohttp import ClientSession
+from aiohttp import CookieJar
+from sharp_cocoro import Aircon
+from sharp_cocoro import Device
+
+from benchmarks.fake_cocoro import FakeCocoroServer
+from custom_components.sharp_cocoro.storage import device_from_dict
+from custom_components.sharp_cocoro.storage import device_to_dict
+
+
+def _query_device() -> Device:
+    """Return the aircon of a fake account as the client decodes it."""
+
+    async def _async_query() -> Device:
+        async with (
+            FakeCocoroServer() as server,
+            ClientSession(cookie_jar=CookieJar(unsafe=True)) as session,
+        ):
+            cocoro = server.create_client(session)
+            await cocoro.login()
+            (device,) = await cocoro.query_devices()
+            return device
+
+    return asyncio.run(_async_query())
+
+
+def test_device_round_trips_through_json() -> None:
+    device = _query_device()
+
+    restored = device_from_dict(json.loads(json.dumps(device_to_dict(device))))
+
+    assert isinstance(restored, Aircon)
+    assert device_to_dict(restored) == device_to_dict(device)
+    assert restored.get_power_status() == device.get_power_status()
+    assert restored.get_operation_mode() == device.get_operation_mode()
+    assert restored.get_temperature() == device.get_temperature()
+    assert restored.get_windspeed() == device.get_windspeed()
+    assert restored.get_fan_direction() == device.get_fan_direction()